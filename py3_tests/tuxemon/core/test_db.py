@@ -0,0 +1,237 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from tuxemon.core.db import JSONDatabase, get_snapshot_path, read_json_files
+
+
+class DatabaseTestCase(unittest.TestCase):
+    # records of each table, written to the database folder before each test
+    tables = dict()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.db_path = os.path.join(self.temp_dir.name, "db")
+        self.cache_path = os.path.join(self.temp_dir.name, "cache")
+        os.makedirs(self.cache_path)
+        for table, records in self.tables.items():
+            os.makedirs(os.path.join(self.db_path, table))
+            for record in records:
+                self.write_record(table, record)
+
+        fetch_patcher = patch("tuxemon.core.db.prepare.fetch", return_value=self.db_path)
+        cache_patcher = patch("tuxemon.core.db.paths.USER_GAME_CACHE_DIR", self.cache_path)
+        fetch_patcher.start()
+        cache_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+        self.addCleanup(cache_patcher.stop)
+
+    def write_record(self, table, record):
+        path = os.path.join(self.db_path, table, record["slug"] + ".json")
+        with open(path, "w") as fp:
+            json.dump(record, fp)
+        return path
+
+
+class TestJSONDatabaseSnapshot(DatabaseTestCase):
+    tables = {"item": [{"slug": "potion", "power": 1}]}
+
+    def setUp(self):
+        super(TestJSONDatabaseSnapshot, self).setUp()
+        self.item_path = os.path.join(self.db_path, "item", "potion.json")
+
+    def test_load_writes_snapshot(self):
+        JSONDatabase().load("item")
+        snapshot_path = get_snapshot_path(self.db_path, ["item"])
+        self.assertTrue(os.path.exists(snapshot_path))
+
+    def test_load_from_snapshot_does_not_parse_json(self):
+        JSONDatabase().load("item")
+        db = JSONDatabase()
+        with patch.object(JSONDatabase, "load_json") as load_json:
+            db.load("item")
+        load_json.assert_not_called()
+        self.assertEqual(db.database["item"]["potion"]["power"], 1)
+
+    def test_load_rebuilds_snapshot_when_json_changes(self):
+        JSONDatabase().load("item")
+        self.write_record("item", {"slug": "potion", "power": 20})
+        db = JSONDatabase()
+        db.load("item")
+        self.assertEqual(db.database["item"]["potion"]["power"], 20)
+
+    def test_load_rebuilds_snapshot_when_json_added(self):
+        JSONDatabase().load("item")
+        self.write_record("item", {"slug": "ether", "power": 2})
+        db = JSONDatabase()
+        db.load("item")
+        self.assertIn("ether", db.database["item"])
+
+    def test_load_ignores_corrupt_snapshot(self):
+        snapshot_path = get_snapshot_path(self.db_path, ["item"])
+        with open(snapshot_path, "wb") as fp:
+            fp.write(b"not a snapshot")
+        db = JSONDatabase()
+        db.load("item")
+        self.assertEqual(db.database["item"]["potion"]["power"], 1)
+
+
+class TestJSONDatabaseLazyTables(DatabaseTestCase):
+    tables = {
+        "item": [{"slug": "potion", "power": 1}],
+        "monster": [{"slug": "bigfin"}],
+    }
+
+    def test_load_does_not_load_tables(self):
+        db = JSONDatabase()
+        db.load()
+        self.assertNotIn("item", db.database)
+
+    def test_table_is_loaded_when_accessed(self):
+        db = JSONDatabase()
+        db.load()
+        self.assertEqual(db.database["item"]["potion"]["power"], 1)
+
+    def test_lookup_loads_only_requested_table(self):
+        db = JSONDatabase()
+        db.load()
+        db.lookup("potion", table="item")
+        self.assertNotIn("monster", db.database)
+
+    def test_preload_loads_table(self):
+        db = JSONDatabase()
+        db.load()
+        db.preload(["monster"])
+        self.assertIn("monster", db.database)
+
+    def test_unknown_table_raises_key_error(self):
+        db = JSONDatabase()
+        db.load()
+        with self.assertRaises(KeyError):
+            db.database["spaceships"]
+
+
+class TestReadJsonFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.filenames = []
+        for index in range(5):
+            filename = os.path.join(self.temp_dir.name, "{}.json".format(index))
+            with open(filename, "w") as fp:
+                json.dump({"slug": str(index)}, fp)
+            self.filenames.append(filename)
+
+    def test_sequential_results_are_in_order_of_filenames(self):
+        with patch("tuxemon.core.db.prepare.CONFIG.json_loader", "sequential"):
+            result = read_json_files(self.filenames)
+        self.assertEqual([i["slug"] for i in result], ["0", "1", "2", "3", "4"])
+
+    def test_thread_results_are_in_order_of_filenames(self):
+        with patch("tuxemon.core.db.prepare.CONFIG.json_loader", "thread"):
+            result = read_json_files(self.filenames)
+        self.assertEqual([i["slug"] for i in result], ["0", "1", "2", "3", "4"])
+
+    def test_invalid_json_raises_value_error(self):
+        with open(self.filenames[2], "w") as fp:
+            fp.write("{")
+        with patch("tuxemon.core.db.prepare.CONFIG.json_loader", "thread"):
+            with self.assertRaises(ValueError):
+                read_json_files(self.filenames)
+
+    def test_invalid_json_is_skipped_when_errors_are_skipped(self):
+        with open(self.filenames[2], "w") as fp:
+            fp.write("{")
+        with patch("tuxemon.core.db.prepare.CONFIG.json_loader", "thread"):
+            result = read_json_files(self.filenames, skip_errors=True)
+        self.assertEqual([i["slug"] for i in result], ["0", "1", "3", "4"])
+
+
+class TestJSONDatabaseLookup(DatabaseTestCase):
+    tables = {
+        "monster": [{"slug": "bigfin", "weight": 10, "moveset": [{"technique": "ram", "level_learned": 1}]}],
+    }
+
+    def setUp(self):
+        super(TestJSONDatabaseLookup, self).setUp()
+        self.db = JSONDatabase()
+        self.db.load()
+
+    def test_defaults_are_applied_when_loaded(self):
+        sprites = self.db.database["monster"]["bigfin"]["sprites"]
+        self.assertEqual(sprites["battle1"], "gfx/sprites/battle/bigfin-front")
+
+    def test_lookup_result_cannot_be_changed(self):
+        result = self.db.lookup("bigfin", table="monster")
+        with self.assertRaises(TypeError):
+            result["weight"] = 20
+
+    def test_nested_values_of_lookup_result_cannot_be_changed(self):
+        result = self.db.lookup("bigfin", table="monster")
+        with self.assertRaises(AttributeError):
+            result["moveset"].append({"technique": "tackle"})
+        with self.assertRaises(TypeError):
+            result["moveset"][0]["level_learned"] = 5
+        with self.assertRaises(TypeError):
+            result["sprites"]["battle1"] = "tree"
+
+    def test_lookup_returns_same_view_each_time(self):
+        result0 = self.db.lookup("bigfin", table="monster")
+        result1 = self.db.lookup("bigfin", table="monster")
+        self.assertIs(result0, result1)
+
+    def test_lookup_copy_can_be_changed_without_changing_database(self):
+        result = self.db.lookup("bigfin", table="monster", copy=True)
+        result["weight"] = 20
+        self.assertEqual(self.db.lookup("bigfin", table="monster")["weight"], 10)
+
+    def test_lookup_missing_slug_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self.db.lookup("nothing", table="monster")
+
+
+class TestJSONDatabaseQuery(DatabaseTestCase):
+    tables = {
+        "monster": [
+            {"slug": "bigfin", "types": ["Water"], "shape": "Leviathan"},
+            {
+                "slug": "dollfin",
+                "types": ["Water", "Metal"],
+                "evolutions": [{"path": "standard", "at_level": 10, "monster_slug": "bigfin"}],
+            },
+        ],
+        "encounter": [{"slug": "beach", "monsters": [{"monster": "bigfin"}]}],
+        "npc": [{"slug": "sailor", "monsters": [{"monster": "dollfin"}]}],
+    }
+
+    def setUp(self):
+        super(TestJSONDatabaseQuery, self).setUp()
+        self.db = JSONDatabase()
+        self.db.load()
+
+    def test_query_list_field(self):
+        result = self.db.query("monster", "types", "water")
+        self.assertEqual(result, ("bigfin", "dollfin"))
+
+    def test_query_is_not_case_sensitive(self):
+        result = self.db.query("monster", "shape", "LEVIATHAN")
+        self.assertEqual(result, ("bigfin",))
+
+    def test_query_evolution_target(self):
+        result = self.db.query("monster", "evolution", "bigfin")
+        self.assertEqual(result, ("dollfin",))
+
+    def test_query_without_match_is_empty(self):
+        result = self.db.query("monster", "types", "fire")
+        self.assertEqual(result, ())
+
+    def test_referenced_by_encounter(self):
+        result = self.db.referenced_by("bigfin")
+        self.assertEqual(result, {"encounter": ("beach",), "npc": ()})
+
+    def test_referenced_by_npc(self):
+        result = self.db.referenced_by("dollfin")
+        self.assertEqual(result, {"encounter": (), "npc": ("sailor",)})
@@ -0,0 +1,28 @@
+import unittest
+from unittest.mock import Mock
+
+from tuxemon.core.event.eventaction import EventAction
+
+
+class CastAction(EventAction):
+    name = "cast"
+    valid_parameters = [
+        (str, "slug"),
+        (int, "amount"),
+    ]
+
+
+class TestEventAction(unittest.TestCase):
+    def test_parameters_are_cast(self):
+        action = CastAction(Mock(), ["potion", "3"])
+        self.assertEqual(action.parameters.slug, "potion")
+        self.assertEqual(action.parameters.amount, 3)
+        self.assertEqual(action.raw_parameters, ["potion", "3"])
+
+    def test_parsed_parameters_are_not_cast_again(self):
+        parameters = CastAction.parse_parameters(["potion", "3"])
+        action = CastAction(Mock(), ["potion", "3"], parameters)
+        self.assertIs(action.parameters, parameters)
+
+    def test_invalid_parameters_are_none(self):
+        self.assertIsNone(CastAction.parse_parameters(["potion", "three"]))
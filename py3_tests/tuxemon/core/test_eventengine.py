@@ -0,0 +1,219 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from tuxemon.core.event import EventObject, MapAction, MapCondition
+from tuxemon.core.event.eventengine import EventEngine
+from tuxemon.core.session import GameVariables
+
+
+def make_condition(cond_type, operator="is"):
+    return MapCondition(cond_type, [], 0, 0, 1, 1, operator, "cond1")
+
+
+def make_event(*conds):
+    return EventObject(1, "Event", 0, 0, 1, 1, list(conds), [])
+
+
+def make_condition_class(result, inputs=None):
+    instance = Mock(test=Mock(return_value=result), get_inputs=Mock(return_value=inputs))
+    return Mock(return_value=instance)
+
+
+class EventEngineTestCase(unittest.TestCase):
+    # the engine has no condition or action plugins; tests add their own
+    def setUp(self):
+        load_plugins_patcher = patch("tuxemon.core.event.eventengine.plugin.load_plugins", return_value=dict())
+        load_plugins_patcher.start()
+        self.addCleanup(load_plugins_patcher.stop)
+        self.session = self.make_session()
+        self.engine = EventEngine(self.session)
+
+    def make_session(self):
+        return Mock()
+
+
+class TestEventPredicate(EventEngineTestCase):
+    def setUp(self):
+        super(TestEventPredicate, self).setUp()
+        self.true_condition = make_condition_class(True)
+        self.false_condition = make_condition_class(False)
+        self.engine.conditions = {"true": self.true_condition, "false": self.false_condition}
+
+    def test_all_conditions_satisfied(self):
+        predicate = self.engine.compile_event(make_event(make_condition("true"), make_condition("false", "not")))
+        self.assertTrue(predicate(self.session))
+
+    def test_unsatisfied_condition(self):
+        predicate = self.engine.compile_event(make_event(make_condition("true"), make_condition("false")))
+        self.assertFalse(predicate(self.session))
+
+    def test_test_stops_at_first_unsatisfied_condition(self):
+        predicate = self.engine.compile_event(make_event(make_condition("false"), make_condition("true")))
+        predicate(self.session)
+        self.true_condition.return_value.test.assert_not_called()
+
+    def test_missing_condition_is_never_satisfied(self):
+        predicate = self.engine.compile_event(make_event(make_condition("missing", "not")))
+        self.assertFalse(predicate(self.session))
+
+    def test_condition_instance_is_shared(self):
+        self.engine.compile_event(make_event(make_condition("true")))
+        self.engine.compile_event(make_event(make_condition("true")))
+        self.true_condition.assert_called_once_with()
+
+    def test_predicate_is_compiled_once(self):
+        map_event = make_event(make_condition("true"))
+        self.assertIs(self.engine.get_predicate(map_event), self.engine.get_predicate(map_event))
+
+    def test_reset_drops_predicates(self):
+        map_event = make_event(make_condition("true"))
+        self.engine.compile_events([map_event])
+        self.engine.reset()
+        self.assertEqual(self.engine.predicates, dict())
+
+    def test_inputs_of_all_conditions_are_combined(self):
+        self.engine.conditions = {
+            "player": make_condition_class(True, ("player",)),
+            "party": make_condition_class(True, ("party",)),
+        }
+        predicate = self.engine.compile_event(make_event(make_condition("player"), make_condition("party")))
+        self.assertEqual(predicate.inputs, ("party", "player"))
+
+    def test_unknown_inputs_of_one_condition_make_inputs_unknown(self):
+        self.engine.conditions = {"player": make_condition_class(True, ("player",)), "true": self.true_condition}
+        predicate = self.engine.compile_event(make_event(make_condition("player"), make_condition("true")))
+        self.assertIsNone(predicate.inputs)
+
+    def test_disabled_trace_has_no_records(self):
+        map_event = make_event(make_condition("true"))
+        self.engine.process_map_event(map_event)
+        self.assertEqual(len(self.engine.trace.records), 0)
+
+    def test_trace_records_conditions_and_start(self):
+        self.engine.trace.enabled = True
+        map_event = make_event(make_condition("true"))
+        self.engine.process_map_event(map_event)
+        records = list(self.engine.trace.records)
+        self.assertEqual([(i.item, i.result) for i in records], [(map_event.conds[0], True), (None, True)])
+
+    def test_check_condition_is_not_timed_when_disabled(self):
+        map_event = make_event(make_condition("true"))
+        with patch("tuxemon.core.event.eventengine.default_timer") as default_timer:
+            self.assertTrue(self.engine.check_condition(map_event.conds[0], map_event))
+        default_timer.assert_not_called()
+
+    def test_disabled_profiler_has_no_statistics(self):
+        self.engine.process_map_event(make_event(make_condition("true")))
+        self.assertEqual(self.engine.profiler.conditions, dict())
+
+    def test_profiler_counts_conditions_and_events(self):
+        self.engine.profiler.enabled = True
+        self.engine.process_map_event(make_event(make_condition("true"), make_condition("false")))
+        self.assertEqual(self.engine.profiler.conditions["true"][0], 1)
+        self.assertEqual(self.engine.profiler.conditions["false"][0], 1)
+        self.assertEqual(self.engine.profiler.events[(None, 1)][0], 1)
+        self.assertEqual(self.engine.profiler.events[(None, 1)][3], 0)
+
+    def test_profiler_keys_events_by_map(self):
+        self.engine.profiler.enabled = True
+        self.engine.current_map = Mock(filename="/mods/tuxemon/maps/town.tmx")
+        self.engine.process_map_event(make_event(make_condition("true")))
+        self.assertEqual(list(self.engine.profiler.events), [("town.tmx", 1)])
+
+    def test_profiler_times_action_steps(self):
+        self.engine.profiler.enabled = True
+        action = Mock(done=True)
+        self.engine.actions = {"act": Mock(return_value=action)}
+        map_event = EventObject(1, "Event", 0, 0, 1, 1, [], [MapAction("act", [], "act1")])
+        self.engine.start_event(map_event)
+        self.engine.update_running_events(0.0)
+        self.assertEqual(
+            sorted(self.engine.profiler.actions),
+            [("act", "cleanup"), ("act", "start"), ("act", "update")],
+        )
+
+
+class TestActionBinding(EventEngineTestCase):
+    def setUp(self):
+        super(TestActionBinding, self).setUp()
+        self.action_class = Mock(return_value=Mock(done=True))
+        self.action_class.parse_parameters.return_value = ("parsed",)
+        self.engine.actions = {"act": self.action_class}
+        self.map_event = EventObject(1, "Event", 0, 0, 1, 1, [], [MapAction("act", ["raw"], "act1")])
+
+    def run_event(self):
+        self.engine.start_event(self.map_event)
+        self.engine.update_running_events(0.0)
+
+    def test_action_is_created_with_parsed_parameters(self):
+        self.run_event()
+        self.action_class.assert_called_once_with(self.session, ["raw"], ("parsed",))
+
+    def test_parameters_are_parsed_once(self):
+        self.engine.compile_events([self.map_event])
+        self.run_event()
+        self.run_event()
+        self.action_class.parse_parameters.assert_called_once_with(["raw"])
+        self.assertEqual(self.action_class.call_count, 2)
+
+    def test_missing_action_ends_event(self):
+        self.engine.actions = dict()
+        self.run_event()
+        self.assertEqual(self.engine.running_events, dict())
+
+
+class TestEventEngineDirtyTracking(EventEngineTestCase):
+    def make_session(self):
+        self.player = Mock(tile_pos=(1, 1), facing="down", move_destination=None, monsters=[], inventory={})
+        self.player.game_variables = GameVariables()
+        session = Mock(player=self.player)
+        session.client.active_states = []
+        session.client.key_events = []
+        return session
+
+    def setUp(self):
+        super(TestEventEngineDirtyTracking, self).setUp()
+        self.condition = make_condition_class(False, ("player", "variable:door"))
+        self.engine.conditions = {"cond": self.condition}
+        self.map_event = make_event(make_condition("cond"))
+        self.test = self.condition.return_value.test
+
+    def check(self):
+        self.engine.update_inputs()
+        self.engine.process_map_event(self.map_event)
+
+    def test_condition_is_not_tested_again_when_inputs_do_not_change(self):
+        self.check()
+        self.check()
+        self.assertEqual(self.test.call_count, 1)
+
+    def test_condition_is_tested_again_when_player_moves(self):
+        self.check()
+        self.player.tile_pos = (1, 2)
+        self.check()
+        self.assertEqual(self.test.call_count, 2)
+
+    def test_condition_is_tested_again_when_variable_changes(self):
+        self.check()
+        self.player.game_variables["door"] = "open"
+        self.check()
+        self.assertEqual(self.test.call_count, 2)
+
+    def test_condition_is_not_tested_again_when_other_variable_changes(self):
+        self.check()
+        self.player.game_variables["steps"] = 10
+        self.check()
+        self.assertEqual(self.test.call_count, 1)
+
+    def test_condition_is_tested_again_when_variables_are_replaced(self):
+        self.check()
+        self.player.game_variables = GameVariables()
+        self.check()
+        self.assertEqual(self.test.call_count, 2)
+
+    def test_satisfied_event_is_started_each_check(self):
+        self.test.return_value = True
+        self.engine.start_event = Mock()
+        self.check()
+        self.check()
+        self.assertEqual(self.engine.start_event.call_count, 2)
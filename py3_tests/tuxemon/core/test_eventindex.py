@@ -0,0 +1,45 @@
+import unittest
+
+from tuxemon.core.event import EventObject, MapCondition
+from tuxemon.core.event.eventindex import EventIndex, get_area
+
+
+def make_event(event_id, cond_type, x, y, operator="is"):
+    cond = MapCondition(cond_type, [], x, y, 1, 1, operator, "cond1")
+    return EventObject(event_id, "Event", x, y, 1, 1, [cond], [])
+
+
+class TestGetArea(unittest.TestCase):
+    def test_area_of_positional_condition_includes_margin(self):
+        self.assertEqual(get_area(make_event(1, "player_at", 10, 20)), (8, 18, 12, 22))
+
+    def test_other_condition_has_no_area(self):
+        self.assertIsNone(get_area(make_event(1, "variable_set", 10, 20)))
+
+    def test_negated_condition_has_no_area(self):
+        self.assertIsNone(get_area(make_event(1, "player_at", 10, 20, "not")))
+
+
+class TestEventIndex(unittest.TestCase):
+    def setUp(self):
+        self.near = make_event(1, "player_at", 2, 2)
+        self.far = make_event(2, "player_moved", 30, 30)
+        self.anywhere = make_event(3, "variable_set", 30, 30)
+        self.index = EventIndex([self.near, self.far, self.anywhere])
+
+    def test_nearby_and_global_events_are_returned(self):
+        self.assertEqual(self.index.get_events([(3, 3)]), [self.near, self.anywhere])
+
+    def test_events_are_in_map_order(self):
+        self.assertEqual(self.index.get_events([(3, 3), (29, 29)]), [self.near, self.far, self.anywhere])
+
+    def test_event_is_returned_once_when_in_several_regions(self):
+        index = EventIndex([make_event(1, "player_at", 7, 7)])
+        self.assertEqual(len(index.get_events([(7, 7), (8, 8)])), 1)
+
+    def test_event_near_edge_of_region_is_returned(self):
+        self.assertEqual(self.index.get_events([(27, 28)]), [self.far, self.anywhere])
+
+    def test_result_is_reused_in_same_regions(self):
+        result = self.index.get_events([(3, 3)])
+        self.assertIs(self.index.get_events([(4, 4)]), result)
@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from tuxemon.core.event.eventprofile import EventProfiler
+
+
+class TestEventProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = EventProfiler()
+
+    def test_condition_statistics_are_accumulated(self):
+        self.profiler.add_condition("player_at", True, 0.002)
+        self.profiler.add_condition("player_at", False, 0.001)
+        report = self.profiler.get_report()["conditions"]["player_at"]
+        self.assertEqual(report["calls"], 2)
+        self.assertAlmostEqual(report["total_ms"], 3.0)
+        self.assertAlmostEqual(report["max_ms"], 2.0)
+        self.assertAlmostEqual(report["true_ratio"], 0.5)
+
+    def test_events_of_different_maps_are_kept_apart(self):
+        self.profiler.add_event("town.tmx", 7, True, 0.001)
+        self.profiler.add_event("house.tmx", 7, False, 0.001)
+        report = self.profiler.get_report()["events"]
+        self.assertEqual(report["town.tmx"]["7"]["true_ratio"], 1.0)
+        self.assertEqual(report["house.tmx"]["7"]["true_ratio"], 0.0)
+
+    def test_action_steps_are_reported_separately(self):
+        self.profiler.add_action("teleport", "start", 0.001)
+        self.profiler.add_action("teleport", "cleanup", 0.002)
+        report = self.profiler.get_report()["actions"]["teleport"]
+        self.assertEqual(sorted(report), ["cleanup", "start"])
+        self.assertNotIn("true_ratio", report["start"])
+
+    def test_lines_are_sorted_by_total_time(self):
+        self.profiler.add_condition("fast", True, 0.001)
+        self.profiler.add_condition("slow", True, 0.005)
+        lines = self.profiler.get_lines(1)
+        self.assertEqual(lines[0], "conditions:")
+        self.assertIn("slow", lines[1])
+        self.assertEqual(lines[2], "events:")
+
+    def test_lines_of_actions_have_no_ratio(self):
+        self.profiler.add_condition("player_at", True, 0.001)
+        self.profiler.add_action("teleport", "start", 0.001)
+        lines = self.profiler.get_lines()
+        self.assertIn("% true", lines[1])
+        self.assertNotIn("% true", lines[-1])
+
+    def test_clear_removes_statistics(self):
+        self.profiler.add_condition("player_at", True, 0.001)
+        self.profiler.clear()
+        self.assertEqual(self.profiler.get_report(), {"conditions": {}, "events": {}, "actions": {}})
+
+    def test_save_writes_report_as_json(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, "event_profile.json")
+        self.profiler.add_condition("player_at", True, 0.001)
+        self.profiler.save(filename)
+        with open(filename) as fp:
+            self.assertEqual(json.load(fp), self.profiler.get_report())
@@ -0,0 +1,39 @@
+import unittest
+
+from tuxemon.core.event import MapAction, MapCondition
+from tuxemon.core.event.eventtrace import EventTrace, format_item
+
+
+class TestFormatItem(unittest.TestCase):
+    def test_condition(self):
+        cond = MapCondition("variable_set", ["door:open"], 0, 0, 1, 1, "is", "cond1")
+        self.assertEqual(format_item(cond), "is variable_set door:open")
+
+    def test_action(self):
+        action = MapAction("teleport", ["house.tmx", "1", "2"], "act10")
+        self.assertEqual(format_item(action), "teleport house.tmx 1 2")
+
+    def test_event_start(self):
+        self.assertEqual(format_item(None), "event started")
+
+
+class TestEventTrace(unittest.TestCase):
+    def test_oldest_records_are_dropped(self):
+        trace = EventTrace(2)
+        trace.add(1, 10, None, True, 0.0)
+        trace.add(2, 11, None, True, 0.0)
+        trace.add(3, 12, None, True, 0.0)
+        self.assertEqual([i.tick for i in trace.records], [2, 3])
+
+    def test_dump_count_returns_latest_records(self):
+        trace = EventTrace()
+        trace.add(1, 10, None, True, 0.0)
+        trace.add(2, 11, None, True, 0.0)
+        result = trace.dump(1)
+        self.assertEqual(len(result), 1)
+        self.assertIn("11", result[0])
+
+    def test_dump_zero_returns_no_records(self):
+        trace = EventTrace()
+        trace.add(1, 10, None, True, 0.0)
+        self.assertEqual(trace.dump(0), [])
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import pygame
+
+from tuxemon.core.graphics import SurfaceCache, scaled_image_loader, tileset_cache
+
+
+class TestSurfaceCache(unittest.TestCase):
+    def setUp(self):
+        # each 10x10 surface with 32 bit pixels uses 400 bytes
+        self.cache = SurfaceCache(1000)
+        fetch_patcher = patch("tuxemon.core.graphics.transform_resource_filename", side_effect=lambda x: x)
+        fetch_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+
+    def make_loader(self):
+        return Mock(return_value=pygame.Surface((10, 10), 0, 32))
+
+    def test_loader_is_not_called_when_cached(self):
+        loader = self.make_loader()
+        self.cache.get(("tree.png", 1, "smart"), loader)
+        self.cache.get(("tree.png", 1, "smart"), loader)
+        loader.assert_called_once_with()
+
+    def test_hits_and_misses_are_counted(self):
+        loader = self.make_loader()
+        self.cache.get(("tree.png", 1, "smart"), loader)
+        self.cache.get(("tree.png", 1, "smart"), loader)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_scale_is_part_of_key(self):
+        loader = self.make_loader()
+        self.cache.get(("tree.png", 1, "smart"), loader)
+        self.cache.get(("tree.png", 2, "smart"), loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_size_is_total_of_surfaces(self):
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.get(("rock.png", 1, "smart"), self.make_loader())
+        self.assertEqual(self.cache.size, 800)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.get(("rock.png", 1, "smart"), self.make_loader())
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.get(("bush.png", 1, "smart"), self.make_loader())
+        self.assertEqual(list(self.cache.surfaces), [("tree.png", 1, "smart"), ("bush.png", 1, "smart")])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_pinned_surface_is_not_evicted(self):
+        self.cache.pin("combat", ["tree.png"])
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.get(("rock.png", 1, "smart"), self.make_loader())
+        self.cache.get(("bush.png", 1, "smart"), self.make_loader())
+        self.assertIn(("tree.png", 1, "smart"), self.cache.pinned_surfaces)
+        self.assertEqual(list(self.cache.surfaces), [("bush.png", 1, "smart")])
+
+    def test_pinning_cached_surface_keeps_it(self):
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.pin("combat", ["tree.png"])
+        self.cache.get(("rock.png", 1, "smart"), self.make_loader())
+        self.cache.get(("bush.png", 1, "smart"), self.make_loader())
+        self.assertIn(("tree.png", 1, "smart"), self.cache.pinned_surfaces)
+
+    def test_file_pinned_by_other_group_stays_pinned(self):
+        self.cache.pin("map", ["tree.png"])
+        self.cache.pin("combat", ["tree.png"])
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.unpin("combat")
+        self.assertIn(("tree.png", 1, "smart"), self.cache.pinned_surfaces)
+
+    def test_unpin_evicts_when_over_size(self):
+        self.cache.pin("combat", ["tree.png", "rock.png", "bush.png"])
+        self.cache.get(("tree.png", 1, "smart"), self.make_loader())
+        self.cache.get(("rock.png", 1, "smart"), self.make_loader())
+        self.cache.get(("bush.png", 1, "smart"), self.make_loader())
+        self.cache.unpin_all()
+        self.assertEqual(self.cache.size, 800)
+        self.assertEqual(self.cache.pinned_surfaces, dict())
+
+
+class TestScaledImageLoader(unittest.TestCase):
+    def setUp(self):
+        tileset_cache_patcher = patch.dict(tileset_cache, clear=True)
+        load_patcher = patch(
+            "tuxemon.core.graphics.load_surface",
+            side_effect=lambda *args: pygame.Surface((128, 128)),
+        )
+        convert_patcher = patch("tuxemon.core.graphics.smart_convert", side_effect=lambda tile, *args: tile)
+        tileset_cache_patcher.start()
+        self.load = load_patcher.start()
+        convert_patcher.start()
+        self.addCleanup(tileset_cache_patcher.stop)
+        self.addCleanup(load_patcher.stop)
+        self.addCleanup(convert_patcher.stop)
+
+    def test_tileset_is_loaded_once(self):
+        scaled_image_loader("tiles.png", None, pixelalpha=True)
+        scaled_image_loader("tiles.png", None, pixelalpha=True)
+        self.assertEqual(self.load.call_count, 1)
+
+    def test_colorkey_is_part_of_key(self):
+        scaled_image_loader("tiles.png", None, pixelalpha=True)
+        scaled_image_loader("tiles.png", "ff00ff", pixelalpha=True)
+        self.assertEqual(self.load.call_count, 2)
+
+    def test_tiles_are_shared_between_loads(self):
+        tile0 = scaled_image_loader("tiles.png", None, pixelalpha=True)((0, 0, 16, 16))
+        tile1 = scaled_image_loader("tiles.png", None, pixelalpha=True)((0, 0, 16, 16))
+        self.assertIs(tile0, tile1)
+
+    def test_different_tiles_are_not_shared(self):
+        load_image = scaled_image_loader("tiles.png", None, pixelalpha=True)
+        tile0 = load_image((0, 0, 16, 16))
+        tile1 = load_image((16, 0, 16, 16))
+        self.assertIsNot(tile0, tile1)
@@ -1,7 +1,10 @@
 import unittest
+from unittest.mock import Mock, call, patch
+
+import pytmx
 
 from tuxemon.compat import Rect
-from tuxemon.core.map import snap_interval, snap_point, snap_rect, tiles_inside_rect, point_to_grid
+from tuxemon.core.map import CollisionGrid, MapCache, OccupancyIndex, TuxemonMap, estimate_map_size, snap_interval, snap_point, snap_rect, tiles_inside_rect, point_to_grid
 
 
 class TestSnapInterval(unittest.TestCase):
@@ -113,3 +116,196 @@ class TestTilesInsideRect(unittest.TestCase):
         expected = [(0, 1), (1, 1), (0, 2), (1, 2), (0, 3), (1, 3)]
         result = list(tiles_inside_rect(rect, grid_size))
         self.assertEqual(expected, result)
+
+
+class TestMapCache(unittest.TestCase):
+    def setUp(self):
+        self.sizes = dict()
+        patcher = patch("tuxemon.core.map.estimate_map_size", side_effect=lambda map_data: self.sizes[map_data])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = MapCache(2000)
+        self.town = Mock(spec=TuxemonMap)
+        self.house = Mock(spec=TuxemonMap)
+        self.shop = Mock(spec=TuxemonMap)
+        self.sizes.update({self.town: 1000, self.house: 1000, self.shop: 1000})
+
+    def test_get_returns_added_map(self):
+        self.cache.add("town.tmx", self.town)
+        self.assertIs(self.cache.get("town.tmx"), self.town)
+
+    def test_get_missing_map_returns_none(self):
+        self.assertIsNone(self.cache.get("town.tmx"))
+
+    def test_hits_and_misses_are_counted(self):
+        self.cache.add("town.tmx", self.town)
+        self.cache.get("town.tmx")
+        self.cache.get("house.tmx")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_least_recently_used_map_is_evicted(self):
+        self.cache.add("town.tmx", self.town)
+        self.cache.add("house.tmx", self.house)
+        self.cache.get("town.tmx")
+        self.cache.add("shop.tmx", self.shop)
+        self.assertNotIn("house.tmx", self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_recently_used_map_is_kept(self):
+        self.cache.add("town.tmx", self.town)
+        self.cache.add("house.tmx", self.house)
+        self.cache.get("town.tmx")
+        self.cache.add("shop.tmx", self.shop)
+        self.assertIn("town.tmx", self.cache)
+
+    def test_larger_map_evicts_several_maps(self):
+        self.sizes[self.shop] = 2000
+        self.cache.add("town.tmx", self.town)
+        self.cache.add("house.tmx", self.house)
+        self.cache.add("shop.tmx", self.shop)
+        self.assertEqual(list(self.cache.maps), ["shop.tmx"])
+        self.assertEqual(self.cache.size, 2000)
+
+    def test_map_over_the_limit_is_kept(self):
+        self.sizes[self.town] = 5000
+        self.cache.add("town.tmx", self.town)
+        self.assertIn("town.tmx", self.cache)
+
+    def test_size_is_estimated_again_when_adding(self):
+        self.cache.add("town.tmx", self.town)
+        self.sizes[self.town] = 1500
+        self.cache.add("house.tmx", self.house)
+        self.assertNotIn("town.tmx", self.cache)
+
+
+class TestEstimateMapSize(unittest.TestCase):
+    def setUp(self):
+        self.map_data = Mock()
+        self.map_data.size = (10, 20)
+        self.map_data.data.layers = [Mock(spec=pytmx.TiledTileLayer), Mock(spec=pytmx.TiledTileLayer), Mock()]
+        self.map_data.renderer = None
+
+    def test_tile_layers_and_collision_grid_are_counted(self):
+        self.assertEqual(estimate_map_size(self.map_data), 10 * 20 * (2 * 8 + 2))
+
+    def test_renderer_buffers_are_counted(self):
+        buffer = Mock()
+        buffer.get_size.return_value = (100, 50)
+        buffer.get_bytesize.return_value = 4
+        self.map_data.renderer = Mock(_buffer=buffer, _zoom_buffer=None)
+        self.assertEqual(estimate_map_size(self.map_data), 10 * 20 * (2 * 8 + 2) + 100 * 50 * 4)
+
+
+class TestCollisionGrid(unittest.TestCase):
+    def test_free_tile_exits_in_all_directions(self):
+        grid = CollisionGrid((3, 3), {}, set())
+        result = grid.get_exits((1, 1))
+        self.assertEqual(result, [(1, 2), (2, 1), (1, 0), (0, 1)])
+
+    def test_exits_outside_map_are_excluded(self):
+        grid = CollisionGrid((3, 3), {}, set())
+        result = grid.get_exits((0, 0))
+        self.assertEqual(result, [(0, 1), (1, 0)])
+
+    def test_collision_tile_is_blocked(self):
+        grid = CollisionGrid((3, 3), {(1, 2): {"enter": [], "exit": []}}, set())
+        self.assertNotIn((1, 2), grid.get_exits((1, 1)))
+
+    def test_collision_tile_can_be_entered_from_enter_direction(self):
+        grid = CollisionGrid((3, 3), {(1, 2): {"enter": ["up"], "exit": []}}, set())
+        self.assertIn((1, 2), grid.get_exits((1, 1)))
+
+    def test_wall_blocks_direction(self):
+        grid = CollisionGrid((3, 3), {}, {((1, 1), "down")})
+        self.assertNotIn((1, 2), grid.get_exits((1, 1)))
+
+    def test_continue_tile_only_exits_in_continue_direction(self):
+        grid = CollisionGrid((3, 3), {(1, 1): {"enter": ["up"], "exit": [], "continue": "left"}}, set())
+        self.assertEqual(grid.get_exits((1, 1)), [(0, 1)])
+
+    def test_exit_tile_only_exits_in_exit_directions(self):
+        grid = CollisionGrid((3, 3), {(1, 1): {"enter": ["up"], "exit": ["right"]}}, set())
+        self.assertEqual(grid.get_exits((1, 1)), [(2, 1)])
+
+    def test_occupied_tile_is_blocked(self):
+        grid = CollisionGrid((3, 3), {}, set())
+        self.assertNotIn((1, 2), grid.get_exits((1, 1), {(1, 2)}))
+
+    def test_continue_direction(self):
+        grid = CollisionGrid((3, 3), {(1, 1): {"enter": [], "exit": [], "continue": "up"}}, set())
+        self.assertEqual(grid.continue_direction((1, 1)), "up")
+
+    def test_continue_direction_of_free_tile_is_none(self):
+        grid = CollisionGrid((3, 3), {}, set())
+        self.assertIsNone(grid.continue_direction((1, 1)))
+
+    def test_entrances_of_free_tile(self):
+        grid = CollisionGrid((3, 3), {}, set())
+        self.assertEqual(grid.get_entrances((1, 1)), [(1, 0), (0, 1), (1, 2), (2, 1)])
+
+    def test_entrances_exclude_tile_behind_wall(self):
+        grid = CollisionGrid((3, 3), {}, {((1, 0), "down")})
+        self.assertNotIn((1, 0), grid.get_entrances((1, 1)))
+
+    def test_entrances_of_collision_tile_are_enter_directions(self):
+        grid = CollisionGrid((3, 3), {(1, 1): {"enter": ["up"], "exit": []}}, set())
+        self.assertEqual(grid.get_entrances((1, 1)), [(1, 0)])
+
+    def test_entrances_exclude_continue_tile_going_elsewhere(self):
+        grid = CollisionGrid((3, 3), {(1, 0): {"enter": [], "exit": [], "continue": "left"}}, set())
+        self.assertNotIn((1, 0), grid.get_entrances((1, 1)))
+
+
+class TestOccupancyIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = OccupancyIndex()
+        self.npc = Mock(tile_pos=(1.0, 2.0))
+
+    def test_added_entity_occupies_nearest_tile(self):
+        self.npc.tile_pos = (0.9, 2.2)
+        self.index.add(self.npc)
+        self.assertIn((1, 2), self.index)
+
+    def test_removed_entity_does_not_occupy_tile(self):
+        self.index.add(self.npc)
+        self.index.remove(self.npc)
+        self.assertNotIn((1, 2), self.index)
+
+    def test_moved_entity_occupies_new_tile(self):
+        self.index.add(self.npc)
+        self.npc.tile_pos = (2.0, 2.0)
+        self.index.move(self.npc)
+        self.assertNotIn((1, 2), self.index)
+        self.assertIn((2, 2), self.index)
+
+    def test_tile_is_occupied_until_all_entities_leave(self):
+        other = Mock(tile_pos=(1.0, 2.0))
+        self.index.add(self.npc)
+        self.index.add(other)
+        self.index.remove(self.npc)
+        self.assertEqual(self.index.get((1, 2)), {other})
+
+    def test_move_ignores_entity_which_was_not_added(self):
+        self.index.move(self.npc)
+        self.assertNotIn((1, 2), self.index)
+
+    def test_listeners_are_called_when_entity_changes_tiles(self):
+        listener = Mock()
+        self.index.listeners.append(listener)
+        self.index.add(self.npc)
+        self.npc.tile_pos = (2.0, 2.0)
+        self.index.move(self.npc)
+        self.index.remove(self.npc)
+        self.assertEqual(
+            listener.call_args_list,
+            [call(self.npc, None, (1, 2)), call(self.npc, (1, 2), (2, 2)), call(self.npc, (2, 2), None)],
+        )
+
+    def test_listeners_are_not_called_when_entity_stays_on_tile(self):
+        listener = Mock()
+        self.index.add(self.npc)
+        self.index.listeners.append(listener)
+        self.npc.tile_pos = (1.2, 2.0)
+        self.index.move(self.npc)
+        listener.assert_not_called()
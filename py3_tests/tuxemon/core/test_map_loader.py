@@ -0,0 +1,109 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from tuxemon.core.map_loader import TMXMapLoader, get_compiled_map_path, scaled_image_loader
+
+TMX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.0" orientation="orthogonal" width="4" height="4" tilewidth="16" tileheight="16">
+ <properties>
+  <property name="edges" value="clamped"/>
+ </properties>
+ <layer name="Tile Layer 1" width="4" height="4">
+  <data encoding="csv">
+0,0,0,0,
+0,0,0,0,
+0,0,0,0,
+0,0,0,0
+</data>
+ </layer>
+ <objectgroup name="Events">
+  <object id="1" name="Collision" type="collision" x="0" y="16" width="32" height="16"/>
+  <object id="2" name="Teleport" type="event" x="48" y="48" width="16" height="16">
+   <properties>
+    <property name="act1" value="teleport house.tmx,1,2"/>
+    <property name="cond1" value="is player_at"/>
+   </properties>
+  </object>
+ </objectgroup>
+</map>
+"""
+
+
+class TestTMXMapLoaderCompiledMap(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        open_patcher = patch("tuxemon.core.map_loader.prepare.RESOURCES.open", side_effect=lambda x: io.BytesIO(TMX))
+        cache_patcher = patch("tuxemon.core.map_loader.paths.USER_GAME_CACHE_DIR", self.temp_dir.name)
+        open_patcher.start()
+        cache_patcher.start()
+        self.addCleanup(open_patcher.stop)
+        self.addCleanup(cache_patcher.stop)
+
+    def test_load_writes_compiled_map(self):
+        TMXMapLoader().load("town.tmx")
+        self.assertTrue(os.path.exists(get_compiled_map_path(TMX)))
+
+    def test_load_from_compiled_map_does_not_compile(self):
+        TMXMapLoader().load("town.tmx")
+        with patch.object(TMXMapLoader, "compile") as compile_map:
+            TMXMapLoader().load("town.tmx")
+        compile_map.assert_not_called()
+
+    def test_compiled_map_has_same_collisions(self):
+        expected = TMXMapLoader().load("town.tmx")
+        result = TMXMapLoader().load("town.tmx")
+        self.assertEqual(result.collision_map, expected.collision_map)
+        self.assertEqual(result.collision_lines_map, expected.collision_lines_map)
+
+    def test_compiled_map_has_same_events(self):
+        expected = TMXMapLoader().load("town.tmx")
+        result = TMXMapLoader().load("town.tmx")
+        self.assertEqual(result.events, expected.events)
+        self.assertEqual(result.events[0].acts[0].type, "teleport")
+
+    def test_compiled_map_keeps_properties(self):
+        TMXMapLoader().load("town.tmx")
+        result = TMXMapLoader().load("town.tmx")
+        self.assertEqual(result.edges, "clamped")
+
+    def test_load_compiled_does_not_load_images(self):
+        with patch.object(TMXMapLoader, "load_tiled_map", wraps=TMXMapLoader.load_tiled_map) as load_tiled_map:
+            result = TMXMapLoader().load_compiled("town.tmx", TMX)
+        load_tiled_map.assert_called_once_with("town.tmx", TMX, images=False)
+        self.assertEqual(result.events[0].acts[0].type, "teleport")
+
+    def test_load_compiled_writes_compiled_map(self):
+        TMXMapLoader().load_compiled("town.tmx", TMX)
+        self.assertTrue(os.path.exists(get_compiled_map_path(TMX)))
+
+    def test_load_without_images_does_not_load_images(self):
+        compiled, data = TMXMapLoader().load_without_images("town.tmx")
+        self.assertIsNot(data.image_loader, scaled_image_loader)
+        self.assertEqual(compiled.events[0].acts[0].type, "teleport")
+        self.assertEqual(len(data.layers), 2)
+
+    def test_load_preloaded_map_only_loads_images(self):
+        preloaded = TMXMapLoader().load_without_images("town.tmx")
+        with patch.object(TMXMapLoader, "load_tiled_map") as load_tiled_map:
+            with patch.object(TMXMapLoader, "load_images") as load_images:
+                result = TMXMapLoader().load("town.tmx", preloaded)
+        load_tiled_map.assert_not_called()
+        load_images.assert_called_once_with(preloaded[1])
+        self.assertIs(result.data, preloaded[1])
+        self.assertEqual(result.edges, "clamped")
+
+    def test_load_images_uses_scaled_image_loader(self):
+        data = Mock()
+        TMXMapLoader.load_images(data)
+        self.assertIs(data.image_loader, scaled_image_loader)
+        data.reload_images.assert_called_once_with()
+
+    def test_corrupt_compiled_map_is_compiled_again(self):
+        with open(get_compiled_map_path(TMX), "wb") as fp:
+            fp.write(b"not a map")
+        result = TMXMapLoader().load("town.tmx")
+        self.assertEqual(len(result.events), 1)
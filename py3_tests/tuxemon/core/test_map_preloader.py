@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from tuxemon.core.event import EventObject, MapAction
+from tuxemon.core.map import TuxemonMap
+from tuxemon.core.map_preloader import MapPreloader, teleport_destinations
+
+
+def make_map(filename, *acts):
+    event = EventObject(1, "Teleport", 0, 0, 1, 1, [], list(acts))
+    return Mock(spec=TuxemonMap, filename=filename, events=[event], inits=[], interacts=[])
+
+
+class TestTeleportDestinations(unittest.TestCase):
+    def setUp(self):
+        fetch_patcher = patch("tuxemon.core.map_preloader.prepare.fetch", side_effect=lambda *args: "/".join(args))
+        fetch_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+
+    def test_teleport_actions_are_found(self):
+        map_data = make_map(
+            "maps/town.tmx",
+            MapAction("teleport", ["house.tmx", "1", "2"], "act10"),
+            MapAction("transition_teleport", ["shop.tmx", "1", "2", "0.3"], "act20"),
+            MapAction("delayed_teleport", ["lab.tmx", "1", "2"], "act30"),
+        )
+        result = teleport_destinations(map_data)
+        self.assertEqual(result, ["maps/house.tmx", "maps/shop.tmx", "maps/lab.tmx"])
+
+    def test_teleport_to_same_map_is_ignored(self):
+        map_data = make_map("maps/town.tmx", MapAction("teleport", ["town.tmx", "1", "2"], "act10"))
+        self.assertEqual(teleport_destinations(map_data), [])
+
+    def test_other_actions_are_ignored(self):
+        map_data = make_map("maps/town.tmx", MapAction("play_music", ["town.ogg"], "act10"))
+        self.assertEqual(teleport_destinations(map_data), [])
+
+
+class TestMapPreloader(unittest.TestCase):
+    def setUp(self):
+        fetch_patcher = patch("tuxemon.core.map_preloader.prepare.fetch", side_effect=lambda *args: "/".join(args))
+        load_patcher = patch(
+            "tuxemon.core.map_preloader.TMXMapLoader.load_without_images", side_effect=lambda x: x + " data"
+        )
+        fetch_patcher.start()
+        self.load = load_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+        self.addCleanup(load_patcher.stop)
+        self.preloader = MapPreloader(2)
+        self.addCleanup(self.preloader.executor.shutdown)
+
+    def test_get_returns_preloaded_map(self):
+        self.preloader.scan(make_map("maps/town.tmx", MapAction("teleport", ["house.tmx", "1", "2"], "act10")))
+        self.assertEqual(self.preloader.get("maps/house.tmx"), "maps/house.tmx data")
+
+    def test_get_map_which_was_not_preloaded_returns_none(self):
+        self.assertIsNone(self.preloader.get("maps/house.tmx"))
+
+    def test_scan_drops_maps_which_are_not_destinations(self):
+        self.preloader.scan(make_map("maps/town.tmx", MapAction("teleport", ["house.tmx", "1", "2"], "act10")))
+        self.preloader.scan(make_map("maps/shop.tmx", MapAction("teleport", ["town.tmx", "1", "2"], "act10")))
+        self.assertEqual(list(self.preloader.futures), ["maps/town.tmx"])
+
+    def test_maps_are_loaded_without_images(self):
+        self.preloader.scan(make_map("maps/town.tmx", MapAction("teleport", ["house.tmx", "1", "2"], "act10")))
+        self.preloader.get("maps/house.tmx")
+        self.load.assert_called_once_with("maps/house.tmx")
+
+    def test_number_of_maps_is_limited(self):
+        map_data = make_map(
+            "maps/town.tmx",
+            MapAction("teleport", ["house.tmx", "1", "2"], "act10"),
+            MapAction("teleport", ["shop.tmx", "1", "2"], "act20"),
+            MapAction("teleport", ["lab.tmx", "1", "2"], "act30"),
+        )
+        self.preloader.scan(map_data)
+        self.assertEqual(list(self.preloader.futures), ["maps/house.tmx", "maps/shop.tmx"])
+
+    def test_shutdown_drops_maps_and_stops_worker(self):
+        self.preloader.scan(make_map("maps/town.tmx", MapAction("teleport", ["house.tmx", "1", "2"], "act10")))
+        self.preloader.shutdown()
+        self.assertEqual(self.preloader.futures, {})
+        with self.assertRaises(RuntimeError):
+            self.preloader.executor.submit(print)
+
+    def test_failed_preload_returns_none(self):
+        self.load.side_effect = IOError
+        self.preloader.scan(make_map("maps/town.tmx", MapAction("teleport", ["house.tmx", "1", "2"], "act10")))
+        self.assertIsNone(self.preloader.get("maps/house.tmx"))
@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import patch
+
+import pygame
+
+from tuxemon.core.npc import get_sprite_set, sprite_sets
+
+
+class TestGetSpriteSet(unittest.TestCase):
+    def setUp(self):
+        sprite_sets_patcher = patch.dict(sprite_sets, clear=True)
+        load_patcher = patch("tuxemon.core.npc.load_and_scale", side_effect=lambda x: pygame.Surface((16, 32)))
+        sprite_sets_patcher.start()
+        self.load_and_scale = load_patcher.start()
+        self.addCleanup(sprite_sets_patcher.stop)
+        self.addCleanup(load_patcher.stop)
+
+    def test_images_are_loaded_once_per_sprite_name(self):
+        get_sprite_set("adventurer")
+        get_sprite_set("adventurer")
+        self.assertEqual(self.load_and_scale.call_count, 20)
+
+    def test_same_set_is_returned_for_sprite_name(self):
+        result0 = get_sprite_set("adventurer")
+        result1 = get_sprite_set("adventurer")
+        self.assertIs(result0, result1)
+
+    def test_sprite_names_have_different_sets(self):
+        result0 = get_sprite_set("adventurer")
+        result1 = get_sprite_set("catlady")
+        self.assertIsNot(result0.standing["front"], result1.standing["front"])
+
+    def test_animation_copy_shares_images(self):
+        animation = get_sprite_set("adventurer").animations["front_walk"]
+        copy = animation.getCopy()
+        self.assertIs(copy.getFrame(0), animation.getFrame(0))
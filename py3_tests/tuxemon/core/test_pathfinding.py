@@ -0,0 +1,227 @@
+import unittest
+from unittest.mock import Mock
+
+from tuxemon.core.map import CollisionGrid, OccupancyIndex
+from tuxemon.core.pathfinding import FlowField, FlowFields, Pathfinder
+
+
+class TestPathfinder(unittest.TestCase):
+    def test_path_is_reversed_and_excludes_start(self):
+        pathfinder = Pathfinder(CollisionGrid((4, 1), {}, set()))
+        result = pathfinder.find_path((0, 0), (3, 0))
+        self.assertEqual(result, [(3, 0), (2, 0), (1, 0)])
+
+    def test_path_to_start_is_empty(self):
+        pathfinder = Pathfinder(CollisionGrid((4, 1), {}, set()))
+        self.assertEqual(pathfinder.find_path((1, 0), (1, 0)), [])
+
+    def test_path_goes_around_collision(self):
+        collision_map = {(1, 0): None, (1, 1): None}
+        pathfinder = Pathfinder(CollisionGrid((3, 3), collision_map, set()))
+        result = pathfinder.find_path((0, 0), (2, 0))
+        self.assertEqual(len(result), 6)
+        self.assertNotIn((1, 0), result)
+
+    def test_path_goes_around_wall(self):
+        pathfinder = Pathfinder(CollisionGrid((2, 2), {}, {((0, 0), "right")}))
+        result = pathfinder.find_path((0, 0), (1, 0))
+        self.assertEqual(result, [(1, 0), (1, 1), (0, 1)])
+
+    def test_path_goes_around_occupied_tile(self):
+        pathfinder = Pathfinder(CollisionGrid((2, 2), {}, set()))
+        result = pathfinder.find_path((0, 0), (1, 0), {(1, 1), (0, 1)})
+        self.assertEqual(result, [(1, 0)])
+
+    def test_path_follows_continue_tile(self):
+        collision_map = {(1, 0): {"enter": ["left"], "exit": [], "continue": "down"}}
+        pathfinder = Pathfinder(CollisionGrid((3, 2), collision_map, set()))
+        result = pathfinder.find_path((0, 0), (2, 0))
+        self.assertEqual(result, [(2, 0), (2, 1), (1, 1), (1, 0)])
+
+    def test_blocked_destination_has_no_path(self):
+        pathfinder = Pathfinder(CollisionGrid((3, 3), {(2, 2): None}, set()))
+        self.assertIsNone(pathfinder.find_path((0, 0), (2, 2)))
+
+    def test_search_over_budget_has_no_path(self):
+        pathfinder = Pathfinder(CollisionGrid((10, 10), {}, set()))
+        self.assertIsNone(pathfinder.find_path((0, 0), (9, 9), max_nodes=5))
+
+    def test_path_across_large_open_map(self):
+        pathfinder = Pathfinder(CollisionGrid((100, 100), {}, set()))
+        self.assertEqual(len(pathfinder.find_path((0, 0), (99, 99))), 198)
+
+    def test_path_around_wall_of_large_map(self):
+        collision_map = {(50, y): None for y in range(99)}
+        pathfinder = Pathfinder(CollisionGrid((100, 100), collision_map, set()))
+        self.assertEqual(len(pathfinder.find_path((0, 0), (99, 0))), 99 + 2 * 99)
+
+    def test_open_map_search_expands_few_tiles(self):
+        pathfinder = Pathfinder(CollisionGrid((100, 100), {}, set()))
+        self.assertIsNotNone(pathfinder.find_path((0, 0), (99, 99), max_nodes=400))
+
+    def test_searches_do_not_share_state(self):
+        pathfinder = Pathfinder(CollisionGrid((4, 1), {}, set()))
+        pathfinder.find_path((0, 0), (3, 0))
+        result = pathfinder.find_path((3, 0), (0, 0))
+        self.assertEqual(result, [(0, 0), (1, 0), (2, 0)])
+
+
+class TestFlowField(unittest.TestCase):
+    def test_distance_is_number_of_steps(self):
+        field = FlowField(CollisionGrid((4, 4), {}, set()), (0, 0))
+        self.assertEqual(field.get_distance((3, 2)), 5)
+
+    def test_distance_goes_around_wall(self):
+        field = FlowField(CollisionGrid((2, 2), {}, {((0, 0), "right")}), (1, 0))
+        self.assertEqual(field.get_distance((0, 0)), 3)
+
+    def test_distance_follows_one_way_tile(self):
+        collision_map = {(1, 0): {"enter": ["left"], "exit": [], "continue": "down"}}
+        field = FlowField(CollisionGrid((3, 2), collision_map, set()), (2, 0))
+        self.assertEqual(field.get_distance((0, 0)), 4)
+
+    def test_distance_on_large_map(self):
+        field = FlowField(CollisionGrid((100, 100), {}, set()), (0, 0))
+        self.assertEqual(field.get_distance((99, 99)), 198)
+        self.assertEqual(len(field.get_path((99, 99))), 198)
+
+    def test_blocked_tile_has_no_distance(self):
+        field = FlowField(CollisionGrid((3, 1), {}, set()), (0, 0), {(1, 0)})
+        self.assertIsNone(field.get_distance((2, 0)))
+
+    def test_path_matches_pathfinder(self):
+        grid = CollisionGrid((3, 3), {(1, 0): None, (1, 1): None}, set())
+        field = FlowField(grid, (2, 0))
+        self.assertEqual(len(field.get_path((0, 0))), len(Pathfinder(grid).find_path((0, 0), (2, 0))))
+
+    def test_path_to_destination_is_empty(self):
+        field = FlowField(CollisionGrid((3, 3), {}, set()), (1, 1))
+        self.assertEqual(field.get_path((1, 1)), [])
+
+    def test_path_is_reversed_and_excludes_start(self):
+        field = FlowField(CollisionGrid((4, 1), {}, set()), (3, 0))
+        self.assertEqual(field.get_path((0, 0)), [(3, 0), (2, 0), (1, 0)])
+
+    def test_next_step_avoids_occupied_tile(self):
+        field = FlowField(CollisionGrid((3, 3), {}, set()), (2, 2))
+        self.assertEqual(field.next_step((1, 1), {(1, 2)}), (2, 1))
+
+    def test_path_is_none_when_all_steps_are_occupied(self):
+        field = FlowField(CollisionGrid((3, 1), {}, set()), (2, 0))
+        self.assertIsNone(field.get_path((0, 0), {(1, 0)}))
+
+
+class TestFlowFieldRepair(unittest.TestCase):
+    def setUp(self):
+        self.grid = CollisionGrid((5, 5), {(2, 1): None, (2, 2): None, (2, 3): None}, {((3, 4), "up")})
+
+    def assertSameAsBuilt(self, field, blocked):
+        built = FlowField(self.grid, field.dest, blocked)
+        self.assertEqual(list(field.distance), list(built.distance))
+
+    def test_blocking_tile_raises_distances_behind_it(self):
+        field = FlowField(self.grid, (4, 2))
+        field.set_blocked((2, 4), True)
+        self.assertSameAsBuilt(field, {(2, 4)})
+
+    def test_blocking_only_way_leaves_tiles_unreachable(self):
+        field = FlowField(CollisionGrid((4, 1), {}, set()), (3, 0))
+        field.set_blocked((2, 0), True)
+        self.assertIsNone(field.get_distance((0, 0)))
+
+    def test_unblocking_tile_lowers_distances(self):
+        field = FlowField(self.grid, (4, 2), {(2, 4), (2, 0)})
+        field.set_blocked((2, 4), False)
+        self.assertSameAsBuilt(field, {(2, 0)})
+
+    def test_blocking_and_unblocking_destination(self):
+        field = FlowField(self.grid, (4, 2))
+        field.set_blocked((4, 2), True)
+        self.assertIsNone(field.get_distance((4, 3)))
+        field.set_blocked((4, 2), False)
+        self.assertSameAsBuilt(field, set())
+
+    def test_blocking_tile_off_the_way_changes_nothing(self):
+        field = FlowField(self.grid, (0, 0))
+        distance = list(field.distance)
+        field.set_blocked((4, 4), True)
+        distance[4 * 5 + 4] = -1
+        self.assertEqual(list(field.distance), distance)
+
+    def test_collision_tile_is_not_blocked(self):
+        field = FlowField(CollisionGrid((3, 1), {(1, 0): {"enter": ["left", "right"], "exit": []}}, set()), (2, 0))
+        field.set_blocked((1, 0), True)
+        self.assertEqual(field.get_distance((0, 0)), 2)
+
+
+class TestFlowFields(unittest.TestCase):
+    def setUp(self):
+        self.occupancy = OccupancyIndex()
+        self.fields = FlowFields(CollisionGrid((5, 5), {}, set()), self.occupancy, 2)
+        self.occupancy.listeners.append(self.fields.occupancy_changed)
+
+    def test_field_is_shared(self):
+        self.assertIs(self.fields.get((0, 0)), self.fields.get((0, 0)))
+        self.assertEqual(self.fields.builds, 1)
+
+    def test_least_recently_used_field_is_dropped(self):
+        self.fields.get((0, 0))
+        self.fields.get((1, 0))
+        self.fields.get((0, 0))
+        self.fields.get((2, 0))
+        self.assertEqual(list(self.fields.fields), [(0, 0), (2, 0)])
+
+    def test_entity_blocks_field(self):
+        self.occupancy.add(Mock(tile_pos=(1, 0), pathfinding=None))
+        self.assertIn((1, 0), self.fields.get((0, 0)).blocked)
+
+    def test_entity_pathfinding_to_destination_does_not_block_field(self):
+        self.occupancy.add(Mock(tile_pos=(1, 0), pathfinding=(0, 0)))
+        self.assertEqual(self.fields.get((0, 0)).get_distance((1, 0)), 1)
+
+    def test_entity_entering_field_repairs_it(self):
+        field = self.fields.get((0, 0))
+        self.occupancy.add(Mock(tile_pos=(1, 0), pathfinding=None))
+        self.assertIs(self.fields.get((0, 0)), field)
+        self.assertEqual(field.get_distance((2, 0)), 4)
+
+    def test_entity_leaving_field_repairs_it(self):
+        npc = Mock(tile_pos=(1, 0), pathfinding=None)
+        self.occupancy.add(npc)
+        field = self.fields.get((0, 0))
+        npc.tile_pos = (4, 4)
+        self.occupancy.move(npc)
+        self.assertEqual(field.get_distance((2, 0)), 2)
+        self.assertEqual(self.fields.builds, 1)
+
+    def test_tile_stays_blocked_while_another_entity_is_on_it(self):
+        field = self.fields.get((0, 0))
+        npc = Mock(tile_pos=(1, 0), pathfinding=None)
+        self.occupancy.add(npc)
+        self.occupancy.add(Mock(tile_pos=(1, 0), pathfinding=None))
+        self.occupancy.remove(npc)
+        self.assertIn((1, 0), field.blocked)
+
+    def test_entity_pathfinding_to_destination_does_not_change_field(self):
+        field = self.fields.get((0, 0))
+        npc = Mock(tile_pos=(4, 4), pathfinding=(0, 0))
+        self.occupancy.add(npc)
+        npc.tile_pos = (3, 4)
+        self.occupancy.move(npc)
+        self.assertEqual(field.blocked, set())
+
+    def test_field_is_not_shared_by_one_entity(self):
+        self.occupancy.add(Mock(tile_pos=(4, 4), pathfinding=(0, 0)))
+        self.assertFalse(self.fields.is_shared((0, 0)))
+
+    def test_field_is_shared_by_several_entities(self):
+        self.occupancy.add(Mock(tile_pos=(4, 4), pathfinding=(0, 0)))
+        self.occupancy.add(Mock(tile_pos=(4, 3), pathfinding=(0, 0)))
+        self.assertTrue(self.fields.is_shared((0, 0)))
+
+    def test_start_of_path_does_not_block_field(self):
+        npc = Mock(tile_pos=(2, 0), pathfinding=None)
+        self.occupancy.add(npc)
+        self.fields.get((0, 0))
+        npc.pathfinding = (0, 0)
+        self.assertEqual(self.fields.get_path((2, 0), (0, 0)), [(0, 0), (1, 0)])
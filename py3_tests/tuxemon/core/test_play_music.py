@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from tuxemon.core.event.actions import play_music
+from tuxemon.core.event.actions.play_music import load_music
+
+
+class TestLoadMusic(unittest.TestCase):
+    def setUp(self):
+        resources_patcher = patch("tuxemon.core.event.actions.play_music.prepare.RESOURCES")
+        mixer_patcher = patch("tuxemon.core.event.actions.play_music.mixer")
+        music_file_patcher = patch("tuxemon.core.event.actions.play_music.music_file", None)
+        self.resources = resources_patcher.start()
+        self.mixer = mixer_patcher.start()
+        music_file_patcher.start()
+        self.addCleanup(resources_patcher.stop)
+        self.addCleanup(mixer_patcher.stop)
+        self.addCleanup(music_file_patcher.stop)
+        self.resources.is_packed.return_value = True
+        self.resources.open.side_effect = lambda path: Mock(name=path)
+
+    def test_packed_music_is_loaded_with_name_hint(self):
+        load_music("music/town.ogg")
+        self.mixer.music.load.assert_called_once_with(play_music.music_file, "ogg")
+
+    def test_previous_file_is_closed_when_next_is_loaded(self):
+        load_music("music/town.ogg")
+        previous_file = play_music.music_file
+        load_music("music/cave.ogg")
+        previous_file.close.assert_called_once_with()
+        play_music.music_file.close.assert_not_called()
+
+    def test_music_on_disk_closes_previous_file(self):
+        load_music("music/town.ogg")
+        previous_file = play_music.music_file
+        self.resources.is_packed.return_value = False
+        load_music("music/cave.ogg")
+        previous_file.close.assert_called_once_with()
+        self.mixer.music.load.assert_called_with("music/cave.ogg")
+        self.assertIsNone(play_music.music_file)
+
+    def test_file_is_closed_when_music_cannot_be_loaded(self):
+        fp = Mock()
+        self.resources.open.side_effect = None
+        self.resources.open.return_value = fp
+        self.mixer.music.load.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            load_music("music/town.ogg")
+        fp.close.assert_called_once_with()
+        self.assertIsNone(play_music.music_file)
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+
+from tuxemon.core.resources import ResourceIndex, ResourcePack, build_pack
+
+
+class TestResourceIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.mods_folder = self.temp_dir.name
+        self.make_file("base", "gfx", "tree.png")
+        self.make_file("base", "gfx", "rock.png")
+        self.make_file("custom", "gfx", "tree.png")
+        self.make_file("base", "animations", "water00.png")
+        self.make_file("base", "animations", "water01.png")
+        self.make_file("base", "animations", "waterfall00.png")
+        self.make_file("base", "animations", "grass2.png")
+        self.index = ResourceIndex(self.mods_folder, ["custom", "base"])
+
+    def make_file(self, *args):
+        path = os.path.join(self.mods_folder, *args)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write("")
+
+    def test_fetch_file_from_first_mod(self):
+        result = self.index.fetch(os.path.join("gfx", "tree.png"))
+        self.assertEqual(result, os.path.join(self.mods_folder, "custom", "gfx", "tree.png"))
+
+    def test_fetch_file_from_later_mod(self):
+        result = self.index.fetch(os.path.join("gfx", "rock.png"))
+        self.assertEqual(result, os.path.join(self.mods_folder, "base", "gfx", "rock.png"))
+
+    def test_fetch_folder(self):
+        result = self.index.fetch("animations")
+        self.assertEqual(result, os.path.join(self.mods_folder, "base", "animations"))
+
+    def test_fetch_missing_file_raises_io_error(self):
+        with self.assertRaises(IOError):
+            self.index.fetch(os.path.join("gfx", "missing.png"))
+
+    def test_fetch_new_file_after_invalidate(self):
+        self.index.fetch(os.path.join("gfx", "rock.png"))
+        self.make_file("base", "gfx", "bush.png")
+        self.index.invalidate()
+        result = self.index.fetch(os.path.join("gfx", "bush.png"))
+        self.assertEqual(result, os.path.join(self.mods_folder, "base", "gfx", "bush.png"))
+
+    def test_listdir_is_sorted(self):
+        directory = os.path.dirname(self.index.fetch(os.path.join("gfx", "rock.png")))
+        result = self.index.listdir(directory)
+        self.assertEqual(result, ["rock.png", "tree.png"])
+
+    def test_animation_frames_only_match_animation_name(self):
+        directory = self.index.fetch("animations")
+        result = self.index.animation_frames(directory, "water")
+        expected = [
+            os.path.join(directory, "water00.png"),
+            os.path.join(directory, "water01.png"),
+        ]
+        self.assertEqual(result, expected)
+
+    def test_animation_frames_for_name_ending_in_number(self):
+        directory = self.index.fetch("animations")
+        result = self.index.animation_frames(directory, "grass2")
+        self.assertEqual(result, [os.path.join(directory, "grass2.png")])
+
+
+class TestResourcePack(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.mods_folder = self.temp_dir.name
+        self.make_file(b"tree", "source", "gfx", "tree.png")
+        self.make_file(b"potion", "source", "db", "item", "potion.json")
+        self.make_file(b"font", "source", "font", "PressStart2P.ttf")
+        build_pack(os.path.join(self.mods_folder, "source"), os.path.join(self.mods_folder, "base.pack"))
+        self.make_file(b"loose rock", "base", "gfx", "rock.png")
+        self.index = ResourceIndex(self.mods_folder, ["base"])
+        self.addCleanup(self.index.invalidate)
+
+    def make_file(self, data, *args):
+        path = os.path.join(self.mods_folder, *args)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fp:
+            fp.write(data)
+
+    def test_read_packed_file(self):
+        pack = ResourcePack(os.path.join(self.mods_folder, "base.pack"))
+        self.addCleanup(pack.close)
+        with pack.open(os.path.join("gfx", "tree.png")) as fp:
+            self.assertEqual(fp.read(), b"tree")
+
+    def test_excluded_folders_are_not_packed(self):
+        pack = ResourcePack(os.path.join(self.mods_folder, "base.pack"))
+        self.addCleanup(pack.close)
+        self.assertEqual(list(pack.names()), [os.path.join("gfx", "tree.png")])
+
+    def test_open_file_which_is_not_pack_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            ResourcePack(os.path.join(self.mods_folder, "base", "gfx", "rock.png"))
+
+    def test_fetch_packed_file_from_mod_folder(self):
+        result = self.index.fetch(os.path.join("gfx", "tree.png"))
+        self.assertEqual(result, os.path.join(self.mods_folder, "base", "gfx", "tree.png"))
+
+    def test_open_packed_file(self):
+        with self.index.open(self.index.fetch(os.path.join("gfx", "tree.png"))) as fp:
+            self.assertEqual(fp.read(), b"tree")
+
+    def test_loose_file_overrides_packed_file(self):
+        self.make_file(b"stump", "base", "gfx", "tree.png")
+        path = self.index.fetch(os.path.join("gfx", "tree.png"))
+        self.assertFalse(self.index.is_packed(path))
+        with self.index.open(path) as fp:
+            self.assertEqual(fp.read(), b"stump")
+
+    def test_listdir_includes_packed_and_loose_files(self):
+        result = self.index.listdir(self.index.fetch("gfx"))
+        self.assertEqual(result, ["rock.png", "tree.png"])
+
+    def test_invalidate_while_packed_file_is_open(self):
+        fp = self.index.open(self.index.fetch(os.path.join("gfx", "tree.png")))
+        pack = self.index.packs[0]
+        self.index.invalidate()
+        self.assertFalse(pack.mmap.closed)
+        self.assertEqual(fp.read(), b"tree")
+        fp.close()
+        self.assertTrue(pack.mmap.closed)
@@ -0,0 +1,135 @@
+import io
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from tuxemon.core.event import EventObject, MapAction
+from tuxemon.core.map import CollisionGrid
+from tuxemon.core.map_loader import TMXMapLoader
+from tuxemon.core.route_planner import Door, RouteMap, RoutePlanner, get_doors, load_route_map
+
+TMX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.0" orientation="orthogonal" width="5" height="3" tilewidth="16" tileheight="16">
+ <objectgroup name="Events">
+  <object id="1" name="Collision" type="collision" x="16" y="0" width="16" height="16"/>
+  <object id="2" name="Teleport" type="event" x="64" y="32" width="16" height="16">
+   <properties>
+    <property name="act1" value="teleport house.tmx,1,2"/>
+   </properties>
+  </object>
+ </objectgroup>
+</map>
+"""
+
+
+def make_map(filename, size, *events):
+    return RouteMap(filename, list(events), CollisionGrid(size, {}, set()))
+
+
+def make_teleport(x, y, map_name, dest_x, dest_y):
+    action = MapAction("teleport", [map_name, str(dest_x), str(dest_y)], "act10")
+    return EventObject(1, "Teleport", x, y, 1, 1, [], [action])
+
+
+class TestGetDoors(unittest.TestCase):
+    def setUp(self):
+        fetch_patcher = patch("tuxemon.core.route_planner.prepare.fetch", side_effect=lambda *args: "/".join(args))
+        fetch_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+
+    def test_each_tile_of_event_is_a_door(self):
+        action = MapAction("teleport", ["house.tmx", "1", "2"], "act10")
+        event = EventObject(1, "Teleport", 3, 4, 2, 1, [], [action])
+        result = get_doors(make_map("maps/town.tmx", (8, 8), event))
+        self.assertEqual(result, [Door((3, 4), "maps/house.tmx", (1, 2)), Door((4, 4), "maps/house.tmx", (1, 2))])
+
+    def test_other_actions_are_ignored(self):
+        action = MapAction("play_music", ["town.ogg"], "act10")
+        event = EventObject(1, "Music", 3, 4, 1, 1, [], [action])
+        self.assertEqual(get_doors(make_map("maps/town.tmx", (8, 8), event)), [])
+
+    def test_invalid_teleport_is_ignored(self):
+        action = MapAction("teleport", ["house.tmx"], "act10")
+        event = EventObject(1, "Teleport", 3, 4, 1, 1, [], [action])
+        self.assertEqual(get_doors(make_map("maps/town.tmx", (8, 8), event)), [])
+
+
+class TestRoutePlanner(unittest.TestCase):
+    def setUp(self):
+        fetch_patcher = patch("tuxemon.core.route_planner.prepare.fetch", side_effect=lambda *args: "/".join(args))
+        fetch_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+        self.planner = RoutePlanner()
+
+    def test_route_on_same_map_has_one_leg(self):
+        self.planner.add_map(make_map("maps/town.tmx", (4, 1)))
+        result = self.planner.find_route("maps/town.tmx", (0, 0), "maps/town.tmx", (3, 0))
+        self.assertEqual([tuple(i) for i in result], [("maps/town.tmx", [(3, 0), (2, 0), (1, 0)])])
+
+    def test_route_through_door(self):
+        self.planner.add_map(make_map("maps/town.tmx", (4, 1), make_teleport(3, 0, "house.tmx", 0, 0)))
+        self.planner.add_map(make_map("maps/house.tmx", (3, 1)))
+        result = self.planner.find_route("maps/town.tmx", (0, 0), "maps/house.tmx", (2, 0))
+        self.assertEqual(
+            [tuple(i) for i in result],
+            [("maps/town.tmx", [(3, 0), (2, 0), (1, 0)]), ("maps/house.tmx", [(2, 0), (1, 0)])],
+        )
+
+    def test_route_through_far_door_of_large_map(self):
+        self.planner.add_map(make_map("maps/town.tmx", (100, 100), make_teleport(99, 99, "house.tmx", 0, 0)))
+        self.planner.add_map(make_map("maps/house.tmx", (3, 1)))
+        result = self.planner.find_route("maps/town.tmx", (0, 0), "maps/house.tmx", (2, 0))
+        self.assertEqual([len(leg.path) for leg in result], [198, 2])
+
+    def test_route_takes_shortest_door(self):
+        self.planner.add_map(make_map(
+            "maps/town.tmx", (5, 1),
+            make_teleport(0, 0, "house.tmx", 0, 0),
+            make_teleport(4, 0, "house.tmx", 9, 0),
+        ))
+        self.planner.add_map(make_map("maps/house.tmx", (10, 1)))
+        result = self.planner.find_route("maps/town.tmx", (3, 0), "maps/house.tmx", (8, 0))
+        self.assertEqual(result[0].path, [(4, 0)])
+
+    def test_path_does_not_cross_other_doors(self):
+        self.planner.add_map(make_map("maps/town.tmx", (3, 2), make_teleport(1, 0, "house.tmx", 0, 0)))
+        self.planner.add_map(make_map("maps/house.tmx", (1, 1)))
+        result = self.planner.find_route("maps/town.tmx", (0, 0), "maps/town.tmx", (2, 0))
+        self.assertNotIn((1, 0), result[0].path)
+
+    def test_unreachable_map_has_no_route(self):
+        self.planner.add_map(make_map("maps/town.tmx", (4, 1)))
+        self.planner.add_map(make_map("maps/house.tmx", (3, 1)))
+        self.assertIsNone(self.planner.find_route("maps/town.tmx", (0, 0), "maps/house.tmx", (2, 0)))
+
+    def test_distances_of_entrances_are_built(self):
+        self.planner.add_map(make_map("maps/town.tmx", (4, 1), make_teleport(3, 0, "house.tmx", 0, 0)))
+        self.planner.add_map(make_map("maps/house.tmx", (3, 1), make_teleport(2, 0, "town.tmx", 2, 0)))
+        self.planner.build()
+        self.assertEqual(self.planner.distances[("maps/town.tmx", (2, 0))], [(Door((3, 0), "maps/house.tmx", (0, 0)), 1)])
+
+
+class TestLoadRouteMap(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        open_patcher = patch("tuxemon.core.route_planner.prepare.RESOURCES.open", side_effect=lambda x: io.BytesIO(TMX))
+        cache_patcher = patch("tuxemon.core.map_loader.paths.USER_GAME_CACHE_DIR", self.temp_dir.name)
+        open_patcher.start()
+        cache_patcher.start()
+        self.addCleanup(open_patcher.stop)
+        self.addCleanup(cache_patcher.stop)
+
+    def test_grid_has_size_and_collisions_of_map(self):
+        result = load_route_map("maps/town.tmx")
+        self.assertEqual((result.collision_grid.width, result.collision_grid.height), (5, 3))
+        self.assertTrue(result.collision_grid.has_collision((1, 0)))
+
+    def test_events_are_loaded(self):
+        result = load_route_map("maps/town.tmx")
+        self.assertEqual(result.events[0].acts[0].type, "teleport")
+
+    def test_images_are_not_loaded(self):
+        with patch.object(TMXMapLoader, "load_tiled_map", wraps=TMXMapLoader.load_tiled_map) as load_tiled_map:
+            load_route_map("maps/town.tmx")
+        load_tiled_map.assert_called_once_with("maps/town.tmx", TMX, images=False)
@@ -0,0 +1,28 @@
+import unittest
+
+from tuxemon.core.session import GameVariables
+
+
+class TestGameVariables(unittest.TestCase):
+    def setUp(self):
+        self.variables = GameVariables(steps=0)
+        self.variables.changed.clear()
+
+    def test_initial_keys_are_changed(self):
+        self.assertEqual(GameVariables(steps=0).changed, {"steps"})
+
+    def test_set_key_is_changed(self):
+        self.variables["door"] = "open"
+        self.assertEqual(self.variables.changed, {"door"})
+
+    def test_deleted_key_is_changed(self):
+        del self.variables["steps"]
+        self.assertEqual(self.variables.changed, {"steps"})
+
+    def test_updated_keys_are_changed(self):
+        self.variables.update({"door": "open"}, steps=1)
+        self.assertEqual(self.variables.changed, {"door", "steps"})
+
+    def test_existing_key_is_not_changed_by_setdefault(self):
+        self.variables.setdefault("steps", 5)
+        self.assertEqual(self.variables.changed, set())
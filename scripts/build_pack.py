@@ -0,0 +1,38 @@
+"""
+
+Build a resource pack from a mod folder
+
+All files of the mod are stored in one file, which the game reads through
+a memory map.  Place the pack next to the mod folder, named like the folder
+with a ".pack" extension.  Loose files in the mod folder will still override
+the packed ones, so they may be deleted, or kept for development.
+
+The "db", "font" and "l18n" folders are not packed, and must be kept in the
+mod folder.
+
+
+USAGE
+
+python scripts/build_pack.py mods/tuxemon mods/tuxemon.pack
+
+"""
+import logging
+
+import click
+
+from tuxemon.core.resources import build_pack
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__file__)
+
+
+@click.command()
+@click.argument("folder", type=click.Path(exists=True, file_okay=False))
+@click.argument("filename", type=click.Path(dir_okay=False))
+def click_shim(folder, filename):
+    count = build_pack(folder, filename)
+    logger.info("packed %d files from %s into %s", count, folder, filename)
+
+
+if __name__ == "__main__":
+    click_shim()
@@ -54,6 +54,12 @@ USER_GAME_DATA_DIR = os.path.join(USER_GAME_DIR, "data")
 # game savegame dir
 USER_GAME_SAVE_DIR = os.path.join(USER_GAME_DIR, "saves")
 
+# game cache dir, contents can be deleted and will be rebuilt
+USER_GAME_CACHE_DIR = os.path.join(USER_GAME_DIR, "cache")
+
+# event engine profile, written on exit when enabled
+USER_EVENT_PROFILE_PATH = os.path.join(USER_GAME_DIR, "event_profile.json")
+
 # mods
 mods_folder = os.path.normpath(os.path.join(BASEDIR, "..", "mods"))
 
@@ -1,9 +1,9 @@
 import logging
-import os.path
 
 import pygame
 from pygame import mixer
 
+from tuxemon.core import prepare
 from tuxemon.core.db import db
 from tuxemon.core.tools import transform_resource_filename
 
@@ -31,12 +31,15 @@ def load_sound(slug):
 
     # on some platforms, pygame will silently fail loading
     # a sound if the filename is incorrect so we check here
-    if not os.path.exists(filename):
+    if not prepare.RESOURCES.exists(filename):
         msg = 'audio file does not exist: {}'.format(filename)
         logger.error(msg)
         return DummySound()
 
     try:
+        if prepare.RESOURCES.is_packed(filename):
+            with prepare.RESOURCES.open(filename) as fp:
+                return mixer.Sound(file=fp)
         return mixer.Sound(filename)
     except MemoryError:
         # raised on some systems if there is no mixer
@@ -38,6 +38,10 @@ import logging
 import pprint
 from threading import Thread
 
+from tuxemon.constants import paths
+from tuxemon.core import prepare
+from tuxemon.core.route_planner import RoutePlanner
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,6 +75,7 @@ class CommandLine(cmd.Cmd):
         # start the CLI in a separate thread
 
         self.app = app
+        self.route_planner = None
         self.cmd_thread = Thread(target=self.cmdloop)
         self.cmd_thread.daemon = True
         self.cmd_thread.start()
@@ -160,6 +165,108 @@ class CommandLine(cmd.Cmd):
         self.pp.pprint(self.__dict__)
         code.interact(local=locals())
 
+    def do_route(self, line):
+        """Print the shortest route between two tiles, which may be on different maps.
+        All maps are loaded the first time this is used.
+
+        Usage: route <map name> <x> <y> <map name> <x> <y>
+
+        :param line: The map names and tile positions.
+
+        :rtype: None
+        :returns: None
+
+        """
+        try:
+            start_map, start_x, start_y, dest_map, dest_x, dest_y = line.split()
+            start = int(start_x), int(start_y)
+            dest = int(dest_x), int(dest_y)
+            start_filename = prepare.fetch("maps", start_map)
+            dest_filename = prepare.fetch("maps", dest_map)
+        except (IOError, ValueError):
+            print("Usage: route <map name> <x> <y> <map name> <x> <y>")
+            return
+
+        if self.route_planner is None:
+            self.route_planner = RoutePlanner()
+            self.route_planner.load_maps()
+
+        route = self.route_planner.find_route(start_filename, start, dest_filename, dest)
+        if route is None:
+            print("No route found")
+            return
+
+        for leg in route:
+            print("{}: {}".format(leg.filename, list(reversed(leg.path))))
+
+    def do_trace(self, line):
+        """Record what the event engine does, and print the latest records.
+
+        Usage: trace on | off | clear | dump [count]
+
+        :param line: The trace command.
+
+        :rtype: None
+        :returns: None
+
+        """
+        trace = self.app.event_engine.trace
+        args = line.split()
+        command = args[0] if args else "dump"
+
+        if command == "on":
+            trace.enabled = True
+        elif command == "off":
+            trace.enabled = False
+        elif command == "clear":
+            trace.clear()
+        elif command == "dump":
+            try:
+                count = int(args[1]) if len(args) > 1 else None
+            except ValueError:
+                print("Usage: trace dump [count]")
+                return
+            for record in trace.dump(count):
+                print(record)
+        else:
+            print("Usage: trace on | off | clear | dump [count]")
+
+    def do_profile(self, line):
+        """Time the conditions and actions of map events, and print the totals.
+
+        Usage: profile on | off | clear | show [count] | save [filename]
+
+        :param line: The profile command.
+
+        :rtype: None
+        :returns: None
+
+        """
+        profiler = self.app.event_engine.profiler
+        args = line.split()
+        command = args[0] if args else "show"
+
+        if command == "on":
+            profiler.enabled = True
+        elif command == "off":
+            profiler.enabled = False
+        elif command == "clear":
+            profiler.clear()
+        elif command == "show":
+            try:
+                count = int(args[1]) if len(args) > 1 else None
+            except ValueError:
+                print("Usage: profile show [count]")
+                return
+            for text in profiler.get_lines(count):
+                print(text)
+        elif command == "save":
+            filename = args[1] if len(args) > 1 else paths.USER_EVENT_PROFILE_PATH
+            profiler.save(filename)
+            print("Saved to {}".format(filename))
+        else:
+            print("Usage: profile on | off | clear | show [count] | save [filename]")
+
     def postcmd(self, stop, line):
         """If the application has exited, exit here as well.
 
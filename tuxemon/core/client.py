@@ -132,6 +132,7 @@ class Client(StateManager):
         self.interacts = map_data.interacts
         self.event_engine.reset()
         self.event_engine.current_map = map_data
+        self.event_engine.compile_events(self.events + self.inits + self.interacts)
 
     def draw_event_debug(self):
         """ Very simple overlay of event data.  Needs some love.
@@ -394,8 +395,7 @@ class Client(StateManager):
         if not world:
             return
 
-        world.npcs = {}
-        world.npcs_off_map = {}
+        world.clear_entities()
         for client in registry:
             if "sprite" in registry[client]:
                 sprite = registry[client]["sprite"]
@@ -405,7 +405,7 @@ class Client(StateManager):
                 # Add the player to the screen if they are on the same map.
                 if client_map == current_map:
                     if sprite.slug not in world.npcs:
-                        world.npcs[sprite.slug] = sprite
+                        world.add_entity(sprite)
                     if sprite.slug in world.npcs_off_map:
                         del world.npcs_off_map[sprite.slug]
 
@@ -414,7 +414,7 @@ class Client(StateManager):
                     if sprite.slug not in world.npcs_off_map:
                         world.npcs_off_map[sprite.slug] = sprite
                     if sprite.slug in world.npcs:
-                        del world.npcs[sprite]
+                        world.remove_entity(sprite.slug)
 
     def get_map_filepath(self):
         """Gets the filepath of the current map
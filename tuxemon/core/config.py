@@ -89,6 +89,16 @@ class TuxemonConfig(object):
         self.net_controller_enabled = cfg.getboolean("game", "net_controller_enabled")
         self.locale = cfg.get("game", "locale")
         self.dev_tools = cfg.getboolean("game", "dev_tools")
+        # How database and locale JSON files are read: "sequential",
+        # "thread" or "process".  Pools may help large modded installs.
+        self.json_loader = cfg.get("game", "json_loader")
+        # Megabytes of loaded images which are kept for reuse
+        self.surface_cache_size = cfg.getint("game", "surface_cache_size")
+        # Megabytes of recently visited maps which are kept loaded
+        self.map_cache_size = cfg.getint("game", "map_cache_size")
+        # Time the conditions and actions of map events, and save the
+        # totals to event_profile.json in the user directory on exit
+        self.event_profile = cfg.getboolean("game", "event_profile")
         
         # [gameplay]
         self.items_consumed_on_failure = cfg.getboolean("gameplay", "items_consumed_on_failure")
@@ -155,6 +165,10 @@ def get_defaults():
             ("net_controller_enabled", False),
             ("locale", "en_US"),
             ("dev_tools", False),
+            ("json_loader", "sequential"),
+            ("surface_cache_size", 64),
+            ("map_cache_size", 32),
+            ("event_profile", False),
         ))),
         ("gameplay", OrderedDict((
             ("items_consumed_on_failure", True),
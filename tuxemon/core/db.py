@@ -33,15 +33,26 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import hashlib
+import io
 import json
 import logging
 import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
 from operator import itemgetter
+from types import MappingProxyType
 
+from tuxemon.constants import paths
 from tuxemon.core import prepare
 
 logger = logging.getLogger(__name__)
 
+# Increment when the layout of the database snapshot changes
+SNAPSHOT_VERSION = 2
+
 
 def process_targets(json_targets):
     """ Return values in order of preference for targeting things.
@@ -55,52 +66,357 @@ def process_targets(json_targets):
     return list(map(itemgetter(0), filter(itemgetter(1), sorted(json_targets.items(), key=itemgetter(1), reverse=True))))
 
 
+def index_values(key):
+    """ Return function which gets the values of a record to index on.
+
+    Lists will return each item.  Strings are lowercase, so searching
+    is not case-sensitive.
+
+    :param key: Key of the record
+    :type key: String
+
+    :rtype: Callable
+    """
+
+    def get_values(record):
+        value = record.get(key)
+        if value is None:
+            return ()
+        if not isinstance(value, list):
+            value = [value]
+        return [normalize_index_value(i) for i in value]
+
+    return get_values
+
+
+def index_nested_values(key, nested_key):
+    """ Return function which gets values from a list of objects in a record.
+
+    For example, the "monster" of each entry of an encounter.
+
+    :param key: Key of the list in the record
+    :param nested_key: Key of each object in the list
+    :type key: String
+    :type nested_key: String
+
+    :rtype: Callable
+    """
+
+    def get_values(record):
+        return [
+            normalize_index_value(i[nested_key])
+            for i in record.get(key) or ()
+            if i.get(nested_key) is not None
+        ]
+
+    return get_values
+
+
+def freeze(value):
+    """ Return a read-only version of a record, or of a value in it
+
+    Dictionaries become read-only views and lists become tuples, at every
+    level, so callers cannot change the records shared by the database.
+
+    :param value: Record or value loaded from JSON
+    :rtype: Any
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def normalize_index_value(value):
+    """ Make index values case-insensitive
+
+    :rtype: Any
+    """
+    try:
+        return value.lower()
+    except AttributeError:
+        return value
+
+
+# table => field name => function to get values that a record is indexed by
+index_fields = {
+    "monster": {
+        "types": index_values("types"),
+        "shape": index_values("shape"),
+        "evolution": index_nested_values("evolutions", "monster_slug"),
+    },
+    "technique": {
+        "types": index_values("types"),
+        "range": index_values("range"),
+        "sort": index_values("sort"),
+        "category": index_values("category"),
+    },
+    "item": {
+        "usable_in": index_values("usable_in"),
+    },
+    "encounter": {
+        "monster": index_nested_values("monsters", "monster"),
+    },
+    "npc": {
+        "monster": index_nested_values("monsters", "monster"),
+    },
+}
+
+
+class DatabaseTables(dict):
+    """Dictionary of database tables which are loaded when first accessed.
+
+    Works like a normal dictionary, but accessing a table which has not
+    been loaded yet with ``tables[name]`` will load it.
+
+    """
+
+    def __init__(self, loader):
+        super(DatabaseTables, self).__init__()
+        self.loader = loader
+
+    def __missing__(self, table):
+        return self.loader(table)
+
+
 class JSONDatabase(object):
     """Handles connecting to the game database for resources such as monsters,
     stats, etc.
 
+    Tables are loaded from disk the first time they are used.  Use
+    JSONDatabase.preload to load tables ahead of time.
+
     """
+    tables = (
+        "item",
+        "monster",
+        "npc",
+        "technique",
+        "encounter",
+        "inventory",
+        "environment",
+        "sounds",
+        "music",
+    )
 
     def __init__(self, dir=None):
         self.path = None
-        self.database = {
-            "item": {},
-            "monster": {},
-            "npc": {},
-            "technique": {},
-            "encounter": {},
-            "inventory": {},
-            "environment": {},
-            "sounds": {},
-            "music" : {}
-        }
+        self.database = DatabaseTables(self.load_table)
+        self.views = dict()
+        self.indexes = dict()
         if dir:
             self.load(dir)
 
-    def load(self, directory="all"):
-        """Loads all data from JSON files located under our data path.
+    def load(self, directory=None):
+        """Prepares the database to load data from JSON files under our data path.
+
+        Tables are not loaded here unless requested; they will be loaded
+        when they are first accessed.
 
-        :param directory: The directory under resources/db/ to load. Defaults
-            to "all".
+        :param directory: The directory under resources/db/ to load now, or
+            "all" to load every table.  Defaults to None.
         :type directory: String
 
         :returns: None
 
         """
-
         self.path = prepare.fetch("db")
+        self.database.clear()
+        self.views.clear()
+        self.indexes.clear()
         if directory == "all":
-            self.load_json("item")
-            self.load_json("monster")
-            self.load_json("npc")
-            self.load_json("technique")
-            self.load_json("encounter")
-            self.load_json("inventory")
-            self.load_json("environment")
-            self.load_json("sounds")
-            self.load_json("music")
-        else:
-            self.load_json(directory)
+            self.preload(self.tables)
+        elif directory:
+            self.preload([directory])
+
+    def preload(self, tables):
+        """Loads tables now, instead of when they are first used.
+
+        :param tables: Names of the tables to load.
+        :type tables: List
+
+        :returns: None
+
+        """
+        for table in tables:
+            if table not in self.database:
+                self.load_table(table)
+
+    def load_table(self, table):
+        """Loads a table from a snapshot or the JSON files under our data path.
+
+        :param table: The directory under resources/db/ to load.
+        :type table: String
+
+        :rtype: Dict
+        :returns: The loaded table
+
+        """
+        if table not in self.tables:
+            raise KeyError(table)
+
+        if self.path is None:
+            self.path = prepare.fetch("db")
+
+        logger.debug("loading database table {}".format(table))
+        self.database[table] = dict()
+        self.views.pop(table, None)
+
+        # the snapshot is only valid if no json file has been changed since
+        # it was written.  if anything changed, parse the json and rebuild it.
+        snapshot_path = get_snapshot_path(self.path, [table])
+        fingerprint = self.fingerprint([table])
+        if not self.load_snapshot(snapshot_path, fingerprint):
+            try:
+                self.load_json(table)
+            except Exception:
+                # don't leave a partially loaded table behind
+                del self.database[table]
+                raise
+            self.save_snapshot(snapshot_path, fingerprint, [table])
+
+        self.build_indexes(table)
+        return self.database[table]
+
+    def build_indexes(self, table):
+        """Builds the indexes used by JSONDatabase.query for a table.
+
+        :param table: The table to index.
+        :type table: String
+
+        :returns: None
+
+        """
+        indexes = dict()
+        for field, get_values in index_fields.get(table, {}).items():
+            index = dict()
+            for slug, record in self.database[table].items():
+                for value in get_values(record):
+                    index.setdefault(value, list()).append(slug)
+            indexes[field] = {value: tuple(slugs) for value, slugs in index.items()}
+        self.indexes[table] = indexes
+
+    def query(self, table, field, value):
+        """Returns slugs of the records where the field has a value.
+
+        Only fields listed in db.index_fields may be used.  For list fields,
+        like monster "types", records with the value anywhere in the list
+        will be returned.  Strings are not case-sensitive.
+
+        >>> db.query("monster", "types", "water")
+        ('bigfin', 'dollfin', ...)
+
+        :param table: The table to search in, such as "monster"
+        :param field: The indexed field, such as "types"
+        :param value: The value to search for
+        :type table: String
+        :type field: String
+
+        :rtype: Tuple
+        :returns: Slugs of the matching records, or an empty tuple
+
+        """
+        # make sure the table, and so its indexes, are loaded
+        self.database[table]
+        return self.indexes[table][field].get(normalize_index_value(value), ())
+
+    def referenced_by(self, monster_slug):
+        """Finds encounter tables and NPC parties that use a monster.
+
+        :param monster_slug: Slug of the monster
+        :type monster_slug: String
+
+        :rtype: Dict
+        :returns: Dictionary of table name => tuple of slugs
+
+        """
+        return {
+            "encounter": self.query("encounter", "monster", monster_slug),
+            "npc": self.query("npc", "monster", monster_slug),
+        }
+
+    def fingerprint(self, directories):
+        """Returns a summary of the JSON files used to build the tables.
+
+        The names, sizes and modification times of every file are included,
+        so any edit to the source data will result in a different value.
+
+        :param directories: The directories under resources/db/ to check.
+        :type directories: List
+
+        :rtype: List
+        :returns: List of (directory, filename, mtime, size) tuples
+
+        """
+        fingerprint = []
+        for directory in directories:
+            for entry in sorted(os.scandir(os.path.join(self.path, directory)), key=lambda i: i.name):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    fingerprint.append((directory, entry.name, stat.st_mtime_ns, stat.st_size))
+        return fingerprint
+
+    def load_snapshot(self, snapshot_path, fingerprint):
+        """Loads tables from a snapshot file, if it matches the fingerprint.
+
+        :param snapshot_path: Path of the snapshot file.
+        :param fingerprint: Fingerprint of the current JSON files.
+        :type snapshot_path: String
+        :type fingerprint: List
+
+        :rtype: Bool
+        :returns: True if the tables were loaded from the snapshot
+
+        """
+        try:
+            with open(snapshot_path, "rb") as fp:
+                snapshot = pickle.load(fp)
+        except FileNotFoundError:
+            return False
+        except Exception:
+            logger.warning("unable to read database snapshot {}, rebuilding".format(snapshot_path))
+            return False
+
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("fingerprint") != fingerprint:
+            logger.debug("database snapshot is stale, rebuilding")
+            return False
+
+        self.database.update(snapshot["database"])
+        logger.debug("loaded database from snapshot {}".format(snapshot_path))
+        return True
+
+    def save_snapshot(self, snapshot_path, fingerprint, directories):
+        """Saves tables to a snapshot file, so the next start is faster.
+
+        Failure to write the snapshot is not an error; the database will
+        just be loaded from the JSON files next time.
+
+        :param snapshot_path: Path of the snapshot file.
+        :param fingerprint: Fingerprint of the current JSON files.
+        :param directories: Tables to save in the snapshot.
+        :type snapshot_path: String
+        :type fingerprint: List
+        :type directories: List
+
+        :returns: None
+
+        """
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "fingerprint": fingerprint,
+            "database": {table: self.database[table] for table in directories},
+        }
+
+        # write to a temporary file first, so an interrupted write
+        # will never leave a partial snapshot to be loaded later
+        temp_path = snapshot_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as fp:
+                pickle.dump(snapshot, fp, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, snapshot_path)
+        except (IOError, OSError):
+            logger.warning("unable to write database snapshot {}".format(snapshot_path))
 
 
     def load_json(self, directory):
@@ -113,20 +429,15 @@ class JSONDatabase(object):
 
         """
 
-        for json_item in os.listdir(os.path.join(self.path, directory)):
-
-            # Only load .json files.
-            if not json_item.endswith(".json"):
-                continue
-
-            # Load our json as a dictionary.
-            with open(os.path.join(self.path, directory, json_item)) as fp:
-                try:
-                    item = json.load(fp)
-                except ValueError:
-                    logger.error("invalid JSON " + json_item)
-                    raise
+        # Only load .json files.  Sorted, so duplicate slugs are always
+        # reported the same way, no matter how the files are read.
+        filenames = [
+            os.path.join(self.path, directory, json_item)
+            for json_item in sorted(os.listdir(os.path.join(self.path, directory)))
+            if json_item.endswith(".json")
+        ]
 
+        for item in read_json_files(filenames):
             if type(item) is list:
                 for sub in item:
                     self.load_dict(sub, directory)
@@ -136,6 +447,9 @@ class JSONDatabase(object):
     def load_dict(self, item, table):
         """Loads a single json object as a dictionary and adds it to the appropriate db table
 
+        Default values are applied to the object here, once, so lookups
+        do not need to do it again.
+
         :param item: The json object to load in
         :type item: dict
         :param table: The db table to load the object into
@@ -146,28 +460,40 @@ class JSONDatabase(object):
         """
 
         if item['slug'] not in self.database[table]:
-            self.database[table][item['slug']] = item
+            self.database[table][item['slug']] = set_defaults(item, table)
         else:
             logger.error(item, json)
             raise Exception("Error: Item with this slug was already loaded.")
 
-    def lookup(self, slug, table="monster"):
+    def lookup(self, slug, table="monster", copy=False):
         """Looks up a monster, technique, item, or npc based on slug.
 
+        The record is shared by every caller, so it is returned read-only:
+        dictionaries are read-only views and lists are tuples, at every level.
+        If you need to change the record, pass copy=True to get a private
+        copy instead.
+
         :param slug: The slug of the monster, technique, item, or npc.  A short English identifier.
         :param table: Which index to do the search in. Can be: "monster",
             "item", "npc", or "technique".
+        :param copy: Return a copy of the record which may be changed
         :type slug: String
         :type table: String
+        :type copy: Bool
 
-        :rtype: Dict
+        :rtype: Mapping
         :returns: A dictionary from the resulting lookup.
 
         """
-        return set_defaults(
-            self.database[table][slug],
-            table
-        )
+        if copy:
+            return deepcopy(self.database[table][slug])
+
+        try:
+            return self.views[table][slug]
+        except KeyError:
+            view = freeze(self.database[table][slug])
+            self.views.setdefault(table, dict())[slug] = view
+            return view
 
     def lookup_file(self, table, slug):
         """Does a lookup with the given slug in the given table, expecting a dictionary with two keys, 'slug' and 'file'
@@ -210,7 +536,124 @@ class JSONDatabase(object):
         return results
 
 
+def read_json_file(filename):
+    """Reads and decodes a single JSON file.
+
+    :param filename: Path of the file to read.
+    :type filename: String
+
+    :rtype: Tuple
+    :returns: The decoded data and the cpu time spent reading it
+
+    """
+    start = time.thread_time()
+    with io.open(filename, "r", encoding="UTF-8") as fp:
+        try:
+            data = json.load(fp)
+        except ValueError:
+            logger.error("invalid JSON " + filename)
+            raise
+    return data, time.thread_time() - start
+
+
+def try_read_json_file(filename):
+    """Reads and decodes a single JSON file, returning any error.
+
+    Errors are returned instead of raised, so one bad file does not stop
+    a pool from reading the others.
+
+    :param filename: Path of the file to read.
+    :type filename: String
+
+    :rtype: Tuple
+    :returns: The decoded data or the error, and the cpu time spent
+
+    """
+    try:
+        return read_json_file(filename)
+    except (IOError, ValueError) as e:
+        return e, 0.0
+
+
+def read_json_files(filenames, skip_errors=False):
+    """Reads and decodes JSON files, using a pool of workers if configured.
+
+    The "json_loader" config option selects how files are read; one at a
+    time, or spread over a thread or process pool.  Results are always
+    returned in the same order as the filenames.
+
+    :param filenames: Paths of the files to read.
+    :param skip_errors: If True, files which cannot be read are logged
+        and left out of the results, instead of raising an error.
+    :type filenames: List
+    :type skip_errors: Boolean
+
+    :rtype: List
+    :returns: The decoded data of each file
+
+    """
+    loader = prepare.CONFIG.json_loader
+    reader = try_read_json_file if skip_errors else read_json_file
+    start = time.time()
+
+    if loader == "thread" and len(filenames) > 1:
+        with ThreadPoolExecutor() as executor:
+            results = list(executor.map(reader, filenames))
+    elif loader == "process" and len(filenames) > 1:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(reader, filenames, chunksize=16))
+    else:
+        loader = "sequential"
+        results = [reader(filename) for filename in filenames]
+
+    if skip_errors:
+        valid = list()
+        for filename, (data, duration) in zip(filenames, results):
+            if isinstance(data, Exception):
+                logger.error("Unable to load {}: {}".format(filename, data))
+            else:
+                valid.append((data, duration))
+        results = valid
+
+    # the cpu time spent on each file is about what a sequential load
+    # would take, so comparing it to the elapsed time estimates the speedup
+    elapsed = time.time() - start
+    work = sum(duration for data, duration in results)
+    if elapsed > 0:
+        logger.debug("read {} json files in {:.1f}ms ({}, {:.2f}x estimated speedup)".format(
+            len(filenames), elapsed * 1000, loader, work / elapsed))
+
+    return [data for data, duration in results]
+
+
+def get_snapshot_path(db_path, directories):
+    """Returns the path of the snapshot file for a set of tables.
+
+    Each database path (which depends on the enabled mods) and set of
+    tables will have its own snapshot file.
+
+    :param db_path: Path of the database folder.
+    :param directories: Tables stored in the snapshot.
+    :type db_path: String
+    :type directories: List
+
+    :rtype: String
+    """
+    key = "{}:{}".format(os.path.abspath(db_path), ",".join(directories))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(paths.USER_GAME_CACHE_DIR, "db-{}.pickle".format(digest))
+
+
 def set_defaults(results, table):
+    """Fills in default values of a record.  Called once, when it is loaded.
+
+    :param results: Record loaded from the JSON files
+    :param table: Table the record belongs to
+    :type results: Dict
+    :type table: String
+
+    :rtype: Dict
+    """
     if table == "monster":
         name = results['slug']
 
@@ -67,6 +67,8 @@ class Entity(object):
         :return:
         """
         self.tile_pos = proj(self.position3)
+        if self.world is not None:
+            self.world.occupancy.move(self)
 
     def update_physics(self, td):
         """ Move the entity according to the movement vector
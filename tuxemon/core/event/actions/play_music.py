@@ -25,6 +25,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import logging
+import os.path
 
 from tuxemon.core import prepare
 from tuxemon.core.db import db
@@ -33,6 +34,35 @@ from tuxemon.core.platform import mixer
 
 logger = logging.getLogger(__name__)
 
+# file of the packed music which is streamed, closed when the next one is loaded
+music_file = None
+
+
+def load_music(path):
+    """ Load a music file, either from disk or from a resource pack
+
+    :param str path: Path of the music file
+    :return: None
+    """
+    global music_file
+
+    if prepare.RESOURCES.is_packed(path):
+        # the file object must stay open while the music is streamed, and
+        # pygame cannot tell its format without the extension
+        fp = prepare.RESOURCES.open(path)
+        try:
+            mixer.music.load(fp, os.path.splitext(path)[1].lstrip("."))
+        except Exception:
+            fp.close()
+            raise
+    else:
+        fp = None
+        mixer.music.load(path)
+
+    if music_file is not None:
+        music_file.close()
+    music_file = fp
+
 
 class PlayMusicAction(EventAction):
     """Plays a music file from "resources/music/"
@@ -49,7 +79,7 @@ class PlayMusicAction(EventAction):
         
         try:
             path = prepare.fetch("music", db.lookup_file("music", filename))
-            mixer.music.load(path)
+            load_music(path)
             mixer.music.set_volume(prepare.CONFIG.music_volume)
             mixer.music.play(-1)
         except Exception as e:
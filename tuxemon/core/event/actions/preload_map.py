@@ -53,7 +53,7 @@ class PreloadMapAction(EventAction):
         # Get the map name to preload
         mapname = prepare.fetch("maps", str(self.parameters[0]))
 
-        if mapname not in world.preloaded_maps.keys():
+        if mapname not in world.preloaded_maps:
             # TODO: We should do this asyncronously?
             logger.debug("preloading map: {}".format(mapname))
             world.preload_map(mapname)
@@ -32,6 +32,7 @@ class ButtonPressedCondition(EventCondition):
     """ Checks to see if a particular key was pressed
     """
     name = "button_pressed"
+    inputs = ("buttons",)
 
     def test(self, session,  condition):
         """ Checks to see if a particular key was pressed
@@ -31,6 +31,7 @@ class CombatStartedCondition(EventCondition):
     """ Checks to see if combat has been started or not.
     """
     name = "combat_started"
+    inputs = ("states",)
 
     def test(self, session,  condition):
         """ Checks to see if combat has been started or not.
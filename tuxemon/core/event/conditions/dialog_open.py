@@ -31,6 +31,7 @@ class DialogOpenCondition(EventCondition):
     """ Checks to see if a dialog window is open.
     """
     name = "dialog_open"
+    inputs = ("states",)
 
     def test(self, session,  condition):
         """ Checks to see if a dialog window is open.
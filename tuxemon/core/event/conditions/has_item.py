@@ -56,6 +56,12 @@ class HasItemCondition(EventCondition):
     """
     name = "has_item"
 
+    def get_inputs(self, condition):
+        # only the inventory of the player is followed
+        if condition.parameters[0] == "player":
+            return "inventory",
+        return None
+
     def test(self, session,  condition):
         """ Checks to see the player is has a monster in his party
 
@@ -31,6 +31,7 @@ class HasMonsterCondition(EventCondition):
     """ Checks to see if an NPC is facing a tile position
     """
     name = "has_monster"
+    inputs = ("party",)
 
     def test(self, session,  condition):
         """Checks to see the player is has a monster in his party
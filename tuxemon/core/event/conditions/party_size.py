@@ -35,6 +35,7 @@ class PartySizeCondition(EventCondition):
     """ Checks to see where an NPC is facing
     """
     name = "party_size"
+    inputs = ("party",)
 
     def test(self, session,  condition):
         """Perform various checks about the player's party size. With this condition you can see if
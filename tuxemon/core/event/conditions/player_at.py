@@ -31,6 +31,7 @@ class PlayerAtCondition(EventCondition):
     """ Checks to see if an npc is at a current position on the map.
     """
     name = "player_at"
+    inputs = ("player",)
 
     def test(self, session,  condition):
         """Checks to see if the player is at a current position on the map.
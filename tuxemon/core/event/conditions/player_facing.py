@@ -31,6 +31,7 @@ class PlayerFacingCondition(EventCondition):
     """ Checks to see where an NPC is facing
     """
     name = "player_facing"
+    inputs = ("player",)
 
     def test(self, session,  condition):
         """Checks to see where the player is facing
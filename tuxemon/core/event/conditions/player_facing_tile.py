@@ -35,6 +35,7 @@ class PlayerFacingTileCondition(EventCondition):
     """ Checks to see if an NPC is facing a tile position
     """
     name = "player_facing_tile"
+    inputs = ("player",)
 
     def test(self, session,  condition):
         """Checks to see the player is facing a tile position
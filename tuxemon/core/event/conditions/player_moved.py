@@ -94,8 +94,9 @@ class PlayerMovedCondition(EventCondition):
         # check where the npc is going, not where it is
         move_destination = npc.move_destination
 
-        # a hash/id of sorts for the condition
-        condition_str = str(condition)
+        # a hash/id of sorts for the condition; all fields after the type
+        # and parameters are hashable, so they are used without formatting
+        condition_key = condition[2:] + tuple(condition.parameters)
 
         stopped = move_destination is None
         collide_next = False if stopped else collide(condition, move_destination)
@@ -105,9 +106,9 @@ class PlayerMovedCondition(EventCondition):
 
         # only test if tile was moved into
         # get previous destination for this particular condition
-        last_destination = persist.get(condition_str)
+        last_destination = persist.get(condition_key)
         if last_destination is None and (stopped or collide_next):
-            persist[condition_str] = move_destination
+            persist[condition_key] = move_destination
 
         # has the npc moved onto or away from the event?
         # Check to see if the npc's "move destination" has changed since the last
@@ -119,10 +120,10 @@ class PlayerMovedCondition(EventCondition):
 
         # Update the current npc's last move destination
         # TODO: some sort of global tracking of player instead of recording it in conditions
-        persist[condition_str] = move_destination
+        persist[condition_key] = move_destination
 
         # determine if the tile has truly changed
         if collided and moved and last_destination is not None:
-            persist[condition_str] = None
+            persist[condition_key] = None
             return True
         return False
@@ -34,6 +34,7 @@ class ToUseTileCondition(EventCondition):
     """ Checks if we are attempting to talk to an npc
     """
     name = "to_use_tile"
+    inputs = ("player", "buttons")
 
     def test(self, session,  condition):
         """ Checks to see the player is next to and facing a particular tile and that the Return button is pressed.
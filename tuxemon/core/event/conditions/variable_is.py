@@ -39,6 +39,10 @@ class VariableIsCondition(EventCondition):
     """
     name = "variable_is"
 
+    def get_inputs(self, condition):
+        operands = condition.parameters[0], condition.parameters[2]
+        return tuple("variable:" + i for i in operands if not i.isdigit())
+
     def test(self, session,  condition):
         """ Checks to see if a player game variable meets a given condition. This will look
         for a particular key in the player.game_variables dictionary and see if it exists.
@@ -34,6 +34,10 @@ class VariableSetCondition(EventCondition):
     """
     name = "variable_set"
 
+    def get_inputs(self, condition):
+        key = condition.parameters[0].split(":")[0]
+        return "variable:" + key,
+
     def test(self, session,  condition):
         """ Checks to see if a player game variable has been set. This will look for a particular
         key in the player.game_variables dictionary and see if it exists. If it exists, it will
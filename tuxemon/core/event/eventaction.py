@@ -38,6 +38,10 @@ assert Client
 
 logger = logging.getLogger(__name__)
 
+# marks parameters which have not been parsed yet, since None means they
+# could not be parsed
+UNPARSED = object()
+
 
 class EventAction(object):
     """ EventActions are executed during gameplay.
@@ -103,41 +107,56 @@ class EventAction(object):
     valid_parameters = list()
     _param_factory = None
 
-    def __init__(self, session, parameters):
+    def __init__(self, session, parameters, parsed_parameters=UNPARSED):
         """
 
         :type session: tuxemon.session.Session
         :type parameters: list
+        :param parsed_parameters: Result of parse_parameters for the same
+            parameters, if already known
         """
         self.session = session
 
+        # if you need the parameters before they are processed, use this
+        self.raw_parameters = parameters
+
+        if parsed_parameters is UNPARSED:
+            parsed_parameters = self.parse_parameters(parameters)
+        self.parameters = parsed_parameters
+
+        self._done = False
+
+    @classmethod
+    def parse_parameters(cls, parameters):
+        """ Cast the parameters of the action to their types
+
+        The result does not depend on the session, so it may be shared by
+        all instances made for the same MapAction.
+
+        :type parameters: list
+        :returns: Parameters, or None if they could not be parsed
+        """
         # TODO: METACLASS
         # make a namedtuple class that will generate the parameters
         # the patching of the class attribute should only happen once
-        if self.__class__._param_factory is None:
-            self.__class__._param_factory = namedtuple("parameters", [i[1] for i in self.valid_parameters])
-
-        # if you need the parameters before they are processed, use this
-        self.raw_parameters = parameters
+        if cls._param_factory is None:
+            cls._param_factory = namedtuple("parameters", [i[1] for i in cls.valid_parameters])
 
-        # parse parameters
         try:
-            if self.valid_parameters:
+            if cls.valid_parameters:
 
                 # cast the parameters to the correct type, as defined in cls.valid_parameters
-                values = cast_values(parameters, self.valid_parameters)
-                self.parameters = self._param_factory(*values)
+                values = cast_values(parameters, cls.valid_parameters)
+                return cls._param_factory(*values)
             else:
-                self.parameters = parameters
+                return parameters
 
         except:
-            logger.error("error while parsing for {}".format(self.name))
+            logger.error("error while parsing for {}".format(cls.name))
             logger.error("cannot parse parameters: {}".format(parameters))
-            logger.error(self.valid_parameters)
+            logger.error(cls.valid_parameters)
             logger.error("please check the parameters and verify they are correct")
-            self.parameters = None
-
-        self._done = False
+            return None
 
     def __enter__(self):
         """ Called only once, when the action is started
@@ -38,9 +38,25 @@ class EventCondition(object):
     """
     name = "GenericCondition"
 
+    # what the test reads; see EventEngine.input_signatures for the names.
+    # None means the inputs are not known, so the test is done every frame
+    inputs = None
+
     def __init__(self):
         pass
 
+    def get_inputs(self, condition):
+        """ Return what the test of a condition reads
+
+        The event engine will only test the condition again when one of
+        these has changed.  Variables are named "variable:" and their key.
+
+        :param tuxemon.core.event.MapCondition condition:
+        :rtype: Optional[Sequence[str]]
+        :returns: Names of the inputs, or None if not known
+        """
+        return self.inputs
+
     def test(self, session, condition):
         """ Return True if satisfied, or False if not
 
@@ -30,15 +30,20 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import logging
+import os.path
 from contextlib import contextmanager
 from textwrap import dedent
+from timeit import default_timer
 
 from lxml import etree
 
 from tuxemon.constants import paths
 from tuxemon.core import plugin
 from tuxemon.core import prepare
+from tuxemon.core.event.eventprofile import EventProfiler
+from tuxemon.core.event.eventtrace import EventTrace
 from tuxemon.core.platform.const import buttons
+from tuxemon.core.tools import nearest
 
 logger = logging.getLogger(__name__)
 
@@ -57,10 +62,16 @@ class RunningEvent(object):
     Actions being managed by the RunningEvent class can share information
     using the context dictionary.
     """
-    __slots__ = ('map_event', 'context', 'action_index', 'current_action', 'current_map_action')
+    __slots__ = ('map_event', 'bindings', 'context', 'action_index', 'current_action', 'current_map_action')
 
-    def __init__(self, map_event):
+    def __init__(self, map_event, bindings):
+        """
+
+        :type map_event: tuxemon.core.event.EventObject
+        :param Sequence[Optional[ActionBinding]] bindings: Bound actions of the event
+        """
         self.map_event = map_event
+        self.bindings = bindings
         self.context = dict()
         self.action_index = 0
         self.current_action = None
@@ -86,6 +97,166 @@ class RunningEvent(object):
 
         return action
 
+    def create_action(self, session):
+        """ Create the EventAction of the next action, if it is loaded
+
+        :type session: tuxemon.core.session.Session
+        :rtype: Optional[tuxemon.core.event.eventaction.EventAction]
+        """
+        binding = self.bindings[self.action_index]
+        if binding is None:
+            return None
+        return binding.create(session)
+
+
+class ActionBinding(object):
+    """ Action of a MapEvent, bound to the EventAction class which runs it
+
+    The parameters are cast once, when the event is compiled, and shared by
+    every EventAction created for the action.
+    """
+    __slots__ = ('map_action', 'action_class', 'parameters')
+
+    def __init__(self, map_action, action_class, parameters):
+        """
+
+        :type map_action: tuxemon.core.event.MapAction
+        :type action_class: Type[tuxemon.core.event.eventaction.EventAction]
+        :param parameters: Parsed parameters of the action
+        """
+        self.map_action = map_action
+        self.action_class = action_class
+        self.parameters = parameters
+
+    def create(self, session):
+        """ Create a new EventAction for the action
+
+        :type session: tuxemon.core.session.Session
+        :rtype: tuxemon.core.event.eventaction.EventAction
+        """
+        return self.action_class(session, self.map_action.parameters, self.parameters)
+
+
+def get_player_signature(session):
+    player = session.player
+    return tuple(player.tile_pos), player.facing, player.move_destination
+
+
+def get_party_signature(session):
+    return tuple(session.player.monsters)
+
+
+def get_inventory_signature(session):
+    return tuple((slug, info['quantity']) for slug, info in session.player.inventory.items())
+
+
+def get_states_signature(session):
+    client = session.client
+    return client.current_state, tuple(client.active_states)
+
+
+def get_buttons_signature(session):
+    return tuple((event.button, event.pressed) for event in getattr(session.client, 'key_events', ()))
+
+
+# inputs which EventConditions may read, and functions returning a value
+# which changes when the input changes.  game variables are not included,
+# since they record their changes, see GameVariables
+input_signatures = {
+    'player': get_player_signature,
+    'party': get_party_signature,
+    'inventory': get_inventory_signature,
+    'states': get_states_signature,
+    'buttons': get_buttons_signature,
+}
+
+
+def missing_condition(session, condition):
+    """ Test for conditions which are not loaded
+
+    None is never equal to the expected result, so the event cannot start.
+    """
+    return None
+
+
+class EventPredicate(object):
+    """ Conditions of a MapEvent, bound to the EventConditions which test them
+
+    Built once for each MapEvent, so checking the event each frame does not
+    look up or create any objects.  Conditions are tested in order, and the
+    test stops at the first condition which is not satisfied.  The actions
+    of the event are bound when the predicate is built, so they are ready
+    when the event starts.
+
+    The last result is kept with the tick of the EventEngine it was tested
+    on.  If all conditions declare their inputs, the result is reused until
+    one of them changes.
+    """
+    __slots__ = ('map_event', 'tests', 'inputs', 'bindings', 'map_name', 'result', 'checked_at')
+
+    def __init__(self, map_event, tests, inputs, bindings=(), map_name=None):
+        """
+
+        :type map_event: tuxemon.core.event.EventObject
+        :param tests: Test method, MapCondition and expected result of each condition
+        :param Optional[Tuple[str]] inputs: Inputs of all conditions, or None if not known
+        :param Tuple[Optional[ActionBinding]] bindings: Bound actions of the event
+        :param Optional[str] map_name: File name of the map of the event
+        """
+        self.map_event = map_event
+        self.map_name = map_name
+        self.tests = tests
+        self.inputs = inputs
+        self.bindings = bindings
+        self.result = False
+        self.checked_at = -1
+
+    def __call__(self, session):
+        """ Check if all conditions are satisfied
+
+        :type session: tuxemon.core.session.Session
+        :rtype: bool
+        """
+        for test, cond_data, expected in self.tests:
+            try:
+                if test(session, cond_data) != expected:
+                    return False
+            except Exception:
+                print_error_context(self.map_event, cond_data, session)
+                raise
+        return True
+
+    def measure(self, session, trace, profiler, tick):
+        """ Check if all conditions are satisfied, timing each test
+
+        :type session: tuxemon.core.session.Session
+        :type trace: Optional[tuxemon.core.event.eventtrace.EventTrace]
+        :type profiler: Optional[tuxemon.core.event.eventprofile.EventProfiler]
+        :param int tick: Number of the update of the event engine
+        :rtype: bool
+        """
+        event_id = self.map_event.id
+        event_start = default_timer()
+        satisfied = True
+        for test, cond_data, expected in self.tests:
+            start = default_timer()
+            try:
+                result = test(session, cond_data) == expected
+            except Exception:
+                print_error_context(self.map_event, cond_data, session)
+                raise
+            duration = default_timer() - start
+            if trace is not None:
+                trace.add(tick, event_id, cond_data, result, duration)
+            if profiler is not None:
+                profiler.add_condition(cond_data.type, result, duration)
+            if not result:
+                satisfied = False
+                break
+        if profiler is not None:
+            profiler.add_event(self.map_name, event_id, satisfied, default_timer() - event_start)
+        return satisfied
+
 
 class EventEngine(object):
     """ A class for the event engine. The event engine checks to see if a group of
@@ -103,8 +274,18 @@ class EventEngine(object):
         self.session = session
 
         self.conditions = dict()
+        self.condition_instances = dict()
         self.actions = dict()
         self.running_events = dict()
+        self.predicates = dict()
+        self.trace = EventTrace()
+        self.profiler = EventProfiler()
+        self.profiler.enabled = prepare.CONFIG.event_profile
+        self.tick = 0
+        self.signatures = dict()
+        self.changed_at = dict()
+        self.stale_at = 0
+        self.variables = None
         self.name = "Event"
         self.current_map = None
         self.timer = 0.0
@@ -123,11 +304,21 @@ class EventEngine(object):
         :return:
         """
         self.running_events = dict()
+        self.predicates = dict()
         self.current_map = None
         self.timer = 0.0
         self.wait = 0.0
         self.button = None
 
+    def get_map_name(self):
+        """ Return the file name of the current map, if one is loaded
+
+        :rtype: Optional[str]
+        """
+        if self.current_map is None:
+            return None
+        return os.path.basename(self.current_map.filename)
+
     def get_action(self, name, parameters=None):
         """ Get an action that is loaded into the engine
 
@@ -158,7 +349,8 @@ class EventEngine(object):
     def get_condition(self, name):
         """ Get a condition that is loaded into the engine
 
-        A new instance will be returned each time
+        Conditions do not keep state, so one instance is shared by all
+        conditions of the same type
 
         Return None if condition is not loaded
 
@@ -167,6 +359,11 @@ class EventEngine(object):
         :rtype: tuxemon.core.event.eventcondition.EventCondition
 
         """
+        try:
+            return self.condition_instances[name]
+        except KeyError:
+            pass
+
         # TODO: make generic
         try:
             condition = self.conditions[name]
@@ -176,7 +373,120 @@ class EventEngine(object):
             logger.error(error)
 
         else:
-            return condition()
+            instance = condition()
+            self.condition_instances[name] = instance
+            return instance
+
+    def bind_action(self, map_action):
+        """ Bind an action to the EventAction class which runs it
+
+        Return None if action is not loaded
+
+        :type map_action: tuxemon.core.event.MapAction
+        :rtype: Optional[ActionBinding]
+        """
+        try:
+            action_class = self.actions[map_action.type]
+        except KeyError:
+            logger.error('Error: EventAction "{}" not implemented'.format(map_action.type))
+            return None
+
+        parameters = action_class.parse_parameters(map_action.parameters)
+        return ActionBinding(map_action, action_class, parameters)
+
+    def compile_event(self, map_event):
+        """ Bind the conditions and actions of an event to the classes which run them
+
+        :type map_event: tuxemon.core.event.EventObject
+        :rtype: EventPredicate
+        """
+        tests = list()
+        inputs = set()
+        for cond_data in map_event.conds:
+            map_condition = self.get_condition(cond_data.type)
+            if map_condition is None:
+                test = missing_condition
+                cond_inputs = ()
+            else:
+                test = map_condition.test
+                try:
+                    cond_inputs = map_condition.get_inputs(cond_data)
+                except (AttributeError, IndexError, ValueError):
+                    cond_inputs = None
+            tests.append((test, cond_data, cond_data.operator == 'is'))
+            if inputs is not None:
+                inputs = None if cond_inputs is None else inputs.union(cond_inputs)
+
+        if inputs is not None:
+            inputs = tuple(sorted(inputs))
+        bindings = tuple(self.bind_action(map_action) for map_action in map_event.acts)
+        return EventPredicate(map_event, tuple(tests), inputs, bindings, self.get_map_name())
+
+    def compile_events(self, events):
+        """ Compile the conditions and actions of events, so they are ready to be run
+
+        :type events: Iterable[tuxemon.core.event.EventObject]
+        :return: None
+        """
+        for map_event in events:
+            self.predicates[id(map_event)] = self.compile_event(map_event)
+
+    def update_inputs(self):
+        """ Find the inputs of conditions which changed since the last update
+
+        :return: None
+        """
+        self.tick += 1
+        tick = self.tick
+        player = self.session.player
+        if player is None:
+            self.stale_at = tick
+            return
+
+        for name, get_signature in input_signatures.items():
+            signature = get_signature(self.session)
+            if name not in self.signatures or self.signatures[name] != signature:
+                self.signatures[name] = signature
+                self.changed_at[name] = tick
+
+        variables = player.game_variables
+        changed = getattr(variables, 'changed', None)
+        if variables is not self.variables or changed is None:
+            # new game or loaded save, so all variables may be different
+            self.variables = variables
+            self.stale_at = tick
+        if changed:
+            for key in changed:
+                self.changed_at['variable:' + key] = tick
+            changed.clear()
+
+    def is_dirty(self, predicate):
+        """ Check if the conditions of an event must be tested again
+
+        :type predicate: EventPredicate
+        :rtype: bool
+        """
+        checked_at = predicate.checked_at
+        if predicate.inputs is None or checked_at < self.stale_at:
+            return True
+        changed_at = self.changed_at
+        for name in predicate.inputs:
+            if changed_at.get(name, 0) > checked_at:
+                return True
+        return False
+
+    def get_predicate(self, map_event):
+        """ Return the compiled conditions of an event, compiling if needed
+
+        :type map_event: tuxemon.core.event.EventObject
+        :rtype: EventPredicate
+        """
+        try:
+            return self.predicates[id(map_event)]
+        except KeyError:
+            predicate = self.compile_event(map_event)
+            self.predicates[id(map_event)] = predicate
+            return predicate
 
     def check_condition(self, cond_data, map_event):
         """ Check if condition is true of false
@@ -193,8 +503,17 @@ class EventEngine(object):
                 logger.debug('map condition "{}" is not loaded'.format(cond_data.type))
                 return False
 
-            result = map_condition.test(self.session, cond_data) == (cond_data.operator == 'is')
-            logger.debug('map condition "{}": {} ({})'.format(map_condition.name, result, cond_data))
+            expected = cond_data.operator == 'is'
+            if not (self.trace.enabled or self.profiler.enabled):
+                return map_condition.test(self.session, cond_data) == expected
+
+            start = default_timer()
+            result = map_condition.test(self.session, cond_data) == expected
+            duration = default_timer() - start
+            if self.trace.enabled:
+                self.trace.add(self.tick, map_event.id, cond_data, result, duration)
+            if self.profiler.enabled:
+                self.profiler.add_condition(cond_data.type, result, duration)
             return result
 
     def execute_action(self, action_name, parameters=None):
@@ -235,10 +554,9 @@ class EventEngine(object):
         # started.  If not checked, then the game would freeze while it tries to run
         # unlimited copies of the same event, forever.
         if map_event.id not in self.running_events:
-            logger.debug("starting map event: {}".format(map_event))
-            logger.debug("Executing action list")
-            logger.debug(map_event)
-            token = RunningEvent(map_event)
+            if self.trace.enabled:
+                self.trace.add(self.tick, map_event.id, None, True, 0.0)
+            token = RunningEvent(map_event, self.get_predicate(map_event).bindings)
             self.running_events[map_event.id] = token
 
     def process_map_event(self, map_event):
@@ -267,8 +585,20 @@ class EventEngine(object):
             self.partial_events.append(conds)
 
         else:
-            # optimal, less debug
-            if all(self.check_condition(cond, map_event) for cond in map_event.conds):
+            # optimal, less debug.  only test again if the inputs changed
+            predicate = self.get_predicate(map_event)
+            if self.is_dirty(predicate):
+                if self.trace.enabled or self.profiler.enabled:
+                    predicate.result = predicate.measure(
+                        self.session,
+                        self.trace if self.trace.enabled else None,
+                        self.profiler if self.profiler.enabled else None,
+                        self.tick,
+                    )
+                else:
+                    predicate.result = predicate(self.session)
+                predicate.checked_at = self.tick
+            if predicate.result:
                 self.start_event(map_event)
 
     def process_map_events(self, events):
@@ -282,6 +612,22 @@ class EventEngine(object):
         for event in events:
             self.process_map_event(event)
 
+    def get_nearby_events(self, event_index):
+        """ Return the events of an index which may start where the player is
+
+        :type event_index: tuxemon.core.event.eventindex.EventIndex
+        :rtype: List[tuxemon.core.event.EventObject]
+        """
+        player = self.session.player
+        if player is None:
+            return event_index.events
+
+        positions = [nearest(player.tile_pos)]
+        destination = player.move_destination
+        if destination is not None:
+            positions.append(nearest(destination))
+        return event_index.get_events(positions)
+
     def update(self, dt):
         """ Check all the MapEvents and start their actions if conditions are OK
 
@@ -304,6 +650,8 @@ class EventEngine(object):
         :returns: None
 
         """
+        self.update_inputs()
+
         # do the "init" events.  this will be done just once
         # TODO: find solution that doesn't nuke the init list
         # TODO: make event engine generic, so can be used in global scope, not just maps
@@ -311,8 +659,12 @@ class EventEngine(object):
             self.process_map_events(self.session.client.inits)
             self.session.client.inits = list()
 
-        # process any other events
-        self.process_map_events(self.session.client.events)
+        # process any other events.  only the events near the player
+        # are checked, if the map has been loaded
+        if self.current_map is None:
+            self.process_map_events(self.session.client.events)
+        else:
+            self.process_map_events(self.get_nearby_events(self.current_map.event_index))
 
     def update_running_events(self, dt):
         """ Update the events that are running
@@ -323,6 +675,9 @@ class EventEngine(object):
         :rtype: None
         """
         to_remove = set()
+        trace = self.trace if self.trace.enabled else None
+        profiler = self.profiler if self.profiler.enabled else None
+        measured = trace is not None or profiler is not None
 
         # Loop through the list of actions and update them
         for i, e in self.running_events.items():
@@ -352,7 +707,7 @@ class EventEngine(object):
 
                     else:
                         # got an action, so start it
-                        action = self.get_action(next_action.type, next_action.parameters)
+                        action = e.create_action(self.session)
 
                         if action is None:
                             # action was not loaded, so, break?  raise exception, idk
@@ -364,23 +719,42 @@ class EventEngine(object):
 
                         else:
                             # start the action
-                            with add_error_context(e.map_event, next_action, self.session):
+                            if measured:
+                                start = default_timer()
+                            try:
                                 action.start()
+                            except Exception:
+                                print_error_context(e.map_event, next_action, self.session)
+                                raise
+                            if measured:
+                                self.record_action(trace, profiler, i, next_action, "start", default_timer() - start)
 
                             # save the action that is running
                             e.current_action = action
+                            e.current_map_action = next_action
 
                 # update the action
                 action = e.current_action
-                with add_error_context(e.map_event, e.current_map_action, self.session):
+                if measured:
+                    start = default_timer()
+                try:
                     action.update()
+                except Exception:
+                    print_error_context(e.map_event, e.current_map_action, self.session)
+                    raise
+                if measured:
+                    self.record_action(trace, profiler, i, e.current_map_action, "update", default_timer() - start)
 
                 if action.done:
                     # action finished, so continue and do the next one, if available
+                    if measured:
+                        start = default_timer()
                     action.cleanup()
+                    if measured:
+                        self.record_action(trace, profiler, i, e.current_map_action, "cleanup", default_timer() - start)
                     e.action_index += 1
                     e.current_action = None
-                    logger.debug("action finished: {}".format(action))
+                    e.current_map_action = None
 
                 else:
                     # action didn't finish, so move on to next RunningEvent
@@ -393,6 +767,22 @@ class EventEngine(object):
                 # map changes or engine resets may cause this error
                 pass
 
+    def record_action(self, trace, profiler, event_id, map_action, step, duration):
+        """ Add a step of an action to the trace and profiler
+
+        :type trace: Optional[tuxemon.core.event.eventtrace.EventTrace]
+        :type profiler: Optional[tuxemon.core.event.eventprofile.EventProfiler]
+        :param int event_id: ID of the map event
+        :type map_action: tuxemon.core.event.MapAction
+        :param str step: "start", "update" or "cleanup"
+        :param float duration: Time taken, in seconds
+        :return: None
+        """
+        if trace is not None:
+            trace.add(self.tick, event_id, map_action, step, duration)
+        if profiler is not None:
+            profiler.add_action(map_action.type, step, duration)
+
     def process_event(self, event):
         """ Handles player input events. This function is only called when the
         player provides input such as pressing a key or clicking the mouse.
@@ -409,8 +799,11 @@ class EventEngine(object):
         """
         # has the player pressed the action key?
         if event.pressed and event.button == buttons.A:
-            for map_event in self.session.client.interacts:
-                self.process_map_event(map_event)
+            self.update_inputs()
+            if self.current_map is None:
+                self.process_map_events(self.session.client.interacts)
+            else:
+                self.process_map_events(self.get_nearby_events(self.current_map.interact_index))
 
         return event
 
@@ -426,34 +819,45 @@ def add_error_context(event, item, session):
     try:
         yield
     except Exception:
-        file_name = session.client.get_map_filepath()
-        tree = etree.parse(file_name)
-        event_node = tree.find("//object[@id='%s']" % event.id)
-        if item.name is None:
-            # It's an "interact" event, so no condition defined in the map
-            msg = """
-                Error in {file_name}
-                {event}
-                Line {line_number}
-            """.format(
-                file_name=file_name,
-                event=etree.tostring(event_node).decode().split("\n")[0].strip(),
-                line_number=event_node.sourceline,
-            )
-        else:
-            # This is either a condition or an action
-            child_node = event_node.find(".//property[@name='%s']" % (item.name))
-            msg = """
-                Error in {file_name}
-                {event}
-                    ...
-                    {line}
-                Line {line_number}
-            """.format(
-                file_name=file_name,
-                event=etree.tostring(event_node).decode().split("\n")[0].strip(),
-                line=etree.tostring(child_node).decode().strip(),
-                line_number=child_node.sourceline,
-            )
-        print(dedent(msg))
+        print_error_context(event, item, session)
         raise
+
+
+def print_error_context(event, item, session):
+    """ Print the part of the map file which caused an error
+
+    :type event: tuxemon.core.event.EventObject
+    :type item: tuxemon.core.event.MapCondition or core.event.MapAction
+    :type session: tuxemon.core.session.Session
+    :rtype None
+    """
+    file_name = session.client.get_map_filepath()
+    tree = etree.parse(file_name)
+    event_node = tree.find("//object[@id='%s']" % event.id)
+    if item.name is None:
+        # It's an "interact" event, so no condition defined in the map
+        msg = """
+            Error in {file_name}
+            {event}
+            Line {line_number}
+        """.format(
+            file_name=file_name,
+            event=etree.tostring(event_node).decode().split("\n")[0].strip(),
+            line_number=event_node.sourceline,
+        )
+    else:
+        # This is either a condition or an action
+        child_node = event_node.find(".//property[@name='%s']" % (item.name))
+        msg = """
+            Error in {file_name}
+            {event}
+                ...
+                {line}
+            Line {line_number}
+        """.format(
+            file_name=file_name,
+            event=etree.tostring(event_node).decode().split("\n")[0].strip(),
+            line=etree.tostring(child_node).decode().strip(),
+            line_number=child_node.sourceline,
+        )
+    print(dedent(msg))
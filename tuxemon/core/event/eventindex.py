@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.event.eventindex Spatial index of the events of a map.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# conditions which can only be true when the player is near their area
+positional_conditions = ("player_at", "player_moved", "player_facing_tile")
+
+# width and height of the regions of the index, in tiles
+DEFAULT_REGION_SIZE = 8
+
+# distance from their area at which positional conditions are checked.
+# player_facing_tile checks the next tile, and player_moved must see the
+# player moving in before it arrives.
+AREA_MARGIN = 2
+
+
+def get_area(map_event):
+    """ Return the area the player must be near for an event to start
+
+    :param tuxemon.core.event.EventObject map_event: Event
+    :rtype: Optional[Tuple[int, int, int, int]]
+    :returns: Left, top, right and bottom tile, or None if the event may
+        start anywhere
+    """
+    for cond in map_event.conds:
+        if cond.type in positional_conditions and cond.operator == "is":
+            return (
+                cond.x - AREA_MARGIN,
+                cond.y - AREA_MARGIN,
+                cond.x + cond.width - 1 + AREA_MARGIN,
+                cond.y + cond.height - 1 + AREA_MARGIN,
+            )
+    return None
+
+
+class EventIndex(object):
+    """ Events of a map, bucketed by the region of the map they can start in
+
+    Events with a positional condition are added to the regions around the
+    area of the condition.  Other events are global, and are always
+    returned.  Events are returned in map order, so they start in the same
+    order as if all events were checked.
+    """
+
+    def __init__(self, events, region_size=DEFAULT_REGION_SIZE):
+        """
+
+        :param List[tuxemon.core.event.EventObject] events: Events of the map
+        :param int region_size: Width and height of the regions, in tiles
+        """
+        self.events = events
+        self.region_size = region_size
+        self.regions = dict()
+        self.global_events = list()
+        self.last_keys = None
+        self.last_events = None
+
+        for order, map_event in enumerate(events):
+            area = get_area(map_event)
+            if area is None:
+                self.global_events.append((order, map_event))
+                continue
+            left, top, right, bottom = area
+            for region_x in range(left // region_size, right // region_size + 1):
+                for region_y in range(top // region_size, bottom // region_size + 1):
+                    self.regions.setdefault((region_x, region_y), list()).append((order, map_event))
+
+    def get_events(self, positions):
+        """ Return the events which may start near some tiles
+
+        :param Iterable[Tuple[int, int]] positions: Tiles of the player
+        :rtype: List[tuxemon.core.event.EventObject]
+        """
+        region_size = self.region_size
+        keys = tuple(sorted({(x // region_size, y // region_size) for x, y in positions}))
+        if keys == self.last_keys:
+            return self.last_events
+
+        items = list(self.global_events)
+        for key in keys:
+            items.extend(self.regions.get(key, ()))
+        items.sort(key=lambda item: item[0])
+
+        events = list()
+        last_order = None
+        for order, map_event in items:
+            if order != last_order:
+                events.append(map_event)
+                last_order = order
+
+        self.last_keys = keys
+        self.last_events = events
+        return events
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.event.eventprofile Time spent by the event engine on each condition, event and action.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# indexes of the statistics lists
+CALLS = 0
+TOTAL = 1
+MAX = 2
+TRUE = 3
+
+
+class EventProfiler(object):
+    """ Totals of the time spent on the conditions, events and actions of maps
+
+    For each condition type and map event, the number of tests, total and
+    maximum time, and number of tests which were true are kept.  Event ids
+    are only unique in their map, so events are kept by map and id.  For each
+    action type, the same is kept for its start, update and cleanup, without
+    the number of true results.
+
+    Only a few additions are done for each test, so the profiler may be left
+    enabled in playtests.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.conditions = dict()
+        self.events = dict()
+        self.actions = dict()
+
+    def add_condition(self, cond_type, result, duration):
+        """ Add the test of a condition
+
+        :param str cond_type: Type of the condition
+        :param bool result: If the condition was satisfied
+        :param float duration: Time taken, in seconds
+        :return: None
+        """
+        add_stats(self.conditions, cond_type, result, duration)
+
+    def add_event(self, map_name, event_id, result, duration):
+        """ Add the test of the conditions of a map event
+
+        :param Optional[str] map_name: File name of the map of the event
+        :param int event_id: ID of the map event
+        :param bool result: If all conditions were satisfied
+        :param float duration: Time taken, in seconds
+        :return: None
+        """
+        add_stats(self.events, (map_name, event_id), result, duration)
+
+    def add_action(self, action_type, step, duration):
+        """ Add a step of an action
+
+        :param str action_type: Type of the action
+        :param str step: "start", "update" or "cleanup"
+        :param float duration: Time taken, in seconds
+        :return: None
+        """
+        add_stats(self.actions, (action_type, step), False, duration)
+
+    def clear(self):
+        """ Remove all statistics
+
+        :return: None
+        """
+        self.conditions = dict()
+        self.events = dict()
+        self.actions = dict()
+
+    def get_report(self):
+        """ Return the statistics, in a form which can be saved as JSON
+
+        :rtype: Dict
+        """
+        report = {"conditions": dict(), "events": dict(), "actions": dict()}
+
+        for cond_type, stats in self.conditions.items():
+            report["conditions"][cond_type] = format_stats(stats, True)
+
+        for (map_name, event_id), stats in self.events.items():
+            report["events"].setdefault(str(map_name), dict())[str(event_id)] = format_stats(stats, True)
+
+        for (action_type, step), stats in self.actions.items():
+            report["actions"].setdefault(action_type, dict())[step] = format_stats(stats, False)
+
+        return report
+
+    def get_lines(self, count=None):
+        """ Return the conditions, events and actions which took the most time
+
+        :param int count: Number of each to return. By default, all
+        :rtype: List[str]
+        """
+        lines = list()
+        # actions have no result, so only conditions and events have a ratio
+        tables = (
+            ("conditions", self.conditions, True),
+            ("events", self.events, True),
+            ("actions", self.actions, False),
+        )
+        for title, table, with_ratio in tables:
+            lines.append("{}:".format(title))
+            items = sorted(table.items(), key=lambda item: item[1][TOTAL], reverse=True)
+            for key, stats in items[:count]:
+                if isinstance(key, tuple):
+                    key = " ".join(str(i) for i in key)
+                line = "  {:<32} {:>8} calls {:>10.3f}ms total {:>8.3f}ms max".format(
+                    key,
+                    stats[CALLS],
+                    stats[TOTAL] * 1000,
+                    stats[MAX] * 1000,
+                )
+                if with_ratio:
+                    line += " {:>5.1f}% true".format(stats[TRUE] * 100 / stats[CALLS])
+                lines.append(line)
+        return lines
+
+    def save(self, filename):
+        """ Write the statistics to a JSON file
+
+        :param str filename: Path of the file
+        :return: None
+        """
+        temp_filename = filename + ".tmp"
+        with io.open(temp_filename, "w", encoding="utf-8") as fp:
+            fp.write(json.dumps(self.get_report(), indent=2, sort_keys=True))
+        os.replace(temp_filename, filename)
+        logger.info("saved event profile to {}".format(filename))
+
+
+def add_stats(table, key, result, duration):
+    """ Add a call to the statistics of a key
+
+    :param Dict table: Statistics of each key
+    :param key: Key to add to
+    :param bool result: If the result was true
+    :param float duration: Time taken, in seconds
+    :return: None
+    """
+    try:
+        stats = table[key]
+    except KeyError:
+        stats = table[key] = [0, 0.0, 0.0, 0]
+    stats[CALLS] += 1
+    stats[TOTAL] += duration
+    if duration > stats[MAX]:
+        stats[MAX] = duration
+    if result:
+        stats[TRUE] += 1
+
+
+def format_stats(stats, with_ratio):
+    """ Return the statistics of a key as a dictionary
+
+    :param List stats: Statistics of the key
+    :param bool with_ratio: If the ratio of true results is included
+    :rtype: Dict
+    """
+    report = {
+        "calls": stats[CALLS],
+        "total_ms": stats[TOTAL] * 1000,
+        "max_ms": stats[MAX] * 1000,
+    }
+    if with_ratio:
+        report["true_ratio"] = stats[TRUE] / stats[CALLS]
+    return report
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.event.eventtrace Record of the latest checks and actions of the event engine.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+from collections import deque, namedtuple
+
+from tuxemon.core.event import MapAction, MapCondition
+
+logger = logging.getLogger(__name__)
+
+# number of records kept
+DEFAULT_TRACE_SIZE = 4096
+
+# item is the MapCondition or MapAction, or None when an event starts.
+# result is the result of a condition, or the step of an action
+TraceRecord = namedtuple("TraceRecord", "tick event_id item result duration")
+
+
+def format_item(item):
+    """ Return a short description of a condition or action
+
+    :param item: MapCondition, MapAction or None
+    :rtype: str
+    """
+    if isinstance(item, MapCondition):
+        return "{} {} {}".format(item.operator, item.type, " ".join(item.parameters))
+    if isinstance(item, MapAction):
+        return "{} {}".format(item.type, " ".join(item.parameters))
+    return "event started"
+
+
+class EventTrace(object):
+    """ Ring buffer of what the event engine did most recently
+
+    While disabled, the engine does not record or time anything.  Records
+    are only formatted when the trace is dumped, so tracing adds little to
+    the cost of checking events.
+    """
+
+    def __init__(self, size=DEFAULT_TRACE_SIZE):
+        """
+
+        :param int size: Number of records to keep
+        """
+        self.enabled = False
+        self.records = deque(maxlen=size)
+
+    def add(self, tick, event_id, item, result, duration):
+        """ Record a condition check or action step
+
+        :param int tick: Number of the update of the event engine
+        :param int event_id: ID of the map event
+        :param item: MapCondition, MapAction or None
+        :param result: Result of the condition, or step of the action
+        :param float duration: Time taken, in seconds
+        :return: None
+        """
+        self.records.append(TraceRecord(tick, event_id, item, result, duration))
+
+    def clear(self):
+        """ Remove all records
+
+        :return: None
+        """
+        self.records.clear()
+
+    def dump(self, count=None):
+        """ Return the latest records, formatted one per line
+
+        :param int count: Number of records to return. By default, all
+        :rtype: List[str]
+        """
+        records = list(self.records)
+        if count is not None:
+            records = records[-count:] if count > 0 else []
+        return [
+            "{:>8} {:>6} {:<40} {!s:<8} {:.3f}ms".format(
+                record.tick,
+                record.event_id,
+                format_item(record.item),
+                record.result,
+                record.duration * 1000,
+            )
+            for record in records
+        ]
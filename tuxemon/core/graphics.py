@@ -10,8 +10,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import logging
-import os
-import re
+from collections import OrderedDict
 
 import pygame
 from pytmx.util_pygame import smart_convert, handle_transformation
@@ -59,6 +58,155 @@ def cursor_from_image(image):
     return icon_string
 
 
+class SurfaceCache(object):
+    """ Least recently used cache of loaded images
+
+    Images are kept until the total size of the cached surfaces is over the
+    limit, then the least recently used images are dropped.  Pinned images
+    are never dropped, so the images of the current combat can be kept,
+    even if many other images are loaded.
+
+    Images are pinned in named groups, like "combat", so a group can be
+    released when it is not needed any more.  Pinned surfaces are kept
+    apart from the others, so dropping the least recently used surface
+    does not have to skip over them.
+
+    Cached surfaces are shared, so they must not be changed.
+    """
+
+    def __init__(self, max_size):
+        """
+
+        :param int max_size: Maximum size of all cached surfaces, in bytes
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.surfaces = OrderedDict()
+        self.pinned_surfaces = dict()
+        self.keys = dict()
+        self.pins = dict()
+        self.pin_counts = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, loader):
+        """ Return a cached surface, or load it and add it to the cache
+
+        :param tuple key: Resolved path of the image, scale and conversion mode
+        :param Callable loader: Called to load the surface if it is not cached
+        :rtype: pygame.Surface
+        """
+        try:
+            surface = self.pinned_surfaces[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return surface
+
+        try:
+            surface = self.surfaces[key]
+        except KeyError:
+            self.misses += 1
+            surface = loader()
+            if key[0] in self.pin_counts:
+                self.pinned_surfaces[key] = surface
+            else:
+                self.surfaces[key] = surface
+            self.keys.setdefault(key[0], set()).add(key)
+            self.size += surface_size(surface)
+            self.evict()
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def evict(self):
+        """ Drop least recently used surfaces until the cache is under the limit
+
+        :return: None
+        """
+        while self.size > self.max_size and self.surfaces:
+            key, surface = self.surfaces.popitem(last=False)
+            self.size -= surface_size(surface)
+            self.evictions += 1
+            keys = self.keys[key[0]]
+            keys.discard(key)
+            if not keys:
+                del self.keys[key[0]]
+
+    def pin(self, group, filenames):
+        """ Keep all cached images of some files, whatever the size of the cache
+
+        Files are added to the group, if it already has some.
+
+        :param str group: Name of the group, like "combat"
+        :param Iterable[str] filenames: Paths of the images, relative to the mods
+        :return: None
+        """
+        pinned = self.pins.setdefault(group, set())
+        for filename in filenames:
+            if not filename:
+                continue
+            try:
+                filename = transform_resource_filename(filename)
+            except IOError:
+                continue
+            if filename in pinned:
+                continue
+            pinned.add(filename)
+            self.pin_counts[filename] = self.pin_counts.get(filename, 0) + 1
+            if self.pin_counts[filename] == 1:
+                for key in self.keys.get(filename, ()):
+                    self.pinned_surfaces[key] = self.surfaces.pop(key)
+
+    def unpin(self, group):
+        """ Allow the images of a group to be dropped again
+
+        :param str group: Name of the group
+        :return: None
+        """
+        for filename in self.pins.pop(group, ()):
+            self.pin_counts[filename] -= 1
+            if self.pin_counts[filename] == 0:
+                del self.pin_counts[filename]
+                for key in self.keys.get(filename, ()):
+                    self.surfaces[key] = self.pinned_surfaces.pop(key)
+        self.evict()
+
+    def unpin_all(self):
+        """ Allow all images to be dropped again
+
+        :return: None
+        """
+        for group in list(self.pins):
+            self.unpin(group)
+
+    def clear(self):
+        """ Drop all cached images, even the pinned ones
+
+        :return: None
+        """
+        self.surfaces.clear()
+        self.pinned_surfaces.clear()
+        self.keys.clear()
+        self.size = 0
+
+
+def surface_size(surface):
+    """ Return the size of the pixels of a surface, in bytes
+
+    :param pygame.Surface surface:
+    :rtype: int
+    """
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+surface_cache = SurfaceCache(prepare.CONFIG.surface_cache_size * 1024 * 1024)
+
+
 def load_and_scale(filename):
     """ Load an image and scale it according to game settings
 
@@ -69,7 +217,12 @@ def load_and_scale(filename):
     :param filename:
     :rtype: pygame.Surface
     """
-    return scale_surface(load_image(filename), prepare.SCALE)
+    filename = transform_resource_filename(filename)
+    surface = surface_cache.get(
+        (filename, prepare.SCALE, "smart"),
+        lambda: scale_surface(smart_convert(load_surface(filename), None, True), prepare.SCALE),
+    )
+    return surface.copy()
 
 
 def load_image(filename):
@@ -79,14 +232,33 @@ def load_image(filename):
     * Will be converted if needed.
 
     This is a "smart" loader, and will convert files in the best way,
-    but is slightly slower than just loading.  Its important that
-    this is not called too often (like once per draw!)
+    but is slightly slower than just loading.  Images are cached, so
+    loading the same file again will only copy it.
 
     :param filename: String
     :rtype: pygame.Surface
     """
     filename = transform_resource_filename(filename)
-    return smart_convert(pygame.image.load(filename), None, True)
+    surface = surface_cache.get(
+        (filename, 1, "smart"),
+        lambda: smart_convert(load_surface(filename), None, True),
+    )
+    return surface.copy()
+
+
+def load_surface(filename):
+    """ Load an image file without converting it
+
+    Images inside resource packs are read from the pack.
+
+    :param str filename: Path of the image
+    :rtype: pygame.Surface
+    """
+    if prepare.RESOURCES.is_packed(filename):
+        with prepare.RESOURCES.open(filename) as fp:
+            return pygame.image.load(fp, filename)
+
+    return pygame.image.load(filename)
 
 
 def load_sprite(filename, **rect_kwargs):
@@ -122,7 +294,7 @@ def load_animated_sprite(filenames, delay, **rect_kwargs):
     """
     anim = []
     for filename in filenames:
-        if os.path.exists(filename):
+        if prepare.RESOURCES.exists(filename):
             image = load_and_scale(filename)
             anim.append((image, delay))
 
@@ -170,14 +342,7 @@ def animation_frame_files(directory, name):
     :param str name:
     :rtype: List[str]
     """
-    frames = list()
-    pattern = r"{}[0-9]*\..*".format(name)
-    # might be slow on large folders
-    for filename in os.listdir(directory):
-        if re.match(pattern, filename):
-            frames.append(os.path.join(directory, filename))
-    frames.sort()
-    return frames
+    return prepare.RESOURCES.animation_frames(directory, name)
 
 
 def create_animation(frames, duration, loop):
@@ -262,29 +427,49 @@ def convert_alpha_to_colorkey(surface, colorkey=(255, 0, 255)):
     return image
 
 
+# scaled tileset images and their converted tiles, kept between map loads
+# (filename, scale, colorkey, pixelalpha) => (image, {(rect, flags): tile})
+tileset_cache = dict()
+
+
 def scaled_image_loader(filename, colorkey, **kwargs):
     """ pytmx image loader for pygame
 
     Modified to load images at a scaled size
 
+    Tilesets and tiles are cached, so maps which use the same tilesets
+    will share the scaled images and tiles.  Tiles must not be changed.
+
     :param filename:
     :param colorkey:
     :param kwargs:
     :return:
     """
+    pixelalpha = kwargs.get("pixelalpha", True)
+    key = filename, prepare.SCALE, colorkey, pixelalpha
+
     if colorkey:
         colorkey = pygame.Color("#{0}".format(colorkey))
 
-    pixelalpha = kwargs.get("pixelalpha", True)
+    try:
+        image, tiles = tileset_cache[key]
+    except KeyError:
+        # load the tileset image
+        image = load_surface(filename)
 
-    # load the tileset image
-    image = pygame.image.load(filename)
-
-    # scale the tileset image to match game scale
-    scaled_size = scale_sequence(image.get_size())
-    image = pygame.transform.scale(image, scaled_size)
+        # scale the tileset image to match game scale
+        scaled_size = scale_sequence(image.get_size())
+        image = pygame.transform.scale(image, scaled_size)
+        tiles = dict()
+        tileset_cache[key] = image, tiles
 
     def load_image(rect=None, flags=None):
+        tile_key = tuple(rect) if rect else None, flags
+        try:
+            return tiles[tile_key]
+        except KeyError:
+            pass
+
         if rect:
             # scale the rect to match the scaled image
             rect = scale_rect(rect)
@@ -300,6 +485,7 @@ def scaled_image_loader(filename, colorkey, **kwargs):
             tile = handle_transformation(tile, flags)
 
         tile = smart_convert(tile, colorkey, pixelalpha)
+        tiles[tile_key] = tile
         return tile
 
     return load_image
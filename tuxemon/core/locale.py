@@ -34,7 +34,6 @@ from __future__ import unicode_literals
 
 import gettext
 import io
-import json
 import logging
 import os
 import os.path
@@ -44,6 +43,7 @@ from babel.messages.pofile import read_po
 
 from tuxemon.constants import paths
 from tuxemon.core import prepare
+from tuxemon.core.db import read_json_files
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +62,9 @@ class TranslatorPo(object):
         """Collect languages/locales with available translation files."""
         self.languages = []
 
-        for ld in os.listdir(prepare.fetch("l18n")):
-            ld_full_path = os.path.join(prepare.fetch("l18n"), ld)
+        l18n_path = prepare.fetch("l18n")
+        for ld in prepare.listdir(l18n_path):
+            ld_full_path = os.path.join(l18n_path, ld)
 
             if os.path.isdir(ld_full_path):
                 self.languages.append(ld)
@@ -188,7 +189,7 @@ class Translator(object):
         locale_files = []
 
         for d in directories:
-            for locale_file in os.listdir(d):
+            for locale_file in sorted(os.listdir(d)):
                 locale_file_path = os.path.join(d, locale_file)
 
                 if os.path.isfile(locale_file_path) and locale_file_path.endswith(".json"):
@@ -204,19 +205,14 @@ class Translator(object):
         """
         translations = {}
 
-        for locale_file in locale_files:
-            filename = os.path.splitext(os.path.basename(locale_file))[0]
+        matching_files = [
+            locale_file for locale_file in locale_files
+            if os.path.splitext(os.path.basename(locale_file))[0] == locale_name
+        ]
 
-            if filename != locale_name:
-                continue
-
-            try:
-                with io.open(locale_file, "r", encoding="UTF-8") as f:
-                    data = json.load(f)
-
-                translations.update(data)
-            except Exception as e:
-                logger.error("Unable to load translation:", e)
+        # a file which cannot be read is skipped, and the others still load
+        for data in read_json_files(matching_files, skip_errors=True):
+            translations.update(data)
 
         return translations
 
@@ -33,6 +33,7 @@ from __future__ import unicode_literals
 
 import logging
 
+from tuxemon.constants import paths
 from tuxemon.core import log
 from tuxemon.core import prepare
 from tuxemon.core.player import Player
@@ -110,6 +111,10 @@ def main(load_slot=None):
     client.main()
     pygame.quit()
 
+    profiler = client.event_engine.profiler
+    if profiler.enabled:
+        profiler.save(paths.USER_EVENT_PROFILE_PATH)
+
 
 def headless():
     """Sets up out headless server and start the game.
@@ -34,15 +34,20 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import logging
+from array import array
+from collections import OrderedDict
 from itertools import product
 from math import pi, atan2
 
 import pyscroll
+import pytmx
 
 from tuxemon.compat import Rect
 from tuxemon.core import prepare
 from tuxemon.core.euclid import Vector2, Vector3, Point2
-from tuxemon.core.tools import round_to_divisible
+from tuxemon.core.event.eventindex import EventIndex
+from tuxemon.core.pathfinding import Pathfinder
+from tuxemon.core.tools import nearest, round_to_divisible
 
 logger = logging.getLogger(__name__)
 
@@ -272,6 +277,302 @@ class PathfindNode(object):
         return s
 
 
+# order of directions in the collision grid, and their offsets
+grid_directions = ("down", "right", "up", "left")
+grid_offsets = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# collision grid flags
+# tile has collision data, and can only be entered from its enter directions
+COLLISION = 1 << 0
+# tile moves entities in its continue direction
+CONTINUE = 1 << 1
+# the next flags have one bit for each direction, in grid_directions order
+ENTER_SHIFT = 2
+EXIT_SHIFT = 6
+WALL_SHIFT = 10
+# index of the continue direction, two bits
+CONTINUE_SHIFT = 14
+EXIT_MASK = 0b1111 << EXIT_SHIFT
+
+
+class CollisionGrid(object):
+    """ Compact collision data of a map, with flags for each tile
+
+    Built from the collision map and collision lines of a map, so that
+    movement checks only need to index an array.  See get_exits for the
+    meaning of the flags.
+    """
+
+    def __init__(self, size, collision_map, collision_lines_map):
+        """
+
+        :param Tuple[int, int] size: Width and height of the map, in tiles
+        :param Dict collision_map: Collision map
+        :param Set collision_lines_map: Collision lines map
+        """
+        self.width, self.height = size
+        self.flags = array("H", bytes(2 * self.width * self.height))
+
+        for position, region in collision_map.items():
+            index = self.index(position)
+            if index is None:
+                continue
+            flags = COLLISION
+            if region:
+                for i, direction in enumerate(grid_directions):
+                    if direction in region.get("enter", ()):
+                        flags |= 1 << (ENTER_SHIFT + i)
+                    if direction in region.get("exit", ()):
+                        flags |= 1 << (EXIT_SHIFT + i)
+                if region.get("continue") in grid_directions:
+                    flags |= CONTINUE
+                    flags |= grid_directions.index(region["continue"]) << CONTINUE_SHIFT
+            self.flags[index] |= flags
+
+        for position, direction in collision_lines_map:
+            index = self.index(position)
+            if index is not None and direction in grid_directions:
+                self.flags[index] |= 1 << (WALL_SHIFT + grid_directions.index(direction))
+
+    def index(self, position):
+        """ Return the index of a tile in the flags, or None if outside the map
+
+        :param Tuple[int, int] position: Tile position
+        :rtype: Optional[int]
+        """
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(y) * self.width + int(x)
+        return None
+
+    def has_collision(self, position):
+        """ Check if a tile has collision data.  These are not blocked by entities
+
+        :param Tuple[int, int] position: Tile position
+        :rtype: bool
+        """
+        index = self.index(position)
+        return index is not None and bool(self.flags[index] & COLLISION)
+
+    def continue_direction(self, position):
+        """ Return the direction a tile moves entities in, if any
+
+        :param Tuple[int, int] position: Tile position
+        :rtype: Optional[str]
+        """
+        index = self.index(position)
+        if index is not None:
+            flags = self.flags[index]
+            if flags & CONTINUE:
+                return grid_directions[(flags >> CONTINUE_SHIFT) & 3]
+        return None
+
+    def get_exits(self, position, occupied=(), skip_nodes=()):
+        """ Return list of tiles which can be moved into
+
+        * A "continue" tile can only be left in its continue direction
+        * A tile with "exit" directions can only be left in those directions
+        * Tiles cannot be left through a wall
+        * A tile with collision data can only be entered from its "enter"
+          directions.  Tiles without collision data are blocked by entities.
+
+        :param Tuple[int, int] position: Tile position
+        :param Container occupied: Positions of entities
+        :param Container skip_nodes: Positions which are not returned
+        :rtype: List[Tuple[int, int]]
+        """
+        x, y = position
+        width, height = self.width, self.height
+        index = self.index(position)
+        flags = 0 if index is None else self.flags[index]
+
+        if flags & CONTINUE:
+            allowed = 1 << ((flags >> CONTINUE_SHIFT) & 3)
+        elif flags & EXIT_MASK:
+            allowed = 0
+            for i, (dx, dy) in enumerate(grid_offsets):
+                if flags & (1 << (EXIT_SHIFT + i)) and (x + dx, y + dy) not in skip_nodes:
+                    allowed |= 1 << i
+            # when all exits are skipped, there are no limits
+            if not allowed:
+                allowed = 0b1111
+        else:
+            allowed = 0b1111
+
+        adjacent_tiles = list()
+        for i, (dx, dy) in enumerate(grid_offsets):
+            if not allowed & (1 << i) or flags & (1 << (WALL_SHIFT + i)):
+                continue
+
+            nx = x + dx
+            ny = y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+
+            neighbor = nx, ny
+            if neighbor in skip_nodes:
+                continue
+
+            neighbor_flags = self.flags[int(ny) * width + int(nx)]
+            if neighbor_flags & COLLISION:
+                # must be able to enter from the opposite direction
+                if not neighbor_flags & (1 << (ENTER_SHIFT + (i + 2) % 4)):
+                    continue
+            elif neighbor in occupied:
+                continue
+
+            adjacent_tiles.append(neighbor)
+
+        return adjacent_tiles
+
+    def get_entrances(self, position):
+        """ Return list of tiles which can move into a tile
+
+        The reverse of get_exits, ignoring entities: a tile is returned if
+        the position would be one of its exits.
+
+        :param Tuple[int, int] position: Tile position
+        :rtype: List[Tuple[int, int]]
+        """
+        x, y = position
+        width, height = self.width, self.height
+        index = self.index(position)
+        if index is None:
+            return []
+        flags = self.flags[index]
+
+        adjacent_tiles = list()
+        for i, (dx, dy) in enumerate(grid_offsets):
+            # the neighbor moves in direction i to enter the position
+            nx = x - dx
+            ny = y - dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+
+            if flags & COLLISION and not flags & (1 << (ENTER_SHIFT + (i + 2) % 4)):
+                continue
+
+            neighbor_flags = self.flags[int(ny) * width + int(nx)]
+            if neighbor_flags & (1 << (WALL_SHIFT + i)):
+                continue
+            if neighbor_flags & CONTINUE:
+                if (neighbor_flags >> CONTINUE_SHIFT) & 3 != i:
+                    continue
+            elif neighbor_flags & EXIT_MASK:
+                if not neighbor_flags & (1 << (EXIT_SHIFT + i)):
+                    continue
+
+            adjacent_tiles.append((nx, ny))
+
+        return adjacent_tiles
+
+
+class OccupancyIndex(object):
+    """ Tiles which are occupied by entities
+
+    Kept up to date by the world as entities are added, removed and moved,
+    so collision checks do not have to look at every entity.  Positions of
+    entities are rounded to the nearest tile.
+
+    Listeners are called with the entity, its old position and its new
+    position each time an entity changes tiles.  The old position is None
+    when an entity is added, and the new position is None when removed.
+    """
+
+    def __init__(self):
+        self.tiles = dict()
+        self.positions = dict()
+        self.listeners = list()
+
+    def __contains__(self, position):
+        return position in self.tiles
+
+    def __iter__(self):
+        return iter(self.tiles)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def get(self, position):
+        """ Return the entities on a tile
+
+        :param Tuple[int, int] position: Tile position
+        :rtype: Set[tuxemon.core.entity.Entity]
+        """
+        return self.tiles.get(position, set())
+
+    def add(self, entity):
+        """ Add an entity at its current position
+
+        :param tuxemon.core.entity.Entity entity:
+        :return: None
+        """
+        position = nearest(entity.tile_pos)
+        self.positions[entity] = position
+        self.tiles.setdefault(position, set()).add(entity)
+        self.notify(entity, None, position)
+
+    def remove(self, entity):
+        """ Remove an entity
+
+        :param tuxemon.core.entity.Entity entity:
+        :return: None
+        """
+        try:
+            position = self.positions.pop(entity)
+        except KeyError:
+            return
+        self.discard(entity, position)
+        self.notify(entity, position, None)
+
+    def discard(self, entity, position):
+        """ Remove an entity from the set of a tile
+
+        :param tuxemon.core.entity.Entity entity:
+        :param Tuple[int, int] position: Tile position
+        :return: None
+        """
+        entities = self.tiles[position]
+        entities.discard(entity)
+        if not entities:
+            del self.tiles[position]
+
+    def move(self, entity):
+        """ Update the position of an entity which has moved
+
+        :param tuxemon.core.entity.Entity entity:
+        :return: None
+        """
+        old_position = self.positions.get(entity)
+        if old_position is None:
+            return
+        position = nearest(entity.tile_pos)
+        if position != old_position:
+            self.discard(entity, old_position)
+            self.positions[entity] = position
+            self.tiles.setdefault(position, set()).add(entity)
+            self.notify(entity, old_position, position)
+
+    def notify(self, entity, old_position, position):
+        """ Call the listeners after an entity changed tiles
+
+        :param tuxemon.core.entity.Entity entity:
+        :param Optional[Tuple[int, int]] old_position: Old tile position
+        :param Optional[Tuple[int, int]] position: New tile position
+        :return: None
+        """
+        for listener in self.listeners:
+            listener(entity, old_position, position)
+
+    def clear(self):
+        """ Remove all entities
+
+        :return: None
+        """
+        self.tiles.clear()
+        self.positions.clear()
+
+
 class TuxemonMap(object):
     """
     Contains collisions geometry and events loaded from a file
@@ -305,8 +606,12 @@ class TuxemonMap(object):
         self.collision_lines_map = collisions_lines_map
         self.npcs = dict()
         self.size = raw_data.width, raw_data.height
+        self.collision_grid = CollisionGrid(self.size, collision_map, collisions_lines_map)
+        self.pathfinder = Pathfinder(self.collision_grid)
         self.inits = inits
         self.events = events
+        self.event_index = EventIndex(events)
+        self.interact_index = EventIndex(interacts)
         self.renderer = None
         self.edges = edges
         self.data = raw_data
@@ -442,3 +747,103 @@ class TuxemonMap(object):
         """
         pos = self.get_pos_from_tilepos(npc.tile_pos)
         return Rect(pos, self.tile_size)
+
+
+def estimate_map_size(map_data):
+    """ Return about how many bytes of memory a loaded map keeps alive
+
+    Counts the tile layers and collision grid of the map, and the buffers
+    of its renderer, which are the largest parts.  Tilesets are shared by
+    all maps through graphics.tileset_cache, so they are not counted.
+
+    :param TuxemonMap map_data: Loaded map
+    :rtype: int
+    """
+    width, height = map_data.size
+    tile_layers = sum(1 for layer in map_data.data.layers if isinstance(layer, pytmx.TiledTileLayer))
+
+    # one reference per tile of each layer, and the collision flags
+    size = width * height * (tile_layers * 8 + 2)
+
+    if map_data.renderer is not None:
+        for name in ("_buffer", "_zoom_buffer"):
+            surface = getattr(map_data.renderer, name, None)
+            if surface is not None:
+                surface_width, surface_height = surface.get_size()
+                size += surface_width * surface_height * surface.get_bytesize()
+
+    return size
+
+
+class MapCache(object):
+    """ Least recently used cache of loaded maps
+
+    Maps are kept with their renderers, so going back to a recently
+    visited map does not load or render it again.  When the estimated size
+    of the maps is over the limit, the least recently used maps are
+    dropped.  The most recently added map is always kept.
+
+    Renderers are created when a map is first drawn, after it is added, so
+    the size of the maps is estimated again each time a map is added.
+    """
+
+    def __init__(self, max_size):
+        """
+
+        :param int max_size: Maximum estimated size of all maps, in bytes
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.maps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, filename):
+        return filename in self.maps
+
+    def __len__(self):
+        return len(self.maps)
+
+    def get(self, filename):
+        """ Return a cached map, and mark it as the most recently used
+
+        :param str filename: Path of the map
+        :rtype: Optional[TuxemonMap]
+        :returns: The map, or None if it is not cached
+        """
+        try:
+            map_data = self.maps[filename]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.maps.move_to_end(filename)
+        return map_data
+
+    def add(self, filename, map_data):
+        """ Add a map, dropping the least recently used maps if over the limit
+
+        :param str filename: Path of the map
+        :param TuxemonMap map_data: Loaded map
+        :return: None
+        """
+        self.maps[filename] = map_data
+        self.maps.move_to_end(filename)
+
+        sizes = {name: estimate_map_size(cached) for name, cached in self.maps.items()}
+        self.size = sum(sizes.values())
+        while self.size > self.max_size and len(self.maps) > 1:
+            evicted, _ = self.maps.popitem(last=False)
+            self.size -= sizes[evicted]
+            self.evictions += 1
+            logger.debug("dropped {} from map cache".format(evicted))
+
+    def clear(self):
+        """ Drop all cached maps
+
+        :return: None
+        """
+        self.maps.clear()
+        self.size = 0
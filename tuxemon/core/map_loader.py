@@ -29,13 +29,20 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import hashlib
+import io
 import logging
+import os
+import pickle
+from collections import namedtuple
 from math import cos, sin, pi
+from xml.etree import ElementTree
 
 import pytmx
 from natsort import natsorted
 
 from tuxemon.compat import Rect
+from tuxemon.constants import paths
 from tuxemon.core import prepare
 from tuxemon.core.event import EventObject, MapAction, MapCondition
 from tuxemon.core.graphics import scaled_image_loader
@@ -53,6 +60,15 @@ from tuxemon.lib.bresenham import bresenham
 
 logger = logging.getLogger(__name__)
 
+# change this when the contents of compiled maps are changed, so that
+# old compiled maps are not loaded
+COMPILED_MAP_VERSION = 1
+
+# everything the game needs from a map, except the tiles
+CompiledMap = namedtuple(
+    "CompiledMap", "events inits interacts collision_map collision_lines_map"
+)
+
 # TODO: standardize and document these values
 region_properties = [
     "enter",
@@ -104,7 +120,46 @@ class TMXMapLoader(object):
 
     """
 
-    def load(self, filename):
+    @staticmethod
+    def load_tiled_map(filename, tmx, objects=True, images=True):
+        """ Load a tmx file with pytmx
+
+        Tilesets must be embedded in maps inside resource packs, since
+        pytmx reads external tilesets from disk.
+
+        :param str filename: The path to the tmx map file to load.
+        :param bytes tmx: Contents of the tmx file
+        :param bool objects: If False, objects are removed before parsing
+        :param bool images: If False, the tiles are loaded later with load_images
+        :rtype: pytmx.TiledMap
+        """
+        root = ElementTree.fromstring(tmx)
+        if not objects:
+            # object groups are kept, so the layers do not change
+            for group in root.findall("objectgroup"):
+                for obj in group.findall("object"):
+                    group.remove(obj)
+
+        if images:
+            data = pytmx.TiledMap(image_loader=scaled_image_loader, pixelalpha=True)
+        else:
+            data = pytmx.TiledMap(pixelalpha=True)
+        # set the filename first, so that images are found next to the map
+        data.filename = filename
+        data.parse_xml(root)
+        return data
+
+    @staticmethod
+    def load_images(data):
+        """ Load the tiles of a map which was loaded without images
+
+        :param pytmx.TiledMap data: Map loaded with load_tiled_map
+        :return: None
+        """
+        data.image_loader = scaled_image_loader
+        data.reload_images()
+
+    def load(self, filename, preloaded=None):
         """ Load map data from a tmx map file
 
         Loading the map data is done using the pytmx library.
@@ -119,6 +174,10 @@ class TMXMapLoader(object):
         walk through. This set is generated based on collision regions defined
         in the map file.
 
+        The collisions and events are compiled once, and saved in the game
+        cache folder.  When the map is loaded again, they are read from the
+        compiled map, and pytmx only has to load the tiles.
+
         **Examples:**
 
         In each map, there are three types of objects: **collisions**,
@@ -129,20 +188,94 @@ class TMXMapLoader(object):
 
         :param filename: The path to the tmx map file to load.
         :type filename: String
+        :param preloaded: The map from load_without_images, if it was loaded
+            ahead of time.  Only the tiles are left to load.
 
         :rtype: tuxemon.core.map.TuxemonMap
         """
-        data = pytmx.TiledMap(
-            filename, image_loader=scaled_image_loader, pixelalpha=True
+        if preloaded is not None:
+            compiled, data = preloaded
+            self.load_images(data)
+        else:
+            with prepare.RESOURCES.open(filename) as fp:
+                tmx = fp.read()
+
+            compiled_path = get_compiled_map_path(tmx)
+            compiled = load_compiled_map(compiled_path)
+            if compiled is None:
+                data = self.load_tiled_map(filename, tmx)
+                compiled = self.compile(data)
+                save_compiled_map(compiled_path, compiled)
+            else:
+                data = self.load_tiled_map(filename, tmx, objects=False)
+
+        data.tilewidth, data.tileheight = prepare.TILE_SIZE
+        edges = data.properties.get("edges")
+
+        return TuxemonMap(
+            compiled.events,
+            compiled.inits,
+            compiled.interacts,
+            compiled.collision_map,
+            compiled.collision_lines_map,
+            data,
+            edges,
+            filename,
         )
+
+    def load_without_images(self, filename):
+        """ Load a map, except for the images of its tiles
+
+        The collisions and events are compiled, and the layers are parsed.
+        No images are loaded and the graphics caches are not used, so this
+        may be called from threads other than the main thread.  Pass the
+        result to load to load the tiles.
+
+        :param str filename: The path to the tmx map file to load.
+        :rtype: Tuple[CompiledMap, pytmx.TiledMap]
+        """
+        with prepare.RESOURCES.open(filename) as fp:
+            tmx = fp.read()
+
+        compiled_path = get_compiled_map_path(tmx)
+        compiled = load_compiled_map(compiled_path)
+        if compiled is None:
+            data = self.load_tiled_map(filename, tmx, images=False)
+            compiled = self.compile(data)
+            save_compiled_map(compiled_path, compiled)
+        else:
+            data = self.load_tiled_map(filename, tmx, objects=False, images=False)
+        return compiled, data
+
+    def load_compiled(self, filename, tmx):
+        """ Load the collisions and events of a map, compiling them if needed
+
+        No images are loaded and the graphics caches are not used, so this
+        may be called from threads other than the main thread.
+
+        :param str filename: The path to the tmx map file
+        :param bytes tmx: Contents of the tmx file
+        :rtype: CompiledMap
+        """
+        compiled_path = get_compiled_map_path(tmx)
+        compiled = load_compiled_map(compiled_path)
+        if compiled is None:
+            compiled = self.compile(self.load_tiled_map(filename, tmx, images=False))
+            save_compiled_map(compiled_path, compiled)
+        return compiled
+
+    def compile(self, data):
+        """ Build the collisions and events from the objects of a map
+
+        :param pytmx.TiledMap data: Map loaded with pytmx
+        :rtype: CompiledMap
+        """
         tile_size = (data.tilewidth, data.tileheight)
-        data.tilewidth, data.tileheight = prepare.TILE_SIZE
         events = list()
         inits = list()
         interacts = list()
         collision_map = dict()
         collision_lines_map = set()
-        edges = data.properties.get("edges")
 
         for obj in data.objects:
             if obj.type == "collision":
@@ -167,16 +300,7 @@ class TMXMapLoader(object):
             elif obj.type == "interact":
                 interacts.append(self.load_event(obj, tile_size))
 
-        return TuxemonMap(
-            events,
-            inits,
-            interacts,
-            collision_map,
-            collision_lines_map,
-            data,
-            edges,
-            filename,
-        )
+        return CompiledMap(events, inits, interacts, collision_map, collision_lines_map)
 
     def process_line(self, line, tile_size):
         """ Identify the tiles on either side of the line and block movement along it
@@ -266,3 +390,104 @@ class TMXMapLoader(object):
             conds.append(cond_data)
 
         return EventObject(obj.id, obj.name, x, y, w, h, conds, acts)
+
+
+def read_map_size(tmx):
+    """ Return the size of a map in tiles, without parsing the whole tmx file
+
+    :param bytes tmx: Contents of the tmx file
+    :rtype: Tuple[int, int]
+    """
+    for _, element in ElementTree.iterparse(io.BytesIO(tmx), events=("start",)):
+        return int(element.get("width")), int(element.get("height"))
+
+
+def get_compiled_map_path(tmx):
+    """ Return the path of the compiled map for the contents of a tmx file
+
+    :param bytes tmx: Contents of the tmx file
+    :rtype: str
+    """
+    digest = hashlib.sha1(tmx).hexdigest()
+    return os.path.join(paths.USER_GAME_CACHE_DIR, "map-{}.pickle".format(digest))
+
+
+def load_compiled_map(path):
+    """ Load a compiled map, if there is a valid one
+
+    :param str path: Path of the compiled map
+    :rtype: Optional[CompiledMap]
+    """
+    try:
+        with open(path, "rb") as fp:
+            version, events, inits, interacts, collision_map, collision_lines_map = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("unable to read compiled map {}, rebuilding".format(path))
+        return None
+
+    if version != COMPILED_MAP_VERSION:
+        return None
+
+    return CompiledMap(
+        [decode_event(i) for i in events],
+        [decode_event(i) for i in inits],
+        [decode_event(i) for i in interacts],
+        collision_map,
+        collision_lines_map,
+    )
+
+
+def save_compiled_map(path, compiled):
+    """ Save a compiled map, so the map loads faster next time
+
+    Failure to write the compiled map is not an error; the map will just
+    be compiled again next time.
+
+    :param str path: Path of the compiled map
+    :param CompiledMap compiled: Map to save
+    :return: None
+    """
+    # events are saved as plain tuples, because the event namedtuples
+    # cannot be found by pickle under their type names
+    data = (
+        COMPILED_MAP_VERSION,
+        [encode_event(i) for i in compiled.events],
+        [encode_event(i) for i in compiled.inits],
+        [encode_event(i) for i in compiled.interacts],
+        compiled.collision_map,
+        compiled.collision_lines_map,
+    )
+
+    # write to a temporary file first, so an interrupted write
+    # will never leave a partial compiled map to be loaded later
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as fp:
+            pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except (IOError, OSError):
+        logger.warning("unable to write compiled map {}".format(path))
+
+
+def encode_event(event):
+    """ Convert an EventObject to plain tuples and lists
+
+    :param EventObject event:
+    :rtype: tuple
+    """
+    conds = [tuple(i) for i in event.conds]
+    acts = [tuple(i) for i in event.acts]
+    return tuple(event[:6]) + (conds, acts)
+
+
+def decode_event(data):
+    """ Convert plain tuples and lists back to an EventObject
+
+    :param tuple data: Data from encode_event
+    :rtype: EventObject
+    """
+    conds = [MapCondition(*i) for i in data[6]]
+    acts = [MapAction(*i) for i in data[7]]
+    return EventObject(*data[:6], conds=conds, acts=acts)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.map_preloader Load the maps the player may teleport to in the background.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from tuxemon.core import prepare
+from tuxemon.core.map_loader import TMXMapLoader
+
+logger = logging.getLogger(__name__)
+
+# actions which change the map; the first parameter is the map name
+teleport_actions = ("teleport", "transition_teleport", "delayed_teleport")
+
+# maximum number of maps which are loaded ahead of time
+MAX_PRELOADED_MAPS = 4
+
+
+def teleport_destinations(map_data):
+    """ Return the paths of the maps which a map can teleport to
+
+    :param tuxemon.core.map.TuxemonMap map_data: Map to scan
+    :rtype: List[str]
+    """
+    destinations = list()
+    for event in map_data.events + map_data.inits + map_data.interacts:
+        for action in event.acts:
+            if action.type in teleport_actions and action.parameters:
+                try:
+                    path = prepare.fetch("maps", action.parameters[0])
+                except IOError:
+                    logger.warning("teleport to missing map {}".format(action.parameters[0]))
+                    continue
+                if path != map_data.filename and path not in destinations:
+                    destinations.append(path)
+    return destinations
+
+
+class MapPreloader(object):
+    """ Load the destinations of the teleports of a map in the background
+
+    The worker reads and parses the maps with
+    TMXMapLoader.load_without_images, and compiles their collisions and
+    events.  Images and the graphics caches are only used by the main
+    thread, which loads the tiles when the map is used.
+
+    Maps which are not a destination of the current map are dropped.
+    """
+
+    def __init__(self, max_maps=MAX_PRELOADED_MAPS):
+        """
+
+        :param int max_maps: Maximum number of maps to load ahead of time
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.max_maps = max_maps
+        self.futures = dict()
+
+    def scan(self, map_data, loaded=()):
+        """ Start loading the teleport destinations of a map
+
+        :param tuxemon.core.map.TuxemonMap map_data: Current map
+        :param Container[str] loaded: Paths of maps which are already loaded
+        :return: None
+        """
+        destinations = [i for i in teleport_destinations(map_data) if i not in loaded]
+        destinations = destinations[:self.max_maps]
+
+        for filename in list(self.futures):
+            if filename not in destinations:
+                self.futures.pop(filename).cancel()
+
+        for filename in destinations:
+            if filename not in self.futures:
+                logger.debug("preloading {}".format(filename))
+                self.futures[filename] = self.executor.submit(TMXMapLoader().load_without_images, filename)
+
+    def get(self, filename):
+        """ Return a map loaded without its images, waiting if still loading
+
+        :param str filename: Path of the map
+        :rtype: Optional[Tuple[tuxemon.core.map_loader.CompiledMap, pytmx.TiledMap]]
+        :returns: The map to pass to TMXMapLoader.load, or None if it was not preloaded
+        """
+        try:
+            future = self.futures.pop(filename)
+        except KeyError:
+            return None
+
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error("unable to preload {}: {}".format(filename, e))
+            return None
+
+    def clear(self):
+        """ Drop all preloaded maps
+
+        :return: None
+        """
+        for future in self.futures.values():
+            future.cancel()
+        self.futures = dict()
+
+    def shutdown(self):
+        """ Drop all preloaded maps and stop the worker
+
+        :return: None
+        """
+        self.clear()
+        self.executor.shutdown(wait=False)
@@ -35,6 +35,7 @@ from __future__ import unicode_literals
 
 import logging
 import os
+from collections import namedtuple
 from math import hypot
 
 from tuxemon.compat import Rect
@@ -47,6 +48,7 @@ from tuxemon.core.locale import T
 from tuxemon.core.map import proj, facing, dirs3, dirs2, get_direction
 from tuxemon.core.monster import Monster, MAX_LEVEL, decode_monsters, encode_monsters
 from tuxemon.core.prepare import CONFIG
+from tuxemon.core.session import GameVariables
 from tuxemon.core.tools import nearest, trunc
 from tuxemon.core.graphics import load_and_scale
 
@@ -68,6 +70,64 @@ animation_mapping = {
 }
 
 
+# surfaces and animations of one sprite name, shared by all npcs using it
+SpriteSet = namedtuple("SpriteSet", "standing animations")
+
+# cache of sprite sets, by sprite name
+sprite_sets = dict()
+
+
+def get_sprite_set(sprite_name):
+    """ Return the standing images and walk animations of a sprite name
+
+    The images are only loaded the first time a sprite name is used.  The
+    surfaces are shared, so they must not be changed; use getCopy to get
+    animations which can be played independently.
+
+    :param str sprite_name: Name of the sprite, like "adventurer"
+    :rtype: SpriteSet
+    """
+    try:
+        return sprite_sets[sprite_name]
+    except KeyError:
+        pass
+
+    # Get all of the standing animation images.
+    standing = {}
+    for standing_type in facing:
+        filename = "{}_{}.png".format(sprite_name, standing_type)
+        path = os.path.join("sprites", filename)
+        standing[standing_type] = load_and_scale(path)
+
+    # avoid cutoff frames when steps don't line up with tile movement
+    frames = 3
+    frame_duration = (1000 / CONFIG.player_walkrate) / frames / 1000 * 2
+
+    # Load all of the sprite animations
+    animations = {}
+    anim_types = ['front_walk', 'back_walk', 'left_walk', 'right_walk']
+    for anim_type in anim_types:
+        images = [
+            'sprites/%s_%s.%s.png' % (
+                sprite_name,
+                anim_type,
+                str(num).rjust(3, str('0'))
+            )
+            for num in range(4)
+        ]
+
+        frames = []
+        for image in images:
+            surface = load_and_scale(image)
+            frames.append((surface, frame_duration))
+
+        animations[anim_type] = pyganim.PygAnimation(frames, loop=True)
+
+    sprite_set = SpriteSet(standing, animations)
+    sprite_sets[sprite_name] = sprite_set
+    return sprite_set
+
+
 def tile_distance(tile0, tile1):
     x0, y0 = tile0
     x1, y1 = tile1
@@ -111,7 +171,7 @@ class NPC(Entity):
 
         # general
         self.behavior = "wander"  # not used for now
-        self.game_variables = {}  # Tracks the game state
+        self.game_variables = GameVariables()  # Tracks the game state
         self.interactions = []  # List of ways player can interact with the Npc
         self.isplayer = False  # used for various tests, idk
         self.monsters = []  # This is a list of tuxemon the npc has. Do not modify directly
@@ -189,7 +249,7 @@ class NPC(Entity):
         """
 
         self.facing = save_data.get('facing', 'down')
-        self.game_variables = save_data['game_variables']
+        self.game_variables = GameVariables(save_data['game_variables'])
         self.inventory = decode_inventory(session, self, save_data)
         self.monsters = decode_monsters(save_data)
         self.name = save_data['player_name']
@@ -204,37 +264,14 @@ class NPC(Entity):
         :return:
         """
         # TODO: refactor animations into renderer
-        # Get all of the player's standing animation images.
-        self.standing = {}
-        for standing_type in facing:
-            filename = "{}_{}.png".format(self.sprite_name, standing_type)
-            path = os.path.join("sprites", filename)
-            self.standing[standing_type] = load_and_scale(path)
-
+        # Images are shared with other npcs using the same sprite, only
+        # the state of the animations belongs to this npc.
+        sprite_set = get_sprite_set(self.sprite_name)
+        self.standing = dict(sprite_set.standing)
         self.playerWidth, self.playerHeight = self.standing["front"].get_size()  # The player's sprite size in pixels
 
-        # avoid cutoff frames when steps don't line up with tile movement
-        frames = 3
-        frame_duration = (1000 / CONFIG.player_walkrate) / frames / 1000 * 2
-
-        # Load all of the player's sprite animations
-        anim_types = ['front_walk', 'back_walk', 'left_walk', 'right_walk']
-        for anim_type in anim_types:
-            images = [
-                'sprites/%s_%s.%s.png' % (
-                    self.sprite_name,
-                    anim_type,
-                    str(num).rjust(3, str('0'))
-                )
-                for num in range(4)
-            ]
-
-            frames = []
-            for image in images:
-                surface = load_and_scale(image)
-                frames.append((surface, frame_duration))
-
-            self.sprite[anim_type] = pyganim.PygAnimation(frames, loop=True)
+        for anim_type, animation in sprite_set.animations.items():
+            self.sprite[anim_type] = animation.getCopy()
 
         # Have the animation objects managed by a conductor.
         # With the conductor, we can call play() and stop() on all the animation objects
@@ -285,12 +322,10 @@ class NPC(Entity):
             self.next_waypoint()
 
     def check_continue(self):
-        try:
-            pos = tuple(int(i) for i in self.tile_pos)
-            direction_next = self.world.collision_map[pos]["continue"]
+        pos = tuple(int(i) for i in self.tile_pos)
+        direction_next = self.world.collision_grid.continue_direction(pos)
+        if direction_next:
             self.move_one_tile(direction_next)
-        except (KeyError, TypeError):
-            pass
 
     def stop_moving(self):
         """ Completely stop all movement
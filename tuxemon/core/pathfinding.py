@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.pathfinding A* search and flow fields over the collision grid of a map.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import heapq
+import logging
+from array import array
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# number of flow fields kept for each map
+DEFAULT_FLOW_FIELDS = 16
+
+# number of entities going to one tile before they share a flow field
+FLOW_FIELD_MIN_ENTITIES = 2
+
+
+class Pathfinder(object):
+    """ A* search over a collision grid
+
+    The search state is kept in arrays with one item per tile, allocated
+    once for each map.  Instead of clearing them for each search, tiles are
+    stamped with the number of the search which last visited them.
+
+    Exits of tiles are checked with CollisionGrid.get_exits, so walls,
+    one-way and continue tiles are respected.
+    """
+
+    def __init__(self, grid):
+        """
+
+        :param tuxemon.core.map.CollisionGrid grid: Collision grid of the map
+        """
+        self.grid = grid
+        size = grid.width * grid.height
+        self.search_id = 0
+        self.visited = array("I", bytes(4 * size))
+        self.cost = array("I", bytes(4 * size))
+        self.parent = array("i", bytes(4 * size))
+
+    def find_path(self, start, dest, occupied=(), max_nodes=None):
+        """ Find the shortest path between two tiles
+
+        The path is returned in reverse order, and does not include the
+        start: the first item is the destination, and the last item is the
+        first tile to move into.
+
+        :param Tuple[int, int] start: Tile to start from
+        :param Tuple[int, int] dest: Tile to move to
+        :param Container occupied: Positions of entities, which block movement
+        :param int max_nodes: Maximum number of tiles to expand. By default, all tiles of the map
+        :rtype: Optional[List[Tuple[int, int]]]
+        :returns: The path, or None if there is no path within the budget
+        """
+        grid = self.grid
+        width = grid.width
+        if max_nodes is None:
+            max_nodes = grid.width * grid.height
+        start = tuple(int(i) for i in start)
+        dest = tuple(int(i) for i in dest)
+        start_index = grid.index(start)
+        dest_index = grid.index(dest)
+        if start_index is None or dest_index is None:
+            return None
+        if start == dest:
+            return []
+
+        self.search_id += 1
+        search_id = self.search_id
+        visited = self.visited
+        cost = self.cost
+        parent = self.parent
+        dest_x, dest_y = dest
+
+        visited[start_index] = search_id
+        cost[start_index] = 0
+        parent[start_index] = -1
+
+        # items are (estimated total cost, negated cost so far, order added,
+        # tile index, position).  When estimates are equal, the tiles furthest
+        # from the start are expanded first, so open areas are not searched
+        # breadth first; the order keeps searches stable
+        queue = [(abs(dest_x - start[0]) + abs(dest_y - start[1]), 0, 0, start_index, start)]
+        pushed = 1
+        expanded = 0
+
+        while queue:
+            estimate, _, _, index, position = heapq.heappop(queue)
+            if index == dest_index:
+                return self.build_path(index)
+
+            # skip tiles which were reached again with a lower cost
+            if estimate > cost[index] + abs(dest_x - position[0]) + abs(dest_y - position[1]):
+                continue
+
+            expanded += 1
+            if expanded > max_nodes:
+                logger.debug("pathfinding from {} to {} was over budget".format(start, dest))
+                return None
+
+            next_cost = cost[index] + 1
+            for neighbor in grid.get_exits(position, occupied):
+                x, y = neighbor
+                neighbor_index = y * width + x
+                if visited[neighbor_index] == search_id and cost[neighbor_index] <= next_cost:
+                    continue
+                visited[neighbor_index] = search_id
+                cost[neighbor_index] = next_cost
+                parent[neighbor_index] = index
+                estimate = next_cost + abs(dest_x - x) + abs(dest_y - y)
+                heapq.heappush(queue, (estimate, -next_cost, pushed, neighbor_index, neighbor))
+                pushed += 1
+
+        return None
+
+    def build_path(self, index):
+        """ Follow parents from a tile to the start of the search
+
+        :param int index: Index of the last tile of the path
+        :rtype: List[Tuple[int, int]]
+        """
+        width = self.grid.width
+        path = list()
+        while self.parent[index] != -1:
+            path.append((index % width, index // width))
+            index = self.parent[index]
+        return path
+
+
+class FlowField(object):
+    """ Distance of every tile to one destination
+
+    Built by a single search outwards from the destination, following the
+    moves of CollisionGrid.get_exits backwards.  Any number of entities
+    going to the same destination can then read their next step from the
+    field, instead of each running their own search.
+
+    Tiles which are occupied by entities block the field, like they do for
+    Pathfinder.  When an entity enters or leaves a tile, only the distances
+    which went through that tile are searched again, so the field does not
+    have to be built again each time an entity moves.
+    """
+
+    def __init__(self, grid, dest, blocked=(), max_nodes=None):
+        """
+
+        :param tuxemon.core.map.CollisionGrid grid: Collision grid of the map
+        :param Tuple[int, int] dest: Tile to move to
+        :param Container blocked: Positions of entities, which block movement
+        :param int max_nodes: Maximum number of tiles to expand. By default, all tiles of the map
+        """
+        if max_nodes is None:
+            max_nodes = grid.width * grid.height
+        self.grid = grid
+        self.dest = tuple(int(i) for i in dest)
+        self.distance = array("i", [-1]) * (grid.width * grid.height)
+        self.blocked = {position for position in blocked if not grid.has_collision(position)}
+        self.build(max_nodes)
+
+    def build(self, max_nodes):
+        """ Search outwards from the destination
+
+        :param int max_nodes: Maximum number of tiles to expand
+        :return: None
+        """
+        grid = self.grid
+        width = grid.width
+        distance = self.distance
+        blocked = self.blocked
+        dest_index = grid.index(self.dest)
+        if dest_index is None or self.dest in blocked:
+            return
+
+        distance[dest_index] = 0
+        queue = deque([self.dest])
+        expanded = 0
+
+        while queue:
+            position = queue.popleft()
+            expanded += 1
+            if expanded > max_nodes:
+                logger.debug("flow field to {} was over budget".format(self.dest))
+                break
+
+            next_distance = distance[position[1] * width + position[0]] + 1
+            for neighbor in grid.get_entrances(position):
+                x, y = neighbor
+                neighbor_index = y * width + x
+                if distance[neighbor_index] != -1 or neighbor in blocked:
+                    continue
+                distance[neighbor_index] = next_distance
+                queue.append(neighbor)
+
+    def get_distance(self, position):
+        """ Return the number of steps from a tile to the destination
+
+        :param Tuple[int, int] position: Tile position
+        :rtype: Optional[int]
+        :returns: The distance, or None if the destination cannot be reached
+        """
+        index = self.grid.index(position)
+        if index is None or self.distance[index] == -1:
+            return None
+        return self.distance[index]
+
+    def set_blocked(self, position, blocked):
+        """ Repair the field after an entity entered or left a tile
+
+        :param Tuple[int, int] position: Tile position
+        :param bool blocked: If the tile is now blocked by an entity
+        :return: None
+        """
+        position = tuple(int(i) for i in position)
+        if self.grid.index(position) is None or self.grid.has_collision(position):
+            return
+
+        if blocked and position not in self.blocked:
+            self.blocked.add(position)
+            self.raise_distances(position)
+        elif not blocked and position in self.blocked:
+            self.blocked.discard(position)
+            self.lower_distances(position)
+
+    def raise_distances(self, position):
+        """ Search again the distances which went through a tile now blocked
+
+        The tiles which cannot reach the destination in the same number of
+        steps without the blocked tile are found first.  Their distances
+        are then searched outwards from the tiles around them which kept
+        theirs.
+
+        :param Tuple[int, int] position: Tile position
+        :return: None
+        """
+        grid = self.grid
+        width = grid.width
+        distance = self.distance
+        index = grid.index(position)
+        if distance[index] == -1:
+            return
+
+        # tiles whose way to the destination went through the blocked tile
+        removed = dict()
+        removed[position] = distance[index]
+        distance[index] = -1
+        queue = deque([position])
+        while queue:
+            tile = queue.popleft()
+            for neighbor in grid.get_entrances(tile):
+                neighbor_index = neighbor[1] * width + neighbor[0]
+                neighbor_distance = distance[neighbor_index]
+                if neighbor_distance != removed[tile] + 1:
+                    continue
+                if any(distance[x[1] * width + x[0]] == neighbor_distance - 1 for x in grid.get_exits(neighbor)):
+                    continue
+                removed[neighbor] = neighbor_distance
+                distance[neighbor_index] = -1
+                queue.append(neighbor)
+        del removed[position]
+
+        # search the removed tiles again, from the tiles around them
+        heap = list()
+        for tile in removed:
+            distances = [distance[x[1] * width + x[0]] for x in grid.get_exits(tile)]
+            distances = [i for i in distances if i != -1]
+            if distances:
+                heapq.heappush(heap, (min(distances) + 1, tile))
+
+        while heap:
+            tile_distance, tile = heapq.heappop(heap)
+            tile_index = tile[1] * width + tile[0]
+            if distance[tile_index] != -1:
+                continue
+            distance[tile_index] = tile_distance
+            for neighbor in grid.get_entrances(tile):
+                if neighbor in removed and distance[neighbor[1] * width + neighbor[0]] == -1:
+                    heapq.heappush(heap, (tile_distance + 1, neighbor))
+
+    def lower_distances(self, position):
+        """ Search outwards from a tile which is no longer blocked
+
+        Only the tiles which get closer to the destination through the
+        tile are changed.
+
+        :param Tuple[int, int] position: Tile position
+        :return: None
+        """
+        grid = self.grid
+        width = grid.width
+        distance = self.distance
+
+        if position == self.dest:
+            start_distance = 0
+        else:
+            distances = [distance[x[1] * width + x[0]] for x in grid.get_exits(position)]
+            distances = [i for i in distances if i != -1]
+            if not distances:
+                return
+            start_distance = min(distances) + 1
+
+        queue = deque([(start_distance, position)])
+        while queue:
+            tile_distance, tile = queue.popleft()
+            tile_index = tile[1] * width + tile[0]
+            if distance[tile_index] != -1 and distance[tile_index] <= tile_distance:
+                continue
+            distance[tile_index] = tile_distance
+            for neighbor in grid.get_entrances(tile):
+                if neighbor in self.blocked:
+                    continue
+                neighbor_distance = distance[neighbor[1] * width + neighbor[0]]
+                if neighbor_distance == -1 or neighbor_distance > tile_distance + 1:
+                    queue.append((tile_distance + 1, neighbor))
+
+    def next_step(self, position, occupied=()):
+        """ Return the tile to move into to get closer to the destination
+
+        :param Tuple[int, int] position: Tile position
+        :param Container occupied: Positions of entities, which block movement
+        :rtype: Optional[Tuple[int, int]]
+        :returns: The tile, or None if there is no free tile closer
+        """
+        distance = self.get_distance(position)
+        if not distance:
+            return None
+
+        width = self.grid.width
+        for neighbor in self.grid.get_exits(position, occupied):
+            if self.distance[neighbor[1] * width + neighbor[0]] == distance - 1:
+                return neighbor
+        return None
+
+    def get_path(self, start, occupied=()):
+        """ Return the path from a tile to the destination
+
+        Entities are only checked for the first step; the path is checked
+        again as it is followed.  The path is in the same order as
+        Pathfinder.find_path.
+
+        :param Tuple[int, int] start: Tile to start from
+        :param Container occupied: Positions of entities, which block movement
+        :rtype: Optional[List[Tuple[int, int]]]
+        :returns: The path, or None if there is no path
+        """
+        start = tuple(int(i) for i in start)
+        if self.get_distance(start) is None:
+            return None
+        if start == self.dest:
+            return []
+
+        path = list()
+        position = self.next_step(start, occupied)
+        while position is not None:
+            path.append(position)
+            position = self.next_step(position)
+        if not path or path[-1] != self.dest:
+            return None
+
+        path.reverse()
+        return path
+
+
+class FlowFields(object):
+    """ Flow fields of a map, shared by all entities going to a destination
+
+    Fields are only worth building when several entities are going to the
+    same tile; a single entity is faster with Pathfinder.  Fields are kept
+    for the most recently used destinations, and are repaired around the
+    tile each time an entity enters or leaves one.
+
+    Entities which are pathfinding to the destination of a field do not
+    block it, or the field would change each time one of them moved.  They
+    avoid each other when taking their next step.
+    """
+
+    def __init__(self, grid, occupancy, capacity=DEFAULT_FLOW_FIELDS):
+        """
+
+        :param tuxemon.core.map.CollisionGrid grid: Collision grid of the map
+        :param tuxemon.core.map.OccupancyIndex occupancy: Positions of entities
+        :param int capacity: Maximum number of fields to keep
+        """
+        self.grid = grid
+        self.occupancy = occupancy
+        self.capacity = capacity
+        self.fields = OrderedDict()
+        self.builds = 0
+
+    def get(self, dest):
+        """ Return the flow field for a destination, building it if needed
+
+        :param Tuple[int, int] dest: Tile to move to
+        :rtype: FlowField
+        """
+        dest = tuple(int(i) for i in dest)
+        field = self.fields.get(dest)
+        if field is None:
+            field = FlowField(self.grid, dest, self.get_blocked(dest))
+            self.fields[dest] = field
+            self.builds += 1
+            while len(self.fields) > self.capacity:
+                self.fields.popitem(last=False)
+        self.fields.move_to_end(dest)
+        return field
+
+    def get_path(self, start, dest, occupied=()):
+        """ Return the path from a tile to a destination, using its flow field
+
+        The start tile does not block the field, even if the entity on it
+        only started pathfinding to the destination after the field was built.
+
+        :param Tuple[int, int] start: Tile to start from
+        :param Tuple[int, int] dest: Tile to move to
+        :param Container occupied: Positions of entities, which block movement
+        :rtype: Optional[List[Tuple[int, int]]]
+        :returns: The path, or None if there is no path
+        """
+        field = self.get(dest)
+        field.set_blocked(start, False)
+        return field.get_path(start, occupied)
+
+    def is_shared(self, dest):
+        """ Check if enough entities are going to a tile to share a field
+
+        :param Tuple[int, int] dest: Tile to move to
+        :rtype: bool
+        """
+        dest = tuple(int(i) for i in dest)
+        count = 0
+        for entity in self.occupancy.positions:
+            if is_pathfinding_to(entity, dest):
+                count += 1
+                if count >= FLOW_FIELD_MIN_ENTITIES:
+                    return True
+        return False
+
+    def is_blocked(self, position, dest):
+        """ Check if a tile blocks the field of a destination
+
+        :param Tuple[int, int] position: Tile position
+        :param Tuple[int, int] dest: Tile to move to
+        :rtype: bool
+        """
+        return not all(is_pathfinding_to(entity, dest) for entity in self.occupancy.get(position))
+
+    def get_blocked(self, dest):
+        """ Return the tiles which block the field of a destination
+
+        :param Tuple[int, int] dest: Tile to move to
+        :rtype: Set[Tuple[int, int]]
+        """
+        return {
+            position
+            for position, entities in self.occupancy.tiles.items()
+            if not all(is_pathfinding_to(entity, dest) for entity in entities)
+        }
+
+    def occupancy_changed(self, entity, old_position, position):
+        """ Repair the fields around the tiles an entity moved between
+
+        :param tuxemon.core.entity.Entity entity:
+        :param Optional[Tuple[int, int]] old_position: Old tile position
+        :param Optional[Tuple[int, int]] position: New tile position
+        :return: None
+        """
+        for dest, field in self.fields.items():
+            if is_pathfinding_to(entity, dest):
+                continue
+            if old_position is not None:
+                field.set_blocked(old_position, self.is_blocked(old_position, dest))
+            if position is not None:
+                field.set_blocked(position, self.is_blocked(position, dest))
+
+    def clear(self):
+        """ Remove all fields
+
+        :return: None
+        """
+        self.fields.clear()
+
+
+def is_pathfinding_to(entity, dest):
+    """ Check if an entity is pathfinding to a tile
+
+    :param tuxemon.core.entity.Entity entity:
+    :param Tuple[int, int] dest: Tile position
+    :rtype: bool
+    """
+    pathfinding = getattr(entity, "pathfinding", None)
+    return pathfinding is not None and tuple(pathfinding) == dest
@@ -34,6 +34,7 @@ from __future__ import unicode_literals
 import logging
 
 from tuxemon.core.npc import NPC
+from tuxemon.core.session import GameVariables
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +49,7 @@ class Player(NPC):
         self.isplayer = True
 
         # Game variables for use with events
-        self.game_variables = {}
+        self.game_variables = GameVariables()
 
         # Number of steps
         self.game_variables['steps'] = 0
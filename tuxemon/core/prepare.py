@@ -42,6 +42,7 @@ import re
 
 from tuxemon.constants import paths
 from tuxemon.core import config
+from tuxemon.core.resources import ResourceIndex
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +66,10 @@ if not os.path.isdir(paths.USER_GAME_DATA_DIR):
 if not os.path.isdir(paths.USER_GAME_SAVE_DIR):
     os.makedirs(paths.USER_GAME_SAVE_DIR)
 
+# Create game cache dir if missing
+if not os.path.isdir(paths.USER_GAME_CACHE_DIR):
+    os.makedirs(paths.USER_GAME_CACHE_DIR)
+
 # Generate default config
 config.generate_default_config()
 
@@ -112,6 +117,9 @@ SAVE_METHOD = "JSON"
 
 DEV_TOOLS = CONFIG.dev_tools
 
+# Index of the files provided by mods, used by fetch
+RESOURCES = ResourceIndex(paths.mods_folder, CONFIG.mods)
+
 
 def pygame_init():
     """ Eventually refactor out of prepare
@@ -130,7 +138,7 @@ def pygame_init():
     from tuxemon.core.locale import T
     T.collect_languages()
 
-    # Configure databases
+    # Configure databases.  Tables are loaded when first used.
     from tuxemon.core.db import db
     db.load()
 
@@ -183,11 +191,21 @@ def init():
 
 # Fetches a resource file
 def fetch(*args):
-    relative_path = os.path.join(*args)
+    return RESOURCES.fetch(os.path.join(*args))
+
+
+def listdir(directory):
+    """ List a folder returned by fetch, without touching the disk
+
+    :param str directory: Path of the folder
+    :rtype: List[str]
+    """
+    return RESOURCES.listdir(directory)
 
-    for mod_name in CONFIG.mods:
-        path = os.path.join(paths.mods_folder, mod_name, relative_path)
-        if os.path.exists(path):
-            return path
 
-    raise IOError(relative_path)
+def reload_resources():
+    """ Rescan the mod folders.  Use if mods are changed while running
+
+    :return: None
+    """
+    RESOURCES.invalidate()
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.resources Index of the resource files provided by mods.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Resource packs are a single file:
+#   magic, then the offset and size of the index (little endian uint64)
+#   contents of each file, one after the other
+#   index, a JSON object of "relative/path" => [offset, size]
+PACK_MAGIC = b"TUXPACK1"
+PACK_HEADER = struct.Struct("<8sQQ")
+PACK_EXTENSION = ".pack"
+
+# folders which are read with normal file functions, and so cannot be packed.
+# pygame.font.Font keeps reading its file for as long as the font is used,
+# so fonts are loaded from their path too.
+PACK_EXCLUDED_FOLDERS = ("db", "font", "l18n")
+
+
+class PackFile(io.RawIOBase):
+    """ Read-only file object for one file of a ResourcePack
+
+    Reads are served directly from the memory map of the pack.  The memory
+    map cannot be closed while a view of it exists, so the view is released
+    when the file is closed.
+    """
+
+    def __init__(self, view, name, pack=None):
+        """
+
+        :param memoryview view: Contents of the file
+        :param str name: Path of the file, for error messages
+        :param ResourcePack pack: Pack the file was opened from
+        """
+        super(PackFile, self).__init__()
+        self.view = view
+        self.name = name
+        self.pack = pack
+        self.position = 0
+
+    def close(self):
+        if not self.closed:
+            self.view.release()
+            if self.pack is not None:
+                self.pack.release_file()
+                self.pack = None
+        super(PackFile, self).close()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.view[self.position:self.position + len(buffer)]
+        size = len(data)
+        buffer[:size] = data
+        self.position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = len(self.view) + offset
+        self.position = max(0, self.position)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+
+class ResourcePack(object):
+    """ Single file archive of mod resources, read through a memory map
+
+    Use build_pack to create them.  Closing the pack while some of its files
+    are open is deferred until the last of them is closed.  Files may be
+    opened and closed from any thread.
+    """
+
+    def __init__(self, filename):
+        """
+
+        :param str filename: Path of the pack file
+        """
+        self.filename = filename
+        self.open_files = 0
+        self.closing = False
+        self.lock = threading.Lock()
+        with open(filename, "rb") as fp:
+            self.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[:len(PACK_MAGIC)] != PACK_MAGIC or len(self.mmap) < PACK_HEADER.size:
+            self.mmap.close()
+            raise ValueError("{} is not a resource pack".format(filename))
+
+        magic, index_offset, index_size = PACK_HEADER.unpack_from(self.mmap)
+
+        index = json.loads(self.mmap[index_offset:index_offset + index_size].decode("utf-8"))
+        self.index = {os.path.normpath(name): entry for name, entry in index.items()}
+
+    def names(self):
+        """ Return the relative paths of the files in the pack
+
+        :rtype: Iterable[str]
+        """
+        return self.index.keys()
+
+    def open(self, name):
+        """ Open a file of the pack for reading
+
+        :param str name: Relative path of the file
+        :rtype: PackFile
+        """
+        offset, size = self.index[os.path.normpath(name)]
+        with self.lock:
+            view = memoryview(self.mmap)[offset:offset + size]
+            self.open_files += 1
+        return PackFile(view, name, self)
+
+    def release_file(self):
+        """ Called by PackFile when it is closed
+
+        :return: None
+        """
+        with self.lock:
+            self.open_files -= 1
+            if self.closing and self.open_files == 0:
+                self.mmap.close()
+
+    def close(self):
+        """ Close the memory map, once no file of the pack is open
+
+        :return: None
+        """
+        with self.lock:
+            self.closing = True
+            if self.open_files == 0:
+                self.mmap.close()
+
+
+def build_pack(folder, filename, excluded=PACK_EXCLUDED_FOLDERS):
+    """ Build a resource pack from the contents of a mod folder
+
+    :param str folder: Mod folder to pack
+    :param str filename: Path of the pack to write
+    :param Sequence[str] excluded: Top-level folders which will not be packed
+    :return: Number of files packed
+    :rtype: int
+    """
+    index = dict()
+    with open(filename, "wb") as fp:
+        fp.write(PACK_HEADER.pack(PACK_MAGIC, 0, 0))
+        for dirpath, dirnames, filenames in os.walk(folder, followlinks=True):
+            relative_dir = os.path.relpath(dirpath, folder)
+            if relative_dir == os.curdir:
+                dirnames[:] = [i for i in dirnames if i not in excluded]
+            dirnames.sort()
+            for name in sorted(filenames):
+                relative_path = os.path.normpath(os.path.join(relative_dir, name))
+                with open(os.path.join(dirpath, name), "rb") as source:
+                    data = source.read()
+                index[relative_path.replace(os.sep, "/")] = [fp.tell(), len(data)]
+                fp.write(data)
+
+        index_data = json.dumps(index).encode("utf-8")
+        index_offset = fp.tell()
+        fp.write(index_data)
+        fp.seek(0)
+        fp.write(PACK_HEADER.pack(PACK_MAGIC, index_offset, len(index_data)))
+
+    return len(index)
+
+
+class ResourceIndex(object):
+    """ Overlay of the files and folders of all enabled mods
+
+    Mods are searched in order, and the first mod that has a file or folder
+    will provide it, so mods listed first override the ones after them.
+
+    The mod folders are scanned once, when the index is first used, so
+    looking up resources will not touch the disk.  If mods are changed
+    while the game is running, call ResourceIndex.invalidate.
+
+    A mod may also be distributed as a resource pack, named like the mod
+    folder with a ".pack" extension.  Files in the pack will be found at
+    the same path as if they were in the mod folder, and loose files in
+    the folder override the ones in the pack.  Packed files cannot be
+    opened with normal file functions; use ResourceIndex.open.
+    """
+
+    def __init__(self, mods_folder, mods):
+        """
+
+        :param str mods_folder: Folder containing the mods
+        :param List[str] mods: Names of enabled mods, in order of priority
+        """
+        self.mods_folder = mods_folder
+        self.mods = mods
+        self.paths = None
+        self.listings = None
+        self.packed = dict()
+        self.packs = list()
+        self.frame_groups = dict()
+
+    def invalidate(self):
+        """ Forget the scanned files.  The index will be rebuilt when next used
+
+        :return: None
+        """
+        self.paths = None
+        self.listings = None
+        self.packed = dict()
+        self.frame_groups = dict()
+        for pack in self.packs:
+            pack.close()
+        self.packs = list()
+
+    def build(self):
+        """ Scan the mod folders and build the index
+
+        :return: None
+        """
+        start = time.time()
+        paths = dict()
+        listings = dict()
+
+        for mod_name in self.mods:
+            mod_root = os.path.join(self.mods_folder, mod_name)
+            for dirpath, dirnames, filenames in os.walk(mod_root, followlinks=True):
+                relative_dir = os.path.relpath(dirpath, mod_root)
+                paths.setdefault(relative_dir, dirpath)
+                listings[dirpath] = sorted(dirnames + filenames)
+                for filename in filenames:
+                    relative_path = os.path.normpath(os.path.join(relative_dir, filename))
+                    paths.setdefault(relative_path, os.path.join(dirpath, filename))
+
+            pack_filename = mod_root + PACK_EXTENSION
+            if os.path.isfile(pack_filename):
+                self.add_pack(ResourcePack(pack_filename), mod_root, paths, listings)
+
+        self.paths = paths
+        self.listings = listings
+        logger.debug("indexed {} resources in {:.1f}ms".format(len(paths), (time.time() - start) * 1000))
+
+    def add_pack(self, pack, mod_root, paths, listings):
+        """ Add the files of a resource pack to the index
+
+        :param ResourcePack pack: Pack to add
+        :param str mod_root: Folder of the mod the pack belongs to
+        :param Dict paths: Relative paths being indexed
+        :param Dict listings: Folder listings being indexed
+        :return: None
+        """
+        self.packs.append(pack)
+        for relative_path in pack.names():
+            path = os.path.join(mod_root, relative_path)
+            name = os.path.basename(relative_path)
+            relative_dir = os.path.dirname(relative_path)
+            if name in listings.get(os.path.dirname(path), ()):
+                # loose file in the mod folder overrides the pack
+                continue
+
+            self.packed[os.path.normpath(path)] = pack, relative_path
+            paths.setdefault(relative_path, path)
+
+            # add the folders of the file, so they can be fetched and listed
+            while True:
+                directory = os.path.join(mod_root, relative_dir) if relative_dir else mod_root
+                paths.setdefault(relative_dir or os.curdir, directory)
+                listing = listings.setdefault(directory, list())
+                if name not in listing:
+                    listing.append(name)
+                    listing.sort()
+                if not relative_dir:
+                    break
+                name = os.path.basename(relative_dir)
+                relative_dir = os.path.dirname(relative_dir)
+
+    def fetch(self, relative_path):
+        """ Return the path of a resource from the mod which provides it
+
+        :param str relative_path: Path of the resource inside a mod
+        :rtype: str
+        :raises: IOError if no mod has the resource
+        """
+        if self.paths is None:
+            self.build()
+
+        relative_path = os.path.normpath(relative_path)
+        try:
+            return self.paths[relative_path]
+        except KeyError:
+            pass
+
+        # paths outside of the mods cannot be indexed, so check the disk
+        if os.path.isabs(relative_path) or relative_path.startswith(os.pardir):
+            for mod_name in self.mods:
+                path = os.path.join(self.mods_folder, mod_name, relative_path)
+                if os.path.exists(path):
+                    return path
+
+        raise IOError(relative_path)
+
+    def exists(self, path):
+        """ Check if a file exists, either on disk or in a resource pack
+
+        :param str path: Path of the file
+        :rtype: bool
+        """
+        if self.paths is None:
+            self.build()
+
+        return os.path.normpath(path) in self.packed or os.path.exists(path)
+
+    def is_packed(self, path):
+        """ Check if a file can only be read from a resource pack
+
+        :param str path: Path of the file
+        :rtype: bool
+        """
+        if self.paths is None:
+            self.build()
+
+        return os.path.normpath(path) in self.packed
+
+    def open(self, path):
+        """ Open a file for reading in binary mode, either on disk or in a pack
+
+        :param str path: Path of the file
+        :rtype: io.RawIOBase
+        """
+        if self.paths is None:
+            self.build()
+
+        try:
+            pack, relative_path = self.packed[os.path.normpath(path)]
+        except KeyError:
+            return open(path, "rb")
+
+        return pack.open(relative_path)
+
+    def listdir(self, directory):
+        """ Return the sorted names of the entries in a folder
+
+        Works like os.listdir for a folder returned by ResourceIndex.fetch,
+        without touching the disk.  Other folders are read from disk.
+
+        :param str directory: Path of the folder
+        :rtype: List[str]
+        """
+        if self.listings is None:
+            self.build()
+
+        try:
+            return list(self.listings[directory])
+        except KeyError:
+            return sorted(os.listdir(directory))
+
+    def animation_frames(self, directory, name):
+        """ Return the sorted paths of the frame files of an animation
+
+        Frame files are named like the animation, followed by an optional
+        frame number and a file extension.  For example, "water.png" or
+        "water00.png", "water01.png", etc.
+
+        :param str directory: Path of the folder with the frames
+        :param str name: Name of the animation
+        :rtype: List[str]
+        """
+        # names which end in a number cannot be grouped, so search for them
+        if name.rstrip("0123456789") != name or "." in name:
+            pattern = r"{}[0-9]*\..*".format(name)
+            return [
+                os.path.join(directory, filename)
+                for filename in self.listdir(directory)
+                if re.match(pattern, filename)
+            ]
+
+        try:
+            groups = self.frame_groups[directory]
+        except KeyError:
+            groups = dict()
+            for filename in self.listdir(directory):
+                stem, dot, extension = filename.partition(".")
+                if dot:
+                    path = os.path.join(directory, filename)
+                    groups.setdefault(stem.rstrip("0123456789"), list()).append(path)
+            self.frame_groups[directory] = groups
+
+        return list(groups.get(name, ()))
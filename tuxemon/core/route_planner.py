@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+#
+# Tuxemon
+# Copyright (C) 2014, William Edwards <shadowapex@gmail.com>,
+#                     Benjamin Bean <superman2k5@gmail.com>
+#
+# This file is part of Tuxemon.
+#
+# Tuxemon is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Tuxemon is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Tuxemon.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# core.route_planner Plan routes which span maps, through their teleports.
+#
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import heapq
+import logging
+import os
+from collections import namedtuple
+
+from tuxemon.core import prepare
+from tuxemon.core.map import CollisionGrid
+from tuxemon.core.map_loader import TMXMapLoader, read_map_size
+from tuxemon.core.map_preloader import teleport_actions
+from tuxemon.core.pathfinding import FlowField
+
+logger = logging.getLogger(__name__)
+
+# tile which teleports to another map when walked onto
+Door = namedtuple("Door", "tile dest_filename dest_tile")
+
+# part of a route on one map; the path is in the order of Pathfinder.find_path
+RouteLeg = namedtuple("RouteLeg", "filename path")
+
+# the parts of a map which are needed to plan routes
+RouteMap = namedtuple("RouteMap", "filename events collision_grid")
+
+
+def load_route_map(filename):
+    """ Load the events and collisions of a map, without its tiles
+
+    No images are loaded, so this may be called from threads other than
+    the main thread.
+
+    :param str filename: Path of the map
+    :rtype: RouteMap
+    """
+    with prepare.RESOURCES.open(filename) as fp:
+        tmx = fp.read()
+    compiled = TMXMapLoader().load_compiled(filename, tmx)
+    grid = CollisionGrid(read_map_size(tmx), compiled.collision_map, compiled.collision_lines_map)
+    return RouteMap(filename, compiled.events, grid)
+
+
+def get_doors(map_data):
+    """ Return the tiles of a map which teleport when walked onto
+
+    Only the events of the map are searched; teleports which need the
+    player to interact with a tile are not followed.  The conditions of the
+    events are not checked.
+
+    :param RouteMap map_data: Map to search
+    :rtype: List[Door]
+    """
+    doors = list()
+    for event in map_data.events:
+        for action in event.acts:
+            if action.type not in teleport_actions:
+                continue
+            try:
+                dest_filename = prepare.fetch("maps", action.parameters[0])
+                dest_tile = int(action.parameters[1]), int(action.parameters[2])
+            except (IOError, IndexError, ValueError):
+                logger.warning("invalid teleport in {}: {}".format(map_data.filename, action.parameters))
+                continue
+            for x in range(int(event.x), int(event.x) + int(event.w)):
+                for y in range(int(event.y), int(event.y) + int(event.h)):
+                    doors.append(Door((x, y), dest_filename, dest_tile))
+            break
+    return doors
+
+
+class RoutePlanner(object):
+    """ Find the shortest routes between tiles on any maps
+
+    The maps are a graph: walking from where a teleport leaves the player
+    on a map to each door of the map is an edge, and the number of steps is
+    its cost.  The costs are kept in a table, built with one FlowField for
+    each door, so a route is a Dijkstra search over doors instead of tiles.
+
+    Paths on a map do not cross other doors of the map, since stepping on
+    them would teleport the player.
+    """
+
+    def __init__(self):
+        self.maps = dict()
+        self.doors = dict()
+        self.fields = dict()
+        self.distances = dict()
+
+    def load_maps(self, filenames=None):
+        """ Load maps and build the distance table
+
+        Only the events and collisions of the maps are loaded.
+
+        :param Iterable[str] filenames: Paths of the maps. By default, all maps
+        :return: None
+        """
+        if filenames is None:
+            folder = prepare.fetch("maps")
+            filenames = [
+                os.path.join(folder, i)
+                for i in prepare.RESOURCES.listdir(folder)
+                if i.endswith(".tmx")
+            ]
+
+        for filename in filenames:
+            try:
+                self.add_map(load_route_map(filename))
+            except Exception as e:
+                logger.error("unable to load {} for routes: {}".format(filename, e))
+
+        self.build()
+
+    def add_map(self, map_data):
+        """ Add a map to the graph
+
+        :param RouteMap map_data: Map to add
+        :return: None
+        """
+        filename = map_data.filename
+        self.maps[filename] = map_data
+        self.doors[filename] = get_doors(map_data)
+        for key in [i for i in self.fields if i[0] == filename]:
+            del self.fields[key]
+        self.distances.clear()
+
+    def build(self):
+        """ Fill the distance table for the tiles teleports lead to
+
+        :return: None
+        """
+        for doors in self.doors.values():
+            for door in doors:
+                if door.dest_filename in self.maps:
+                    self.get_distances(door.dest_filename, door.dest_tile)
+
+    def get_field(self, filename, tile):
+        """ Return the flow field to a tile, which does not cross doors
+
+        :param str filename: Path of the map
+        :param Tuple[int, int] tile: Destination tile
+        :rtype: tuxemon.core.pathfinding.FlowField
+        """
+        key = filename, tile
+        try:
+            return self.fields[key]
+        except KeyError:
+            pass
+        grid = self.maps[filename].collision_grid
+        blocked = {door.tile for door in self.doors[filename]}
+        blocked.discard(tile)
+        # the table is only built once, so every door of the map must be reached
+        field = FlowField(grid, tile, blocked, max_nodes=grid.width * grid.height)
+        self.fields[key] = field
+        return field
+
+    def get_distances(self, filename, tile):
+        """ Return the doors which can be reached from a tile
+
+        :param str filename: Path of the map
+        :param Tuple[int, int] tile: Tile to start from
+        :rtype: List[Tuple[Door, int]]
+        :returns: Each door, with the number of steps to reach it
+        """
+        key = filename, tile
+        try:
+            return self.distances[key]
+        except KeyError:
+            pass
+        distances = list()
+        for door in self.doors[filename]:
+            steps = self.get_field(filename, door.tile).get_distance(tile)
+            if steps is not None:
+                distances.append((door, steps))
+        self.distances[key] = distances
+        return distances
+
+    def find_route(self, start_filename, start, dest_filename, dest):
+        """ Find the shortest route between two tiles
+
+        :param str start_filename: Path of the map to start on
+        :param Tuple[int, int] start: Tile to start from
+        :param str dest_filename: Path of the map to move to
+        :param Tuple[int, int] dest: Tile to move to
+        :rtype: Optional[List[RouteLeg]]
+        :returns: The path on each map, in order, or None if there is no route
+        """
+        if start_filename not in self.maps or dest_filename not in self.maps:
+            return None
+
+        start_node = start_filename, tuple(int(i) for i in start)
+        dest_field = self.get_field(dest_filename, tuple(int(i) for i in dest))
+        best = {start_node: 0}
+        parents = {start_node: None}
+        queue = [(0, 0, start_node)]
+        pushed = 1
+        finish = None
+        finish_cost = None
+
+        while queue:
+            cost, _, node = heapq.heappop(queue)
+            if finish_cost is not None and cost >= finish_cost:
+                break
+            if cost > best[node]:
+                continue
+
+            filename, tile = node
+            if filename == dest_filename:
+                steps = dest_field.get_distance(tile)
+                if steps is not None and (finish_cost is None or cost + steps < finish_cost):
+                    finish = node
+                    finish_cost = cost + steps
+
+            for door, steps in self.get_distances(filename, tile):
+                if door.dest_filename not in self.maps:
+                    continue
+                next_node = door.dest_filename, door.dest_tile
+                next_cost = cost + steps
+                if next_node not in best or next_cost < best[next_node]:
+                    best[next_node] = next_cost
+                    parents[next_node] = node, door
+                    heapq.heappush(queue, (next_cost, pushed, next_node))
+                    pushed += 1
+
+        if finish is None:
+            return None
+
+        legs = [RouteLeg(dest_filename, dest_field.get_path(finish[1]))]
+        node = finish
+        while parents[node] is not None:
+            node, door = parents[node]
+            path = self.get_field(node[0], door.tile).get_path(node[1])
+            legs.append(RouteLeg(node[0], path))
+        legs.reverse()
+        return legs
@@ -17,5 +17,48 @@ class Session(object):
         self.player = player
 
 
+class GameVariables(dict):
+    """ Game variables of an NPC, which remember the keys that were changed
+
+    The event engine reads and clears the changed keys each frame, so
+    conditions which test a variable are only checked when it changes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(GameVariables, self).__init__(*args, **kwargs)
+        self.changed = set(self)
+
+    def __setitem__(self, key, value):
+        super(GameVariables, self).__setitem__(key, value)
+        self.changed.add(key)
+
+    def __delitem__(self, key):
+        super(GameVariables, self).__delitem__(key)
+        self.changed.add(key)
+
+    def pop(self, key, *args):
+        self.changed.add(key)
+        return super(GameVariables, self).pop(key, *args)
+
+    def popitem(self):
+        key, value = super(GameVariables, self).popitem()
+        self.changed.add(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.changed.add(key)
+        return super(GameVariables, self).setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        other = dict(*args, **kwargs)
+        super(GameVariables, self).update(other)
+        self.changed.update(other)
+
+    def clear(self):
+        self.changed.update(self)
+        super(GameVariables, self).clear()
+
+
 # WIP will be filled in later when game starts
 local_session = Session(None, None, None)
@@ -167,10 +167,39 @@ class CombatState(CombatAnimations):
         self.is_trainer_battle = kwargs.get('combat_type') == "trainer"
         self.players = list(self.players)
         self.graphics = kwargs.get('graphics')
+
+        # keep the images of the monsters and techniques until combat ends
+        graphics.surface_cache.pin("combat", self.get_combat_images())
         self.show_combat_dialog()
         self.transition_phase("begin")
         self.task(partial(setattr, self, "phase", "ready"), 3)
 
+    def shutdown(self):
+        """ Release the images pinned for combat
+
+        :returns: None
+        """
+        graphics.surface_cache.unpin("combat")
+        super(CombatState, self).shutdown()
+
+    def get_combat_images(self):
+        """ Return the files of the sprites and animations used in combat
+
+        :rtype: List[str]
+        """
+        filenames = list()
+        for player in self.players:
+            for monster in player.monsters:
+                filenames.extend((
+                    monster.front_battle_sprite,
+                    monster.back_battle_sprite,
+                    monster.menu_sprite_1,
+                    monster.menu_sprite_2,
+                ))
+                for technique in monster.moves:
+                    filenames.extend(technique.images)
+        return filenames
+
     def update(self, time_delta):
         """ Update the combat state.  State machine is checked.
 
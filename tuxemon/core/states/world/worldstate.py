@@ -40,8 +40,10 @@ from six.moves import map as imap
 
 from tuxemon.compat import Rect
 from tuxemon.core import prepare, state, networking
-from tuxemon.core.map import PathfindNode, TuxemonMap, dirs2, pairs
+from tuxemon.core.map import MapCache, OccupancyIndex, TuxemonMap
 from tuxemon.core.map_loader import TMXMapLoader
+from tuxemon.core.map_preloader import MapPreloader
+from tuxemon.core.pathfinding import FlowFields
 from tuxemon.core.platform.const import buttons, events, intentions
 from tuxemon.core.session import local_session
 from tuxemon.core.tools import nearest
@@ -60,8 +62,6 @@ class WorldState(state.State):
     """ The state responsible for the world game play
     """
 
-    preloaded_maps = {}
-
     keymap = {
         buttons.UP: intentions.UP,
         buttons.DOWN: intentions.DOWN,
@@ -86,6 +86,9 @@ class WorldState(state.State):
 
         self.npcs = {}
         self.npcs_off_map = {}
+        self.occupancy = OccupancyIndex()
+        self.occupancy.listeners.append(self.occupancy_changed)
+        self.flow_fields = None
         self.player = None
         self.wants_to_move_player = None
         self.allow_player_movement = True
@@ -94,10 +97,13 @@ class WorldState(state.State):
         #                              Map                                   #
         ######################################################################
 
-        # Keep a map of preloaded maps for fast map switching.
-        self.preloaded_maps = {}
+        # Keep preloaded and recently visited maps for fast map switching.
+        self.preloaded_maps = MapCache(prepare.CONFIG.map_cache_size * 1024 * 1024)
         self.current_map = None
 
+        # Loads the maps the player can teleport to in the background.
+        self.map_preloader = MapPreloader()
+
         ######################################################################
         #                            Transitions                             #
         ######################################################################
@@ -167,6 +173,11 @@ class WorldState(state.State):
         self.lock_controls()
         self.stop_player()
 
+    def shutdown(self):
+        """ Called when the world is removed, stops loading maps in the background
+        """
+        self.map_preloader.shutdown()
+
     def fade_and_teleport(self, duration=2):
         """ Fade out, teleport, fade in
 
@@ -465,8 +476,12 @@ class WorldState(state.State):
         :type entity: tuxemon.core.entity.Entity
         :return:
         """
+        old_entity = self.npcs.get(entity.slug)
+        if old_entity is not None:
+            self.occupancy.remove(old_entity)
         entity.world = self
         self.npcs[entity.slug] = entity
+        self.occupancy.add(entity)
 
     def get_entity(self, slug):
         """
@@ -482,7 +497,18 @@ class WorldState(state.State):
         :type slug: str
         :return:
         """
-        del self.npcs[slug]
+        self.occupancy.remove(self.npcs.pop(slug))
+
+    def clear_entities(self):
+        """ Remove all players and NPCs
+
+        :return: None
+        """
+        self.npcs = {}
+        self.npcs_off_map = {}
+        self.occupancy.clear()
+        if self.flow_fields is not None:
+            self.flow_fields.clear()
 
     def get_all_entities(self):
         """ List of players and NPCs, for collision checking
@@ -491,54 +517,46 @@ class WorldState(state.State):
         """
         return self.npcs.values()
 
-    def get_collision_map(self):
-        """ Return dictionary for collision testing
+    def get_entity_positions(self):
+        """ Return the tiles which are occupied by entities
 
-        Returns a dictionary where keys are (x, y) tile tuples
-        and the values are tiles or NPCs.
-
-        # NOTE:
-        This will not respect map changes to collisions
-        after the map has been loaded!
-
-        :rtype: dict
-        :returns: A dictionary of collision tiles
+        :rtype: tuxemon.core.map.OccupancyIndex
         """
-        # TODO: overlapping tiles/objects by returning a list
-        collision_dict = dict()
-
-        # Get all the NPCs' tile positions
-        for npc in self.get_all_entities():
-            pos = nearest(npc.tile_pos)
-            collision_dict[pos] = {"entity": npc}
+        return self.occupancy
 
-        # tile layout takes precedence
-        collision_dict.update(self.collision_map)
+    def occupancy_changed(self, entity, old_position, position):
+        """ Called when an entity changes tiles
 
-        return collision_dict
+        :type entity: tuxemon.core.entity.Entity
+        :param old_position: old tile position, or None if added
+        :param position: new tile position, or None if removed
+        :return: None
+        """
+        if self.flow_fields is not None:
+            self.flow_fields.occupancy_changed(entity, old_position, position)
 
     def pathfind(self, start, dest):
         """ Pathfind
 
+        When several entities are going to the same tile, the path is read
+        from the shared flow field of the destination, so they share one
+        search.  Otherwise, or if the way is blocked by entities, the path is
+        found with A*.
+
         :param start:
         :type dest: tuple
 
         :return:
         """
-        pathnode = self.pathfind_r(
-            dest,
-            [PathfindNode(start)],
-            set(),
-        )
+        occupied = self.get_entity_positions()
+        path = None
+        if self.flow_fields.is_shared(dest):
+            path = self.flow_fields.get_path(start, dest, occupied)
+        if path is None:
+            path = self.pathfinder.find_path(start, dest, occupied)
 
-        if pathnode:
-            # traverse the node to get the path
-            path = []
-            while pathnode:
-                path.append(pathnode.get_value())
-                pathnode = pathnode.get_parent()
-
-            return path[:-1]
+        if path is not None:
+            return path
 
         else:
             # TODO: get current map name for a more useful error
@@ -546,138 +564,25 @@ class WorldState(state.State):
                          str(start) + " to " + str(dest) +
                          ". Are you sure that an obstacle-free path exists?")
 
-    def pathfind_r(self, dest, queue, known_nodes):
-        """ Breadth first search algorithm
-
-        :type dest: tuple
-        :type queue: list
-        :type known_nodes: set
-
-        :rtype: list
-        """
-        # The collisions shouldn't have changed whilst we were calculating,
-        # so it saves time to reuse the map.
-        collision_map = self.get_collision_map()
-        while queue:
-            node = queue.pop(0)
-            if node.get_value() == dest:
-                return node
-            else:
-                for adj_pos in self.get_exits(node.get_value(), collision_map, known_nodes):
-                    new_node = PathfindNode(adj_pos, node)
-                    known_nodes.add(new_node.get_value())
-                    queue.append(new_node)
-
-    def get_explicit_tile_exits(self, position, tile, skip_nodes):
-        """ Check for exits from tile which are defined in the map
-
-        This will return exits which were defined by the map creator
-
-        Checks "continue" and "exits" properties of the tile
-
-        :param position: tuple
-        :param tile:
-        :param skip_nodes: set
-        :return: list
-        """
-        # Check if the players current position has any exit limitations.
-        # this check is for tiles which define the only way to exit.
-        # for instance, one-way tiles.
-
-        # does the tile define continue movements?
-        try:
-            return [tuple(dirs2[tile["continue"]] + position)]
-        except KeyError:
-            pass
-
-        # does the tile explicitly define exits?
-        try:
-            adjacent_tiles = list()
-            for direction in tile["exit"]:
-                exit_tile = tuple(dirs2[direction] + position)
-                if exit_tile in skip_nodes:
-                    continue
-
-                adjacent_tiles.append(exit_tile)
-            return adjacent_tiles
-        except KeyError:
-            pass
-
-    def get_exits(self, position, collision_map=None, skip_nodes=None):
+    def get_exits(self, position, occupied=None, skip_nodes=None):
         """ Return list of tiles which can be moved into
 
         This checks for adjacent tiles while checking for walls,
         npcs, and collision lines, one-way tiles, etc
 
         :param position: tuple
-        :param collision_map: dict
+        :param occupied: set of entity positions, see get_entity_positions
         :param skip_nodes: set
 
         :rtype: list
         """
-        # get tile-level and npc/entity blockers
-        if collision_map is None:
-            collision_map = self.get_collision_map()
+        if occupied is None:
+            occupied = self.get_entity_positions()
 
         if skip_nodes is None:
-            skip_nodes = set()
-
-        # if there are explicit way to exit this position use that information,
-        # handles 'continue' and 'exits'
-        tile_data = collision_map.get(position)
-        if tile_data:
-            exits = self.get_explicit_tile_exits(position, tile_data, skip_nodes)
-        else:
-            exits = None
-
-        # get exits by checking surrounding tiles
-        adjacent_tiles = list()
-        for direction, neighbor in (
-                ("down", (position[0], position[1] + 1)),
-                ("right", (position[0] + 1, position[1])),
-                ("up", (position[0], position[1] - 1)),
-                ("left", (position[0] - 1, position[1])),
-        ):
-            # if exits are defined make sure the neighbor is present there
-            if exits and not neighbor in exits:
-                continue
-
-            # check if the neighbor region is present in skipped nodes
-            if neighbor in skip_nodes:
-                continue
-
-            # We only need to check the perimeter,
-            # as there is no way to get further out of bounds
-            if neighbor[0] in self.invalid_x or neighbor[1] in self.invalid_y:
-                continue
-
-            # check to see if this tile is separated by a wall
-            if (position, direction) in self.collision_lines_map:
-                # there is a wall so stop checking this direction
-                continue
-
-            # test if this tile has special movement handling
-            # NOTE: Do not refact. into a dict.get(xxxxx, None) style check
-            # NOTE: None has special meaning in this check
-            try:
-                tile_data = collision_map[neighbor]
-            except KeyError:
-                pass
-            else:
-                # None means tile is blocked with no specific data
-                if tile_data is None:
-                    continue
+            skip_nodes = ()
 
-                try:
-                    if pairs[direction] not in tile_data["enter"]:
-                        continue
-                except KeyError:
-                    continue
-
-            # no tile data, so assume it is free to move into
-            adjacent_tiles.append(neighbor)
-
-        return adjacent_tiles
+        return self.collision_grid.get_exits(position, occupied, skip_nodes)
 
     ####################################################
     #                Player Movement                   #
@@ -914,17 +819,29 @@ class WorldState(state.State):
         # Set the currently loaded map. This is needed because the event
         # engine loads event conditions and event actions from the currently
         # loaded map. If we change maps, we need to update this.
-        if map_name not in self.preloaded_maps.keys():
-            logger.debug("Map was not preloaded. Loading from disk.")
-            map_data = self.load_map(map_name)
-        else:
+        map_data = self.preloaded_maps.get(map_name)
+        if map_data is not None:
             logger.debug("%s was found in preloaded maps." % map_name)
-            map_data = self.preloaded_maps[map_name]
-            self.clear_preloaded_maps()
+        else:
+            preloaded = self.map_preloader.get(map_name)
+            if preloaded is None:
+                logger.debug("Map was not preloaded. Loading from disk.")
+            else:
+                logger.debug("%s was loaded in the background." % map_name)
+            map_data = self.load_map(map_name, preloaded)
+
+        # keep the map, in case the player comes back soon
+        self.preloaded_maps.add(map_name, map_data)
+
+        # start loading the maps the player can teleport to from here
+        self.map_preloader.scan(map_data, self.preloaded_maps)
 
         self.current_map = map_data
         self.collision_map = map_data.collision_map
         self.collision_lines_map = map_data.collision_lines_map
+        self.collision_grid = map_data.collision_grid
+        self.pathfinder = map_data.pathfinder
+        self.flow_fields = FlowFields(map_data.collision_grid, self.occupancy)
         self.map_size = map_data.size
 
         # The first coordinates that are out of bounds.
@@ -934,8 +851,7 @@ class WorldState(state.State):
         self.client.load_map(map_data)
 
         # Clear out any existing NPCs
-        self.npcs = {}
-        self.npcs_off_map = {}
+        self.clear_entities()
         self.add_player(local_session.player)
 
         # reset controls and stop moving to prevent player from
@@ -947,11 +863,12 @@ class WorldState(state.State):
             if eo.name.lower() == "player spawn":
                 self.player.set_position((eo.x, eo.y))
 
-    def load_map(self, map_name):
+    def load_map(self, map_name, preloaded=None):
         """ Returns map data as a dictionary to be used for map changing and preloading
+        :param preloaded: Map loaded without images by the map preloader, if any
         :rtype: tuxemon.core.map.TuxemonMap
         """
-        return TMXMapLoader().load(map_name)
+        return TMXMapLoader().load(map_name, preloaded)
 
     def preload_map(self, map_name):
         """ Preload a map for quicker access
@@ -959,14 +876,14 @@ class WorldState(state.State):
         :param map_name:
         :return: None
         """
-        self.preloaded_maps[map_name] = self.load_map(map_name)
+        self.preloaded_maps.add(map_name, self.load_map(map_name))
 
     def clear_preloaded_maps(self):
         """ Clear the preloaded maps cache
 
         :return: None
         """
-        self.preloaded_maps = {}
+        self.preloaded_maps.clear()
 
     def check_interactable_space(self):
         """Checks to see if any Npc objects around the player are interactable. It then populates a menu